@@ -0,0 +1,319 @@
+# benchmarks/bench.py
+# Headless benchmarks of the code a Streamlit rerun goes through: the
+# scheduler, the resource analyzer, the chart builders and the process table,
+# plus all of them together as one rerun. Every size gets its own seeded
+# process set, so runs on the same machine are comparable.
+#
+#   python -m benchmarks.bench --sizes 10 1000 100000 --json bench.json
+#   python -m benchmarks.bench --sizes 10 1000 100000 --baseline bench.json
+#
+# With --baseline the exit status is 1 when a benchmark regressed: its
+# fastest call is more than --threshold slower than the baseline's, and its
+# interquartile range lies wholly above the baseline's, in the first run and
+# in --confirm more runs of it. The fastest of many calls is the estimate
+# least disturbed by other load on the machine, the IQR check keeps a single
+# lucky baseline call from flagging noise, and the reruns filter out
+# machine-wide slow spells, which shift every call of a run together.
+import argparse
+import gc
+import io
+import itertools
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from core.experiments import format_table
+from core.process_index import ProcessIndex
+from core.process_manager import ProcessManager
+from core.resource_analyzer import ResourceAnalyzer
+from core.scheduler import Scheduler
+from core.trace import ExecutionTrace
+from core.workload import generate_workload, processes_from_records
+from ui.process_table import process_rows
+from utils.visualizer import get_timeline_figure
+
+SIZES = (10, 1000, 100000, 1000000)
+STATUSES = ("Running", "Waiting", "Stopped")
+STATUS_WEIGHTS = (0.5, 0.3, 0.2)
+MIN_TIME = 1.0        # seconds of timed calls per benchmark and size ...
+MIN_CALLS = 10        # ... but never fewer samples than this, so the IQR means something
+MAX_CALLS = 1000      # timed samples at most
+SAMPLE_TIME = 1e-3    # calls quicker than this are timed in batches of about this long
+THRESHOLD = 0.25      # relative slowdown of the fastest call reported as a regression
+CONFIRM_ROUNDS = 2    # reruns a regression must survive before it is reported
+RESULT_COLUMNS = ["benchmark", "size", "calls", "ops_per_sec", "min_ms", "p50_ms", "p95_ms", "p99_ms", "peak_kb"]
+
+
+class Fixture:
+    # One seeded process set, shared by every benchmark of a size
+    def __init__(self, size, seed=0):
+        random.seed(seed)
+        np.random.seed(seed)
+        rng = np.random.default_rng(seed)
+        self.size = size
+        self.process_manager = ProcessManager()
+        self.scheduler = Scheduler()
+        self.scheduler.attach(self.process_manager)
+        statuses = rng.choice(len(STATUSES), size, p=STATUS_WEIGHTS).tolist()
+        index = 0
+        for chunk in generate_workload(size, seed, rate=10.0):
+            for process in processes_from_records(chunk):
+                process.status = STATUSES[statuses[index]]
+                index += 1
+                self.process_manager.add_process(process)
+        self.processes = self.process_manager.get_processes()
+        self.analyzer = ResourceAnalyzer()
+        self.clock = 0.0
+
+        # `size` CPU slices of random pids back to back, as a busy host records
+        self.trace = ExecutionTrace(capacity=max(size, 1024))
+        pids = rng.integers(1, size + 1, size).tolist()
+        ends = np.cumsum(rng.exponential(0.5, size)).tolist()
+        start = 0.0
+        for pid, end in zip(pids, ends):
+            self.trace.record(pid, start, end)
+            start = end
+
+    def advance(self):
+        self.clock += 1.0
+        return self.clock
+
+
+def _schedule(fixture):
+    return lambda: fixture.scheduler.schedule(fixture.processes)
+
+
+def _tick(fixture):
+    return lambda: fixture.scheduler.tick(1.0, fixture.advance())
+
+
+def _analyzer_update(fixture):
+    return lambda: fixture.analyzer.update(fixture.process_manager, fixture.scheduler, fixture.advance())
+
+
+def _timeline(fixture):
+    return lambda: get_timeline_figure(fixture.trace, fixture.processes)
+
+
+def _timeline_pan(fixture):
+    # A viewport over a tenth of the trace, moved on every call, so each
+    # call misses the figure cache
+    first, last = fixture.trace.time_range()
+    width = (last - first) / 10
+    offsets = itertools.cycle(np.linspace(first, last - width, 1000).tolist())
+
+    def run():
+        start = next(offsets)
+        return get_timeline_figure(fixture.trace, fixture.processes, start, start + width)
+    return run
+
+
+def _index_build(fixture):
+    return lambda: ProcessIndex(fixture.processes)
+
+
+def _process_table(fixture):
+    # One filtered, sorted page, as the process table renders it
+    index = ProcessIndex(fixture.processes)
+    return lambda: pd.DataFrame(process_rows(
+        index.query(statuses=["Running", "Waiting"], min_cpu=10, sort_by="cpu_usage", descending=True)[1]))
+
+
+def _rerun(fixture):
+    # What main.py does with the data on every rerun, PNG rendering included
+    def run():
+        fixture.scheduler.schedule(fixture.processes)
+        fixture.analyzer.update(fixture.process_manager, fixture.scheduler, fixture.advance())
+        figure = get_timeline_figure(fixture.trace, fixture.processes)
+        figure.savefig(io.BytesIO(), format="png")
+        index = ProcessIndex(fixture.processes)
+        pd.DataFrame(process_rows(index.query(sort_by="cpu_usage", descending=True)[1]))
+        pd.DataFrame([
+            {"Process": f"{p.name} (PID: {p.pid})", "CPU Share (%)": getattr(p, "current_cpu", p.cpu_usage),
+             "Priority": p.priority}
+            for p in fixture.process_manager.get_processes_by_status("Running")
+        ])
+    return run
+
+
+# name -> setup(fixture) returning the callable to time
+BENCHMARKS = {
+    "scheduler.schedule": _schedule,
+    "scheduler.tick": _tick,
+    "analyzer.update": _analyzer_update,
+    "visualizer.timeline": _timeline,
+    "visualizer.timeline_pan": _timeline_pan,
+    "process_index.build": _index_build,
+    "process_table.page": _process_table,
+    "rerun": _rerun,
+}
+
+
+def measure(run, min_time=MIN_TIME, min_calls=MIN_CALLS, max_calls=MAX_CALLS):
+    # Per-call latencies in seconds of repeated samples after a warm-up call,
+    # the calls per sample, and the peak traced allocation of one more call.
+    # Calls quicker than SAMPLE_TIME are timed in batches, so the timer's own
+    # overhead and resolution don't swamp them.
+    run()
+    call_started = time.perf_counter()
+    run()
+    batch = max(1, int(SAMPLE_TIME / max(time.perf_counter() - call_started, 1e-9)))
+    # Start every benchmark from a collected heap, so one benchmark's garbage
+    # is not collected on another's clock
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_calls:
+        sample_started = time.perf_counter()
+        for _ in range(batch):
+            run()
+        latencies.append((time.perf_counter() - sample_started) / batch)
+        if len(latencies) >= min_calls and time.perf_counter() - started >= min_time:
+            break
+    # Tracing slows allocation down, so it gets a call of its own
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return latencies, batch, peak
+
+
+def summarize(name, size, latencies, batch, peak):
+    # `calls` counts every timed call; the percentiles are over samples
+    latencies = np.asarray(latencies)
+    p25, p50, p75, p95, p99 = np.percentile(latencies, (25, 50, 75, 95, 99)) * 1000
+    return {
+        "benchmark": name,
+        "size": size,
+        "calls": len(latencies) * batch,
+        "ops_per_sec": len(latencies) / latencies.sum() if latencies.sum() else float("inf"),
+        "mean_ms": latencies.mean() * 1000,
+        "min_ms": latencies.min() * 1000,
+        "p25_ms": p25,
+        "p50_ms": p50,
+        "p75_ms": p75,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run_benchmarks(sizes=SIZES, names=None, seed=0, min_time=MIN_TIME, progress=None, min_calls=MIN_CALLS):
+    names = names or list(BENCHMARKS)
+    results = []
+    for size in sizes:
+        fixture = Fixture(size, seed)
+        for name in names:
+            latencies, batch, peak = measure(BENCHMARKS[name](fixture), min_time, min_calls)
+            results.append(summarize(name, size, latencies, batch, peak))
+            if progress is not None:
+                progress(results[-1])
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # Adds "vs_baseline" (relative change of the fastest call) to each result
+    # that has a baseline entry; returns the ones slower by more than
+    # `threshold` whose IQR also sits above the baseline's. Baselines saved
+    # before min_ms was recorded are compared on the median alone.
+    previous = {(row["benchmark"], row["size"]): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get((row["benchmark"], row["size"]))
+        statistic = "min_ms" if old is not None and "min_ms" in old else "p50_ms"
+        if old is None or not old[statistic]:
+            row["vs_baseline"] = None
+            continue
+        row["vs_baseline"] = row[statistic] / old[statistic] - 1
+        above_noise = "p75_ms" not in old or row["p25_ms"] > old["p75_ms"]
+        if row["vs_baseline"] > threshold and above_noise:
+            regressions.append(row)
+    return regressions
+
+
+def confirm(results, baseline, threshold=THRESHOLD, rounds=CONFIRM_ROUNDS, seed=0, min_time=MIN_TIME,
+            min_calls=MIN_CALLS):
+    # compare(), then up to `rounds` reruns of whatever regressed on a fresh
+    # fixture; each result keeps its fastest run
+    regressions = compare(results, baseline, threshold)
+    for _ in range(rounds):
+        if not regressions:
+            break
+        fixtures = {}
+        for row in regressions:
+            size = row["size"]
+            if size not in fixtures:
+                fixtures[size] = Fixture(size, seed)
+            latencies, batch, peak = measure(BENCHMARKS[row["benchmark"]](fixtures[size]), min_time, min_calls)
+            rerun = summarize(row["benchmark"], size, latencies, batch, peak)
+            if rerun["min_ms"] < row["min_ms"]:
+                row.update(rerun)
+        regressions = compare(results, baseline, threshold)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the task manager's rerun path")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="process counts")
+    parser.add_argument("--benchmarks", nargs="+", default=None, choices=list(BENCHMARKS),
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME,
+                        help="seconds of timed calls per benchmark and size")
+    parser.add_argument("--min-calls", type=int, default=MIN_CALLS,
+                        help="timed samples per benchmark and size, however long they take")
+    parser.add_argument("--json", default=None, help="write the results here")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="slowdown of the fastest call over the baseline counted as a regression")
+    parser.add_argument("--confirm", type=int, default=CONFIRM_ROUNDS,
+                        help="reruns a regression must survive before it is reported")
+    args = parser.parse_args(argv)
+
+    def progress(row):
+        print(f"{row['benchmark']:<24} {row['size']:>8}  p50 {row['p50_ms']:10.3f} ms", flush=True)
+
+    results = run_benchmarks(args.sizes, args.benchmarks, args.seed, args.min_time, progress, args.min_calls)
+    columns = RESULT_COLUMNS
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = confirm(results, baseline, args.threshold, args.confirm, args.seed, args.min_time,
+                              args.min_calls)
+        columns = RESULT_COLUMNS + ["vs_baseline"]
+
+    def cell(row, column):
+        value = row[column]
+        if column == "vs_baseline" and value is not None:
+            return f"{value:+.0%}"
+        return value
+
+    print()
+    print(format_table([{column: cell(row, column) for column in columns} for row in results], columns))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "numpy": np.__version__,
+                "seed": args.seed,
+                "results": results,
+            }, file, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for row in regressions:
+            print(f"  {row['benchmark']} at {row['size']}: {row['vs_baseline']:+.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
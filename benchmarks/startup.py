@@ -0,0 +1,127 @@
+# benchmarks/startup.py
+# Import-time budget for the app. Runs the imports at the top of main.py in a
+# fresh interpreter under `python -X importtime`, a few times, and reports the
+# median total and the slowest modules. Heavy libraries must be loaded by the
+# sections that use them, not at startup; importing one fails the run.
+#
+#   python -m benchmarks.startup --json startup.json
+#   python -m benchmarks.startup --baseline startup.json --budget-ms 1500
+#
+# The exit status is 1 when the total is over --budget-ms, slower than the
+# baseline by more than --threshold, or a LAZY_MODULES entry was imported.
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+from core.experiments import format_table
+
+ENTRY_POINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+LAZY_MODULES = ("matplotlib", "pandas")   # imported on first use only
+REPEAT = 5
+TOP = 15              # slowest modules listed
+THRESHOLD = 0.25      # relative slowdown over the baseline reported as a regression
+MARKER = "-- app imports --"
+
+
+def startup_imports(path=ENTRY_POINT):
+    # The module-level import statements of `path`, as source lines
+    with open(path) as file:
+        tree = ast.parse(file.read(), path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr):
+    # {module: (self_us, cumulative_us)} for everything imported after MARKER,
+    # plus the top-level modules (those not imported by another one) in order
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    modules = {}
+    top_level = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the column header
+        module = name.strip()
+        modules[module] = (int(self_us), int(cumulative_us))
+        # Nesting is shown by two spaces per level after the bar
+        if len(name) - len(name.lstrip()) <= 1:
+            top_level.append(module)
+    return modules, top_level
+
+
+def measure(imports, python=sys.executable, cwd=None):
+    # One cold interpreter: (modules, top-level modules)
+    code = "import sys\nsys.stderr.write(%r)\nsys.stderr.flush()\n%s\n" % (MARKER + "\n", "\n".join(imports))
+    result = subprocess.run([python, "-X", "importtime", "-c", code], cwd=cwd or os.path.dirname(ENTRY_POINT),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing the app failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run_startup(imports, repeat=REPEAT, top=TOP):
+    runs = [measure(imports) for _ in range(repeat)]
+    totals = [sum(modules[name][1] for name in top_level) for modules, top_level in runs]
+    loaded = set().union(*(modules for modules, _ in runs))
+    # Median cumulative time per module over the runs that imported it
+    cumulative = {}
+    for modules, _ in runs:
+        for name, (_, cumulative_us) in modules.items():
+            cumulative.setdefault(name, []).append(cumulative_us)
+    slowest = sorted(((statistics.median(values), name) for name, values in cumulative.items()), reverse=True)
+    return {
+        "total_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "modules": len(loaded),
+        "eager": sorted(name for name in loaded if name.split(".")[0] in LAZY_MODULES and "." not in name),
+        "slowest": [{"module": name, "cumulative_ms": value / 1000} for value, name in slowest[:top]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the app's import time")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="cold interpreters to measure")
+    parser.add_argument("--top", type=int, default=TOP, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="maximum median import time")
+    parser.add_argument("--json", default=None, help="write the results here")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="slowdown over the baseline counted as a regression")
+    args = parser.parse_args(argv)
+
+    result = run_startup(startup_imports(), args.repeat, args.top)
+    rows = [{"module": row["module"], "cumulative_ms": round(row["cumulative_ms"], 1)} for row in result["slowest"]]
+    print(format_table(rows, ["module", "cumulative_ms"]))
+    print(f"\nApp imports: {result['total_ms']:.0f} ms median (min {result['min_ms']:.0f} ms), "
+          f"{result['modules']} modules")
+
+    failures = []
+    if result["eager"]:
+        failures.append(f"imported at startup instead of on first use: {', '.join(result['eager'])}")
+    if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+        failures.append(f"{result['total_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        change = result["total_ms"] / baseline["total_ms"] - 1 if baseline["total_ms"] else 0.0
+        print(f"vs baseline: {change:+.0%}")
+        if change > args.threshold:
+            failures.append(f"{change:+.0%} slower than the baseline ({baseline['total_ms']:.0f} ms)")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(dict(result, python=platform.python_version(), machine=platform.machine()), file, indent=2)
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
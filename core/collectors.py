@@ -0,0 +1,239 @@
+# core/collectors.py
+# Data sources behind the simulation. A collector reads one kind of data
+# (processes, CPU, memory, network) at its own interval and hands back a
+# plain sample; applying the sample to the simulation is a separate step that
+# runs on the simulation thread, so collect() may run anywhere.
+#
+#   collect()                   -> sample; may block, touches no shared state
+#   apply(simulation, sample)   writes the sample into the simulation
+#   coalesce(older, newer)      one sample standing for both, when the
+#                               simulation did not pick the older one up
+#   encode(sample) / decode()   JSON-safe form for recording and replay
+#
+# Implementations: SimulatedNetworkCollector (the dummy source), the /proc
+# collectors for live Linux hosts and ReplayCollector, which plays back a
+# file written by core.sampler's SampleRecorder.
+import json
+import random
+import time
+
+from core.net_collector import Connection, NetCollector
+from core.proc_collector import ProcCollector, apply_process_records, cpu_percents, read_cpu_times, read_memory
+
+
+class Collector:
+    name = "collector"
+
+    def __init__(self, interval=1.0):
+        self.interval = interval  # seconds between collections
+
+    def collect(self):
+        # None means nothing new this time
+        raise NotImplementedError
+
+    def apply(self, simulation, sample):
+        raise NotImplementedError
+
+    def coalesce(self, older, newer):
+        # Samples are absolute readings by default, so the newest wins
+        return newer
+
+    def encode(self, sample):
+        return sample
+
+    def decode(self, data):
+        return data
+
+    def close(self):
+        pass
+
+
+class SimulatedNetworkCollector(Collector):
+    # Dummy network usage, drawn from the global random module so seeded runs repeat
+    name = "simulated_network"
+
+    def collect(self):
+        return random.randint(0, 100)
+
+    def apply(self, simulation, sample):
+        simulation.network.observe(sample)
+
+
+class ProcessCollector(Collector):
+    # Every process on the host from /proc/[pid]
+    name = "processes"
+
+    def __init__(self, interval=1.0, proc_root="/proc"):
+        super().__init__(interval)
+        self.proc_root = proc_root
+        self.source = None   # ProcCollector, opened on the first collect()
+        self._applied = {}   # the records last written into the ProcessManager
+
+    def collect(self):
+        if self.source is None:
+            self.source = ProcCollector(self.proc_root)
+        return self.source.sample()
+
+    def apply(self, simulation, sample):
+        self._applied = apply_process_records(simulation.process_manager, sample, self._applied)
+        # cpu_usage/memory_usage were rewritten in place, without events
+        simulation.resource_analyzer.invalidate()
+
+    def encode(self, sample):
+        return [[pid] + list(record) for pid, record in sample.items()]
+
+    def decode(self, data):
+        return {row[0]: tuple(row[1:]) for row in data}
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+
+
+class CpuCollector(Collector):
+    # Host and per-core busy % from /proc/stat
+    name = "cpu"
+
+    def __init__(self, interval=1.0, proc_root="/proc"):
+        super().__init__(interval)
+        self.path = proc_root + "/stat"
+        self._cpu_times = None
+
+    def collect(self):
+        # (host %, [per-core %]); zeros on the first call, which has no delta
+        cpu_times = read_cpu_times(self.path)
+        previous, self._cpu_times = self._cpu_times, cpu_times
+        if previous is None:
+            return 0.0, [0.0] * (len(cpu_times) - 1)
+        percents = cpu_percents(cpu_times, previous)
+        return round(percents[0], 1), [round(percent, 1) for percent in percents[1:]]
+
+    def apply(self, simulation, sample):
+        cpu, cores = sample
+        simulation.resource_analyzer.observe(cpu=cpu, cores=cores)
+
+
+class MemoryCollector(Collector):
+    # Host memory in use, as a %, from /proc/meminfo
+    name = "memory"
+
+    def __init__(self, interval=1.0, proc_root="/proc"):
+        super().__init__(interval)
+        self.path = proc_root + "/meminfo"
+
+    def collect(self):
+        total, available = read_memory(self.path)
+        if not total or available is None:
+            return 0.0
+        return round(100.0 * (total - available) / total, 1)
+
+    def apply(self, simulation, sample):
+        simulation.resource_analyzer.observe(memory=sample)
+
+
+class NetworkCollector(Collector):
+    # Interface throughput from /proc/net/dev every interval; the socket
+    # tables are the expensive part, so they are re-read less often
+    name = "network"
+
+    def __init__(self, interval=1.0, proc_root="/proc", connections_interval=5.0, connections_limit=500):
+        super().__init__(interval)
+        self.source = NetCollector(proc_root)
+        self.connections_interval = connections_interval
+        self.connections_limit = connections_limit  # rows decoded for the table
+        self._connections_at = None
+
+    def collect(self):
+        # {"rate", "interfaces", "connections", "sockets"}; connections and
+        # sockets are None when the socket tables were not re-read
+        rate = round(self.source.sample(), 1)
+        sample = {"rate": rate, "interfaces": dict(self.source.interface_rates), "connections": None, "sockets": None}
+        now = time.monotonic()
+        if self._connections_at is None or now - self._connections_at >= self.connections_interval:
+            sample["connections"] = self.source.connections(self.connections_limit)
+            sample["sockets"] = self.source.socket_count
+            self._connections_at = now
+        return sample
+
+    def coalesce(self, older, newer):
+        if newer["connections"] is None and older["connections"] is not None:
+            # Keep the table the simulation has not seen yet
+            newer = dict(newer, connections=older["connections"], sockets=older["sockets"])
+        return newer
+
+    def apply(self, simulation, sample):
+        simulation.network.observe(sample["rate"], sample["interfaces"], sample["connections"], sample["sockets"],
+                                   live=True)
+
+    def encode(self, sample):
+        if sample["connections"] is None:
+            return sample
+        return dict(sample, connections=[list(connection) for connection in sample["connections"]])
+
+    def decode(self, data):
+        if data["connections"] is not None:
+            data = dict(data, connections=[Connection(*row) for row in data["connections"]])
+        return data
+
+
+class ReplayCollector(Collector):
+    # Plays back one collector's samples from a SampleRecorder file, at the
+    # offsets they were recorded at; `collector` decodes and applies them
+    def __init__(self, path, collector):
+        super().__init__(collector.interval)
+        self.collector = collector
+        self.name = collector.name
+        self.samples = []  # (seconds into the recording, decoded sample)
+        with open(path) as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record["collector"] == collector.name:
+                    self.samples.append((record["time"], collector.decode(record["sample"])))
+        self._position = 0
+        self._started = None
+
+    def collect(self):
+        # The latest recorded sample due by now; None when there is nothing
+        # new (or the recording has ended)
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        elapsed = now - self._started
+        sample = None
+        while self._position < len(self.samples) and self.samples[self._position][0] <= elapsed:
+            newer = self.samples[self._position][1]
+            sample = newer if sample is None else self.collector.coalesce(sample, newer)
+            self._position += 1
+        return sample
+
+    def apply(self, simulation, sample):
+        self.collector.apply(simulation, sample)
+
+    def coalesce(self, older, newer):
+        return self.collector.coalesce(older, newer)
+
+
+# Recorded collector name -> the collector that decodes and applies its samples
+REPLAYABLE = {
+    "simulated_network": lambda: SimulatedNetworkCollector(),
+    "processes": lambda: ProcessCollector(),
+    "cpu": lambda: CpuCollector(),
+    "memory": lambda: MemoryCollector(),
+    "network": lambda: NetworkCollector(),
+}
+
+
+def replay_collectors(path):
+    # One ReplayCollector per collector found in a SampleRecorder file
+    names = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                name = json.loads(line)["collector"]
+                if name not in names:
+                    names.append(name)
+    return [ReplayCollector(path, REPLAYABLE[name]()) for name in names if name in REPLAYABLE]
@@ -0,0 +1,559 @@
+# core/columnar_store.py
+# Struct-of-arrays process table. Same API as ProcessManager, but every
+# numeric field lives in a NumPy column so the analyzer math is vectorized.
+import time
+import numpy as np
+
+from core.policies import get_policy
+from core.process_manager import ProcessFilter
+
+STATUS_CODES = {"Running": 0, "Waiting": 1, "Stopped": 2}
+DENSE_PIDS = 1 << 22   # Linux's pid_max ceiling; larger (or negative) pids go to a dict
+
+_COLUMNS = (
+    ("pid", np.int64),
+    ("status", np.int8),
+    ("cpu_usage", np.float32),
+    ("memory_usage", np.float32),
+    ("priority", np.int16),
+    ("start_time", np.float64),
+    ("current_cpu", np.float32),
+    ("burst_time", np.float64),       # NaN: endless job
+    ("remaining_time", np.float64),   # NaN: endless job
+)
+
+
+def _optional(value):
+    return np.nan if value is None else value
+
+
+class _PidIndex:
+    # pid -> row. Pids below DENSE_PIDS index an int32 array directly, 4 bytes
+    # a slot instead of a dict entry and two int objects per process.
+    def __init__(self):
+        self._dense = np.full(1024, -1, dtype=np.int32)
+        self._sparse = {}
+
+    def _grow(self, pid):
+        size = len(self._dense)
+        while size <= pid:
+            size *= 2
+        grown = np.full(size, -1, dtype=np.int32)
+        grown[:len(self._dense)] = self._dense
+        self._dense = grown
+
+    def get(self, pid, default=None):
+        if 0 <= pid < DENSE_PIDS:
+            row = int(self._dense[pid]) if pid < len(self._dense) else -1
+            return default if row < 0 else row
+        return self._sparse.get(pid, default)
+
+    def __getitem__(self, pid):
+        row = self.get(pid)
+        if row is None:
+            raise KeyError(pid)
+        return row
+
+    def __contains__(self, pid):
+        return self.get(pid) is not None
+
+    def __setitem__(self, pid, row):
+        if 0 <= pid < DENSE_PIDS:
+            if pid >= len(self._dense):
+                self._grow(pid)
+            self._dense[pid] = row
+        else:
+            self._sparse[pid] = row
+
+    def pop(self, pid, default=None):
+        row = self.get(pid)
+        if row is None:
+            return default
+        if 0 <= pid < DENSE_PIDS:
+            self._dense[pid] = -1
+        else:
+            del self._sparse[pid]
+        return row
+
+    def lookup(self, pids):
+        # Rows of an int64 pid array, -1 where a pid is unknown
+        rows = np.full(len(pids), -1, dtype=np.int64)
+        dense = (pids >= 0) & (pids < len(self._dense))
+        rows[dense] = self._dense[pids[dense]]
+        for i in np.flatnonzero((pids < 0) | (pids >= DENSE_PIDS)).tolist():
+            rows[i] = self._sparse.get(int(pids[i]), -1)
+        return rows
+
+    def update(self, pids, rows):
+        # Set many at once from int64 pid and row arrays
+        dense = (pids >= 0) & (pids < DENSE_PIDS)
+        if dense.any():
+            top = int(pids[dense].max())
+            if top >= len(self._dense):
+                self._grow(top)
+            self._dense[pids[dense]] = rows[dense]
+        if not dense.all():
+            self._sparse.update(zip(pids[~dense].tolist(), rows[~dense].tolist()))
+
+
+class ProcessRow:
+    # Lightweight view onto one row of a ColumnarProcessManager. Looks like a
+    # Process to the UI, but reads and writes go straight to the columns.
+    __slots__ = ("_store", "pid")
+
+    def __init__(self, store, pid):
+        self._store = store
+        self.pid = pid
+
+    def _row(self):
+        return self._store._rows[self.pid]
+
+    @property
+    def name(self):
+        return self._store._names[self._row()]
+
+    @name.setter
+    def name(self, name):
+        self._store._names[self._row()] = name
+
+    @property
+    def status(self):
+        return self._store._status_names[self._store.status[self._row()]]
+
+    @status.setter
+    def status(self, status):
+        self._store.update_process_status(self.pid, status)
+
+    @property
+    def cpu_usage(self):
+        return float(self._store.cpu_usage[self._row()])
+
+    @cpu_usage.setter
+    def cpu_usage(self, value):
+        self._store.cpu_usage[self._row()] = value
+
+    @property
+    def memory_usage(self):
+        return float(self._store.memory_usage[self._row()])
+
+    @memory_usage.setter
+    def memory_usage(self, value):
+        self._store.memory_usage[self._row()] = value
+
+    @property
+    def priority(self):
+        return int(self._store.priority[self._row()])
+
+    @priority.setter
+    def priority(self, value):
+        self._store.update_process_priority(self.pid, value)
+
+    @property
+    def start_time(self):
+        return float(self._store.start_time[self._row()])
+
+    @start_time.setter
+    def start_time(self, value):
+        self._store.start_time[self._row()] = value
+
+    @property
+    def current_cpu(self):
+        return float(self._store.current_cpu[self._row()])
+
+    @current_cpu.setter
+    def current_cpu(self, value):
+        self._store.current_cpu[self._row()] = value
+
+    @property
+    def burst_time(self):
+        value = float(self._store.burst_time[self._row()])
+        return None if value != value else value
+
+    @burst_time.setter
+    def burst_time(self, value):
+        self._store.burst_time[self._row()] = _optional(value)
+
+    @property
+    def remaining_time(self):
+        value = float(self._store.remaining_time[self._row()])
+        return None if value != value else value
+
+    @remaining_time.setter
+    def remaining_time(self, value):
+        self._store.remaining_time[self._row()] = _optional(value)
+
+
+class ColumnarProcessManager:
+    def __init__(self, capacity=1024):
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._data = {name: np.zeros(self._capacity, dtype=dtype) for name, dtype in _COLUMNS}
+        self._names = []       # process names, row-aligned with the columns
+        self._rows = _PidIndex()  # pid -> row index
+        self._status_names = list(STATUS_CODES)
+        self._status_codes = dict(STATUS_CODES)
+        self._process_list = None
+        self._listeners = []   # callbacks notified as listener(event, process, old)
+
+    # Column views, trimmed to the live rows
+    @property
+    def pid(self):
+        return self._data["pid"][:self._size]
+
+    @property
+    def status(self):
+        return self._data["status"][:self._size]
+
+    @property
+    def cpu_usage(self):
+        return self._data["cpu_usage"][:self._size]
+
+    @property
+    def memory_usage(self):
+        return self._data["memory_usage"][:self._size]
+
+    @property
+    def priority(self):
+        return self._data["priority"][:self._size]
+
+    @property
+    def start_time(self):
+        return self._data["start_time"][:self._size]
+
+    @property
+    def current_cpu(self):
+        return self._data["current_cpu"][:self._size]
+
+    @property
+    def burst_time(self):
+        return self._data["burst_time"][:self._size]
+
+    @property
+    def remaining_time(self):
+        return self._data["remaining_time"][:self._size]
+
+    def names(self):
+        # Process names, row-aligned with the columns
+        return self._names
+
+    def status_names(self):
+        # Status name of each code in the status column
+        return self._status_names
+
+    @property
+    def processes(self):
+        return self.get_processes()
+
+    @processes.setter
+    def processes(self, processes):
+        # Materialize first: the incoming items may be views onto this store
+        records = [
+            (p.pid, p.name, p.status, p.cpu_usage, p.memory_usage, p.priority, p.start_time,
+             getattr(p, "burst_time", None), getattr(p, "remaining_time", None))
+            for p in processes
+        ]
+        for pid in self.pid.tolist():
+            self.remove_process(pid)
+        if records:
+            self.add_processes(*zip(*records))
+
+    def _status_code(self, status):
+        code = self._status_codes.get(status)
+        if code is None:
+            code = len(self._status_names)
+            self._status_codes[status] = code
+            self._status_names.append(status)
+        return code
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._data.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._data[name] = grown
+        self._capacity = capacity
+
+    def add_process(self, process):
+        if process.pid in self._rows:
+            self.remove_process(process.pid)
+        self._reserve(1)
+        row = self._size
+        self._data["pid"][row] = process.pid
+        self._data["status"][row] = self._status_code(process.status)
+        self._data["cpu_usage"][row] = process.cpu_usage
+        self._data["memory_usage"][row] = process.memory_usage
+        self._data["priority"][row] = process.priority
+        self._data["start_time"][row] = process.start_time
+        self._data["current_cpu"][row] = getattr(process, "current_cpu", 0)
+        self._data["burst_time"][row] = _optional(getattr(process, "burst_time", None))
+        self._data["remaining_time"][row] = _optional(getattr(process, "remaining_time", None))
+        self._names.append(process.name)
+        self._rows[process.pid] = row
+        self._size += 1
+        self._process_list = None
+        self._notify("add", ProcessRow(self, process.pid))
+
+    def add_processes(self, pids, names, statuses, cpu_usage, memory_usage, priority, start_time=None,
+                      burst_time=None, remaining_time=None):
+        # Bulk append of whole columns; used for large generated workloads.
+        # NaN or None burst times are endless jobs; remaining_time defaults
+        # to the burst time.
+        pids = np.asarray(pids, dtype=np.int64)
+        count = len(pids)
+        if count == 0:
+            return
+        if (self._rows.lookup(pids) >= 0).any() or len(np.unique(pids)) != count:
+            # Duplicate pids: fall back to per-row replacement semantics
+            for i in range(count):
+                burst = None if burst_time is None else _float_or_none(burst_time[i])
+                remaining = burst if remaining_time is None else _float_or_none(remaining_time[i])
+                self.add_process(_Record(
+                    int(pids[i]), names[i], statuses[i], cpu_usage[i], memory_usage[i], priority[i],
+                    start_time[i] if start_time is not None else time.time(), burst, remaining))
+            return
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        codes = [self._status_code(status) for status in statuses]
+        self._data["pid"][start:end] = pids
+        self._data["status"][start:end] = codes
+        self._data["cpu_usage"][start:end] = cpu_usage
+        self._data["memory_usage"][start:end] = memory_usage
+        self._data["priority"][start:end] = priority
+        self._data["start_time"][start:end] = time.time() if start_time is None else start_time
+        self._data["current_cpu"][start:end] = 0
+        # float64 conversion turns None into NaN
+        self._data["burst_time"][start:end] = np.nan if burst_time is None else np.asarray(burst_time, np.float64)
+        self._data["remaining_time"][start:end] = (self._data["burst_time"][start:end] if remaining_time is None
+                                                   else np.asarray(remaining_time, np.float64))
+        self._names.extend(names)
+        self._rows.update(pids, np.arange(start, end))
+        self._size = end
+        self._process_list = None
+        if self._listeners:
+            for pid in pids.tolist():
+                self._notify("add", ProcessRow(self, pid))
+
+    def remove_process(self, pid):
+        removed = self._remove_row(pid)
+        if removed is not None:
+            self._notify("remove", removed)
+
+    def _record(self, row):
+        # Detached copy of one row, for listeners of rows that are going away
+        data = self._data
+        return _Record(int(data["pid"][row]), self._names[row], self._status_names[data["status"][row]],
+                       float(data["cpu_usage"][row]), float(data["memory_usage"][row]),
+                       int(data["priority"][row]), float(data["start_time"][row]),
+                       _float_or_none(data["burst_time"][row]), _float_or_none(data["remaining_time"][row]))
+
+    def _remove_row(self, pid):
+        # Drops the row and returns a _Record of its values, or None for an unknown pid
+        row = self._rows.get(pid)
+        if row is None:
+            return None
+        removed = self._record(row)
+        self._rows.pop(pid)
+        last = self._size - 1
+        if row != last:
+            # Swap the last row into the hole so the columns stay dense
+            for column in self._data.values():
+                column[row] = column[last]
+            self._names[row] = self._names[last]
+            self._rows[int(self._data["pid"][row])] = row
+        self._names.pop()
+        self._size = last
+        self._process_list = None
+        return removed
+
+    def get_process(self, pid):
+        if pid not in self._rows:
+            return None
+        return ProcessRow(self, pid)
+
+    def get_processes(self):
+        if self._process_list is None:
+            self._process_list = [ProcessRow(self, int(pid)) for pid in self.pid]
+        return self._process_list
+
+    def _status_mask(self, statuses):
+        codes = [self._status_codes[s] for s in statuses if s in self._status_codes]
+        if len(codes) == 1:
+            return self.status == codes[0]
+        return np.isin(self.status, codes)
+
+    def get_processes_by_status(self, *statuses):
+        rows = np.flatnonzero(self._status_mask(statuses))
+        return [ProcessRow(self, int(pid)) for pid in self.pid[rows]]
+
+    def count_by_status(self, status):
+        return int(np.count_nonzero(self._status_mask((status,))))
+
+    def get_statuses(self):
+        present = np.unique(self.status)
+        return [self._status_names[code] for code in present]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, pid):
+        return pid in self._rows
+
+    def subscribe(self, listener):
+        # listener(event, process, old) with event in add/remove/status/priority,
+        # or remove_many/status_many/priority_many with lists (see ProcessManager)
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, process, old=None):
+        for listener in self._listeners:
+            listener(event, process, old)
+
+    def update_process_status(self, pid, status):
+        row = self._rows.get(pid)
+        if row is None:
+            return
+        code = self._status_code(status)
+        old_code = self._data["status"][row]
+        if old_code != code:
+            self._data["status"][row] = code
+            self._notify("status", ProcessRow(self, pid), self._status_names[old_code])
+
+    def update_process_priority(self, pid, priority):
+        row = self._rows.get(pid)
+        if row is None:
+            return
+        old_priority = int(self._data["priority"][row])
+        if old_priority != priority:
+            self._data["priority"][row] = priority
+            self._notify("priority", ProcessRow(self, pid), old_priority)
+
+    # Bulk operations: the targets are a row mask, so status and priority
+    # changes are single column writes and listeners get one batch event
+    def _where_mask(self, where):
+        # Row mask of a ProcessFilter from the columns; other predicates see every row
+        if not isinstance(where, ProcessFilter):
+            return np.fromiter((bool(where(row)) for row in self.get_processes()), dtype=bool, count=self._size)
+        mask = np.ones(self._size, dtype=bool)
+        if where.statuses is not None:
+            mask &= self._status_mask(where.statuses)
+        if where.priority_below is not None:
+            mask &= self.priority < where.priority_below
+        if where.priority_above is not None:
+            mask &= self.priority > where.priority_above
+        if where.cpu_below is not None:
+            mask &= self.cpu_usage < where.cpu_below
+        if where.cpu_above is not None:
+            mask &= self.cpu_usage > where.cpu_above
+        if where.name_match is not None:
+            candidates = np.flatnonzero(mask)
+            names = self._names
+            mask[candidates] = [where.name_match(names[row]) is not None for row in candidates.tolist()]
+        return mask
+
+    def _select_rows(self, pids=None, where=None):
+        if pids is None:
+            if where is None:
+                return np.arange(self._size)
+            return np.flatnonzero(self._where_mask(where))
+        pids = np.fromiter(dict.fromkeys(pids), dtype=np.int64)
+        selected = self._rows.lookup(pids)
+        selected = selected[selected >= 0]
+        if where is None:
+            return selected
+        if isinstance(where, ProcessFilter):
+            return selected[self._where_mask(where)[selected]]
+        return selected[[bool(where(ProcessRow(self, int(self._data["pid"][row])))) for row in selected.tolist()]]
+
+    def select(self, pids=None, where=None):
+        return [ProcessRow(self, pid) for pid in self._data["pid"][self._select_rows(pids, where)].tolist()]
+
+    def update_processes_status(self, status, pids=None, where=None):
+        rows = self._select_rows(pids, where)
+        code = self._status_code(status)
+        old_codes = self._data["status"][rows]
+        rows = rows[old_codes != code]
+        old_codes = old_codes[old_codes != code]
+        self._data["status"][rows] = code
+        if len(rows) and self._listeners:
+            self._notify("status_many", [ProcessRow(self, pid) for pid in self._data["pid"][rows].tolist()],
+                         [self._status_names[old] for old in old_codes.tolist()])
+        return len(rows)
+
+    def update_processes_priority(self, priority, pids=None, where=None):
+        rows = self._select_rows(pids, where)
+        old_priorities = self._data["priority"][rows]
+        rows = rows[old_priorities != priority]
+        old_priorities = old_priorities[old_priorities != priority]
+        self._data["priority"][rows] = priority
+        if len(rows) and self._listeners:
+            self._notify("priority_many", [ProcessRow(self, pid) for pid in self._data["pid"][rows].tolist()],
+                         old_priorities.tolist())
+        return len(rows)
+
+    def remove_processes(self, pids=None, where=None):
+        removed = [self._remove_row(pid) for pid in self._data["pid"][self._select_rows(pids, where)].tolist()]
+        if removed:
+            self._notify("remove_many", removed)
+        return len(removed)
+
+    # Vectorized analytics
+    def allocate_cpu(self, algorithm):
+        # The policy's share rule (see core.policies) over whole columns
+        current_cpu = self.current_cpu
+        current_cpu[:] = 0
+        running = self._status_mask(("Running",))
+        if not running.any():
+            return 0.0
+        current_cpu[running] = get_policy(algorithm).share(
+            self.pid[running], self.cpu_usage[running], self.priority[running], self.start_time[running])
+        return float(current_cpu.sum(dtype=np.float64))
+
+    def total_memory(self, status="Running"):
+        return float(self.memory_usage[self._status_mask((status,))].sum(dtype=np.float64))
+
+    def mean_waiting_time(self, now=None):
+        waiting = self._status_mask(("Waiting",))
+        if not waiting.any():
+            return 0.0
+        now = time.time() if now is None else now
+        return float((now - self.start_time[waiting]).mean())
+
+    def cpu_by_priority(self, status="Running"):
+        # Total allocated CPU per priority level: {priority: cpu}
+        mask = self._status_mask((status,))
+        levels, inverse = np.unique(self.priority[mask], return_inverse=True)
+        totals = np.bincount(inverse, weights=self.current_cpu[mask], minlength=len(levels))
+        return dict(zip(levels.tolist(), totals.tolist()))
+
+    def get_cpu_allocation(self):
+        return dict(zip(self.pid.tolist(), self.current_cpu.tolist()))
+
+
+def _float_or_none(value):
+    value = float(value) if value is not None else None
+    return None if value is None or value != value else value
+
+
+class _Record:
+    __slots__ = ("pid", "name", "status", "cpu_usage", "memory_usage", "priority", "start_time",
+                 "burst_time", "remaining_time")
+
+    def __init__(self, pid, name, status, cpu_usage, memory_usage, priority, start_time,
+                 burst_time=None, remaining_time=None):
+        self.pid = pid
+        self.name = name
+        self.status = status
+        self.cpu_usage = cpu_usage
+        self.memory_usage = memory_usage
+        self.priority = priority
+        self.start_time = start_time
+        self.burst_time = burst_time
+        self.remaining_time = remaining_time
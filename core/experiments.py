@@ -0,0 +1,185 @@
+# core/experiments.py
+# Batch policy comparison. A grid of (policy, quantum, cores, seed) runs is
+# fanned out over a ProcessPoolExecutor, one headless Simulation per run, and
+# the scheduling metrics come back as a comparison table. Every run seeds its
+# own RNGs, so the same grid always gives the same numbers.
+#
+#   python -m core.experiments --algorithms "Round Robin" "Completely Fair" \
+#       --quanta 1 2 4 --cores 1 8 --seeds 1 2 3 --burst 5
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.process_manager import ProcessManager
+from core.scheduler import Scheduler
+from core.simulation import Simulation
+from core.policies import policy_names
+from core.workload import WorkloadStream, iter_processes
+
+ExperimentConfig = namedtuple(
+    "ExperimentConfig",
+    ["workload", "algorithm", "quantum", "cores", "seed", "ticks", "tick_interval", "burst"],
+)
+
+# Metric columns of a result row, as (result key, summary section, statistic)
+METRIC_COLUMNS = [
+    ("turnaround_mean", "turnaround", "mean"), ("turnaround_p95", "turnaround", "p95"),
+    ("waiting_mean", "waiting", "mean"), ("waiting_p95", "waiting", "p95"), ("waiting_p99", "waiting", "p99"),
+    ("response_mean", "response", "mean"), ("response_p95", "response", "p95"),
+]
+GROUP_COLUMNS = ["algorithm", "quantum", "cores"]
+CHECK_EVERY = 1000  # ticks between "is everything finished?" checks
+
+
+def experiment_grid(workload, algorithms=None, quanta=(2,), cores=(1,), seeds=(0,),
+                    ticks=100000, tick_interval=1.0, burst=None):
+    # Every combination of the given policies, quanta, core counts and seeds
+    algorithms = algorithms or policy_names()
+    return [
+        ExperimentConfig(workload, algorithm, quantum, core_count, seed, ticks, tick_interval, burst)
+        for algorithm, quantum, core_count, seed in itertools.product(algorithms, quanta, cores, seeds)
+    ]
+
+
+def _workload_processes(config, rng):
+    # The workload's processes, read lazily. Missing bursts are drawn from an
+    # exponential with mean `burst` so seeds matter.
+    for process in iter_processes(config.workload, ordered=True):
+        if process.burst_time is None and config.burst is not None:
+            process.burst_time = process.remaining_time = max(config.tick_interval, rng.expovariate(1 / config.burst))
+        process.status = "Waiting"
+        yield process
+
+
+def run_experiment(config):
+    # One simulation, run in a worker process; returns a flat result row
+    rng = random.Random(config.seed)
+    random.seed(config.seed)      # the simulated Network draws from these
+    np.random.seed(config.seed)
+    if not os.path.exists(config.workload):
+        raise ValueError(f"could not load workload {config.workload}")
+
+    scheduler = Scheduler(cores=config.cores)
+    scheduler.set_algorithm(config.algorithm)
+    scheduler.quantum = config.quantum
+    # Resource sampling is irrelevant to the scheduling metrics, so it is off
+    # Processes arrive at their start_time offsets and leave once finished
+    simulation = Simulation(ProcessManager(), scheduler, tick_interval=config.tick_interval, sample_interval=0,
+                            retire_completed=True)
+    stream = WorkloadStream(simulation, _workload_processes(config, rng)).start()
+
+    started = time.perf_counter()
+    while simulation.ticks < config.ticks:
+        simulation.run(ticks=min(CHECK_EVERY, config.ticks - simulation.ticks))
+        if stream.exhausted and stream.finite and simulation.completed >= stream.finite:
+            break
+    wall = time.perf_counter() - started
+
+    summary = scheduler.metrics.summary(simulation.clock)
+    makespan = summary["makespan"]
+    row = dict(config._asdict())
+    row.update({
+        "processes": stream.fed,
+        "completed": summary["completed"],
+        "throughput": summary["completed"] / makespan if makespan else 0.0,
+        "makespan": makespan,
+        "ticks": simulation.ticks,
+        "migrations": scheduler.migrations,
+        "wall_seconds": wall,
+    })
+    for column, section, statistic in METRIC_COLUMNS:
+        row[column] = summary[section][statistic]
+    return row
+
+
+def _available_cpus():
+    # Cores this process may use (container and taskset limits included)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run_experiments(configs, max_workers=None):
+    # Results in the order of `configs`; max_workers=1 runs in this process
+    configs = list(configs)
+    max_workers = max_workers or _available_cpus()
+    if max_workers == 1 or len(configs) <= 1:
+        return [run_experiment(config) for config in configs]
+    # Several small runs per task keep the pool busy without per-task overhead
+    chunksize = max(1, len(configs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(configs))) as executor:
+        return list(executor.map(run_experiment, configs, chunksize=chunksize))
+
+
+def summarize(results):
+    # One row per (algorithm, quantum, cores): metrics averaged over seeds
+    groups = {}
+    for row in results:
+        groups.setdefault(tuple(row[column] for column in GROUP_COLUMNS), []).append(row)
+    summary = []
+    for key, rows in groups.items():
+        merged = dict(zip(GROUP_COLUMNS, key))
+        merged["runs"] = len(rows)
+        for column in ["completed", "throughput"] + [name for name, _, _ in METRIC_COLUMNS]:
+            values = [row[column] for row in rows if row[column] is not None]
+            merged[column] = sum(values) / len(values) if values else None
+        summary.append(merged)
+    return summary
+
+
+def format_table(rows, columns):
+    def cell(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.3f}" if abs(value) < 10 else f"{value:.1f}"
+        return str(value)
+
+    table = [[cell(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in table)) if table else len(column)
+              for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(value.ljust(width) for value, width in zip(line, widths)) for line in table)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare scheduling policies over a grid of runs")
+    parser.add_argument("--workload", default="data/dummy_processes.json", help="process file (.json, .ndjson or .bin)")
+    parser.add_argument("--algorithms", nargs="+", default=None, choices=policy_names(),
+                        help="policies to compare (default: all)")
+    parser.add_argument("--quanta", nargs="+", type=float, default=[2.0])
+    parser.add_argument("--cores", nargs="+", type=int, default=[1])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--ticks", type=int, default=100000, help="tick limit per run")
+    parser.add_argument("--tick-interval", type=float, default=1.0)
+    parser.add_argument("--burst", type=float, default=5.0,
+                        help="mean CPU seconds drawn for processes without a burst_time")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--json", default=None, help="also write every run's result row here")
+    args = parser.parse_args(argv)
+
+    configs = experiment_grid(args.workload, args.algorithms, args.quanta, args.cores, args.seeds,
+                              args.ticks, args.tick_interval, args.burst)
+    started = time.perf_counter()
+    results = run_experiments(configs, args.workers)
+    elapsed = time.perf_counter() - started
+
+    columns = GROUP_COLUMNS + ["runs", "completed", "throughput"] + [name for name, _, _ in METRIC_COLUMNS]
+    print(format_table(summarize(results), columns))
+    print(f"\n{len(configs)} runs in {elapsed:.2f}s")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# core/instrumentation.py
+# Timing spans and counters for the hot paths. Spans feed per-name streaming
+# histograms (count, mean, p50/p95/p99); while recording is off a span is a
+# shared no-op context manager and a timed function costs one flag check.
+#
+#   with span("chart.render"):
+#       ...
+#
+#   @timed("analyzer.update")
+#   def update(self, ...):
+#
+# RerunProfiler captures cProfile stats of the next N Streamlit reruns.
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import threading
+import time
+from contextlib import nullcontext
+
+from core.scheduling_metrics import StreamingStats
+
+_NO_SPAN = nullcontext()
+
+
+class Instrumentation:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()   # spans end on the runner and script threads
+        self._spans = {}                # name -> StreamingStats of seconds
+        self._counters = {}             # name -> count
+
+    def span(self, name):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = StreamingStats()
+            stats.add(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def timed(self, name):
+        # Decorator form of span(name)
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def spans(self):
+        # name -> {"count", "mean", "min", "max", "p50", "p95", "p99", "total"} in seconds
+        with self._lock:
+            return {name: dict(stats.summary(), total=stats.total) for name, stats in self._spans.items()}
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+
+
+class _Span:
+    __slots__ = ("_owner", "_name", "_started")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._owner.record(self._name, time.perf_counter() - self._started)
+        return False
+
+
+class RerunProfiler:
+    # cProfile of whole reruns, merged into one pstats-compatible table.
+    # A rerun cut short (st.rerun() raises out of the script) never reaches
+    # stop(); its profile is kept once its thread has finished.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining = 0       # reruns still to capture
+        self.captured = 0        # reruns in the current stats
+        self._stats = None       # pstats.Stats of the captured reruns
+        self._open = {}          # profile -> thread, started but not stopped
+
+    def request(self, reruns):
+        # Capture the next `reruns` reruns, dropping earlier results
+        with self._lock:
+            self.remaining = reruns
+            self.captured = 0
+            self._stats = None
+            self._open = {}
+
+    def start(self):
+        # Returns the profile to pass to stop(), or None when not capturing
+        current = threading.current_thread()
+        with self._lock:
+            for profile, thread in list(self._open.items()):
+                if thread is current or not thread.is_alive():
+                    del self._open[profile]
+                    self._keep(profile)
+            if self.remaining <= 0:
+                return None
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is active (one at a time on Python 3.12+)
+                return None
+            self.remaining -= 1
+            self._open[profile] = current
+        return profile
+
+    def stop(self, profile):
+        if profile is None:
+            return
+        profile.disable()
+        with self._lock:
+            if self._open.pop(profile, None) is not None:
+                self._keep(profile)
+
+    def _keep(self, profile):
+        profile.disable()
+        if self._stats is None:
+            self._stats = pstats.Stats(profile)
+        else:
+            self._stats.add(profile)
+        self.captured += 1
+
+    def capturing(self):
+        with self._lock:
+            return self.remaining > 0 or bool(self._open)
+
+    def report(self, limit=25):
+        # The slowest functions by cumulative time, as pstats prints them
+        with self._lock:
+            if self._stats is None:
+                return None
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats("cumulative").print_stats(limit)
+            return out.getvalue()
+
+    def dump(self):
+        # The captured stats as a .pstats file (what pstats.Stats.dump_stats writes)
+        with self._lock:
+            if self._stats is None:
+                return None
+            return marshal.dumps(self._stats.stats)
+
+
+# Process-wide instances: the simulation thread and every session share them
+instrumentation = Instrumentation()
+span = instrumentation.span
+timed = instrumentation.timed
+count = instrumentation.count
+rerun_profiler = RerunProfiler()
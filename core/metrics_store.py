@@ -0,0 +1,184 @@
+# core/metrics_store.py
+# Append-only on-disk metrics. Each series is a flat file of fixed-size
+# binary records, read back through numpy.memmap so dashboards can query
+# hours or days of history without loading it into RAM.
+import math
+import os
+import time
+import numpy as np
+
+SERIES_DTYPE = np.dtype([("time", "<f8"), ("value", "<f8")])
+PROCESS_DTYPE = np.dtype([("time", "<f8"), ("pid", "<i8"), ("cpu", "<f4")])
+SERIES = ("cpu", "memory", "network")
+
+
+class _AppendFile:
+    # Buffered appender for one record file. Records are only written whole,
+    # and a torn trailing record from a crash is cut off on open.
+    def __init__(self, path, dtype, buffer_size):
+        self.path = path
+        self.dtype = dtype
+        self._buffer = np.zeros(buffer_size, dtype=dtype)
+        self._pending = 0
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        whole = size - size % dtype.itemsize
+        self._file = open(path, "ab")
+        if whole != size:
+            self._file.truncate(whole)
+        self.last_time = self._read_last_time(whole)
+
+    def _read_last_time(self, size):
+        if size == 0:
+            return -math.inf
+        records = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(size // self.dtype.itemsize,))
+        return float(records["time"][-1])
+
+    def append(self, record):
+        if record[0] < self.last_time:
+            raise ValueError(f"{os.path.basename(self.path)}: timestamps must not go backwards")
+        self._buffer[self._pending] = record
+        self._pending += 1
+        self.last_time = record[0]
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def extend(self, records):
+        if len(records) == 0:
+            return
+        if records["time"][0] < self.last_time:
+            raise ValueError(f"{os.path.basename(self.path)}: timestamps must not go backwards")
+        self.flush()
+        self._file.write(records.tobytes())
+        self.last_time = float(records["time"][-1])
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class MetricsStore:
+    def __init__(self, directory, buffer_size=4096, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        self._files = {name: _AppendFile(self._path(name), SERIES_DTYPE, buffer_size) for name in SERIES}
+        self._files["process_cpu"] = _AppendFile(self._path("process_cpu"), PROCESS_DTYPE, buffer_size)
+        self._last_flush = time.monotonic()
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def last_time(self):
+        # Latest timestamp written to any series; None while the store is empty
+        latest = max(file.last_time for file in self._files.values())
+        return None if latest == -math.inf else latest
+
+    def start_time(self, interval=1.0):
+        # Where a new run appending here should start its clock: now, or one
+        # interval past the last sample when an earlier run's virtual clock
+        # ran ahead of wall time
+        now = time.time()
+        latest = self.last_time()
+        return now if latest is None else max(now, latest + interval)
+
+    # Writing
+    def append(self, series, timestamp, value):
+        self._files[series].append((timestamp, value))
+        self._maybe_flush()
+
+    def record(self, timestamp, cpu, memory, network):
+        self._files["cpu"].append((timestamp, cpu))
+        self._files["memory"].append((timestamp, memory))
+        self._files["network"].append((timestamp, network))
+        self._maybe_flush()
+
+    def record_process_cpu(self, timestamp, pids, cpu):
+        # One vectorized write for every process sampled at `timestamp`
+        pids = np.asarray(pids, dtype=np.int64)
+        records = np.empty(len(pids), dtype=PROCESS_DTYPE)
+        records["time"] = timestamp
+        records["pid"] = pids
+        records["cpu"] = cpu
+        self._files["process_cpu"].extend(records)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        for file in self._files.values():
+            file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        for file in self._files.values():
+            file.close()
+
+    # Reading (only flushed records are visible)
+    def _records(self, name):
+        dtype = self._files[name].dtype
+        path = self._path(name)
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def count(self, series):
+        return len(self._records(series))
+
+    def time_range(self, series):
+        records = self._records(series)
+        if not len(records):
+            return None
+        return float(records["time"][0]), float(records["time"][-1])
+
+    def _slice(self, records, start, end):
+        times = records["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(records) if end is None else int(np.searchsorted(times, end, side="right"))
+        return records[lo:hi]
+
+    def query(self, series, start=None, end=None, max_points=None, chunk_size=1 << 20):
+        # {"time", "value"} between start and end; with max_points the range is
+        # reduced to {"time", "min", "max", "avg"} buckets, one chunk at a time
+        records = self._slice(self._records(series), start, end)
+        if max_points is None or len(records) <= max_points:
+            return {"time": np.array(records["time"]), "value": np.array(records["value"])}
+        bucket = math.ceil(len(records) / max_points)
+        chunk = max(bucket, chunk_size - chunk_size % bucket)
+        columns = {"time": [], "min": [], "max": [], "avg": []}
+        for offset in range(0, len(records), chunk):
+            part = records[offset:offset + chunk]
+            full = len(part) - len(part) % bucket
+            groups = [part[:full]] if full else []
+            if full < len(part):
+                groups.append(part[full:])
+            for group in groups:
+                size = bucket if len(group) >= bucket else len(group)
+                values = np.asarray(group["value"]).reshape(-1, size)
+                columns["time"].append(np.asarray(group["time"])[::size])
+                columns["min"].append(values.min(axis=1))
+                columns["max"].append(values.max(axis=1))
+                columns["avg"].append(values.mean(axis=1))
+        return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+    def query_process(self, pid, start=None, end=None, chunk_size=1 << 20):
+        # {"time", "cpu"} samples for one process, scanned chunk by chunk
+        records = self._slice(self._records("process_cpu"), start, end)
+        times, cpu = [], []
+        for offset in range(0, len(records), chunk_size):
+            part = records[offset:offset + chunk_size]
+            mask = part["pid"] == pid
+            times.append(np.asarray(part["time"][mask]))
+            cpu.append(np.asarray(part["cpu"][mask]))
+        if not times:
+            return {"time": np.zeros(0), "cpu": np.zeros(0, dtype=np.float32)}
+        return {"time": np.concatenate(times), "cpu": np.concatenate(cpu)}
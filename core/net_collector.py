@@ -0,0 +1,163 @@
+# core/net_collector.py
+# Live network data from Linux /proc/net: per-interface throughput from
+# /proc/net/dev deltas and a connection table from /proc/net/{tcp,udp}{,6},
+# with socket inodes mapped to pids through a cached /proc/[pid]/fd index.
+import os
+import socket
+import struct
+import time
+from collections import deque, namedtuple
+
+Connection = namedtuple(
+    "Connection",
+    ["pid", "protocol", "local_address", "remote_address", "status", "send_queue", "recv_queue", "inode"],
+)
+
+TCP_STATES = {
+    "01": "ESTABLISHED", "02": "SYN_SENT", "03": "SYN_RECV", "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2", "06": "TIME_WAIT", "07": "CLOSE", "08": "CLOSE_WAIT",
+    "09": "LAST_ACK", "0A": "LISTEN", "0B": "CLOSING", "0C": "NEW_SYN_RECV",
+}
+
+SOCKET_TABLES = (("tcp", "TCP"), ("tcp6", "TCP6"), ("udp", "UDP"), ("udp6", "UDP6"))
+
+
+def _decode_address(value):
+    # "0100007F:1F90" -> "127.0.0.1:8080"; addresses are little-endian 32-bit words
+    host, port = value.split(":")
+    packed = bytes.fromhex(host)
+    if len(packed) == 4:
+        address = socket.inet_ntop(socket.AF_INET, packed[::-1])
+    else:
+        words = struct.unpack("<4I", packed)
+        address = "[" + socket.inet_ntop(socket.AF_INET6, struct.pack(">4I", *words)) + "]"
+    return f"{address}:{int(port, 16)}"
+
+
+class NetCollector:
+    def __init__(self, proc_root="/proc", rescan_budget=500):
+        self.proc_root = proc_root
+        # Max known pids whose fds are re-read per call while hunting unknown inodes
+        self.rescan_budget = rescan_budget
+        self.interface_rates = {}    # iface -> (rx KB/s, tx KB/s)
+        self._counters = None        # iface -> (rx bytes, tx bytes)
+        self._sampled_at = None
+        self._inode_pid = {}         # socket inode -> pid
+        self._pid_inodes = {}        # pid -> set of socket inodes
+        self._rescan_order = deque() # known pids still to revisit
+        self._unresolved = set()     # inodes a full rescan could not attribute
+        self.socket_count = 0
+        self.last_duration = 0.0
+
+    def _path(self, *parts):
+        return os.path.join(self.proc_root, *parts)
+
+    def sample(self):
+        # Total KB/s (rx + tx, all interfaces but loopback) since the last call
+        counters = {}
+        with open(self._path("net", "dev"), "rb") as file:
+            for line in file.readlines()[2:]:
+                name, _, data = line.partition(b":")
+                fields = data.split()
+                counters[name.strip().decode()] = (int(fields[0]), int(fields[8]))
+        now = time.monotonic()
+        previous, previous_at = self._counters, self._sampled_at
+        self._counters, self._sampled_at = counters, now
+        if previous is None or now <= previous_at:
+            return 0.0
+        elapsed = now - previous_at
+        rates = {}
+        for name, (rx, tx) in counters.items():
+            old_rx, old_tx = previous.get(name, (rx, tx))
+            # Counters can wrap or reset when an interface is recreated
+            rates[name] = (max(rx - old_rx, 0) / 1024 / elapsed, max(tx - old_tx, 0) / 1024 / elapsed)
+        self.interface_rates = rates
+        return sum(rx + tx for name, (rx, tx) in rates.items() if name != "lo")
+
+    def _scan_pid(self, pid):
+        fd_dir = self._path(str(pid), "fd")
+        inodes = set()
+        try:
+            for name in os.listdir(fd_dir):
+                try:
+                    target = os.readlink(os.path.join(fd_dir, name))
+                except OSError:
+                    continue
+                if target.startswith("socket:["):
+                    inodes.add(int(target[8:-1]))
+        except OSError:
+            # Gone, or not ours to inspect
+            pass
+        for inode in self._pid_inodes.get(pid, ()):
+            if self._inode_pid.get(inode) == pid:
+                del self._inode_pid[inode]
+        self._pid_inodes[pid] = inodes
+        for inode in inodes:
+            self._inode_pid[inode] = pid
+
+    def _refresh_index(self, wanted):
+        # Bring the inode index up to date for the inodes in `wanted`
+        pids = {int(name) for name in os.listdir(self.proc_root) if name.isdigit()}
+        for pid in [pid for pid in self._pid_inodes if pid not in pids]:
+            for inode in self._pid_inodes.pop(pid):
+                if self._inode_pid.get(inode) == pid:
+                    del self._inode_pid[inode]
+        for pid in pids:
+            if pid not in self._pid_inodes:
+                self._scan_pid(pid)
+        # Sockets of other namespaces or users never resolve; stop hunting them
+        self._unresolved &= wanted
+        missing = [inode for inode in wanted if inode not in self._inode_pid and inode not in self._unresolved]
+        if not missing:
+            return
+        # Still unresolved: a known pid opened new sockets. Revisit known pids,
+        # socket owners first, a bounded number per call.
+        if not self._rescan_order:
+            self._rescan_order = deque(sorted(pids, key=lambda pid: not self._pid_inodes.get(pid)))
+        missing = set(missing)
+        budget = self.rescan_budget
+        while self._rescan_order and budget > 0 and missing:
+            pid = self._rescan_order.popleft()
+            budget -= 1
+            if pid in pids:
+                self._scan_pid(pid)
+                missing.difference_update(self._pid_inodes[pid])
+        if missing and not self._rescan_order:
+            self._unresolved |= missing
+
+    def connections(self, limit=None):
+        # Current sockets as Connection records; addresses are decoded only for
+        # the rows returned, so huge socket tables stay cheap
+        started = time.perf_counter()
+        rows = []
+        for table, protocol in SOCKET_TABLES:
+            try:
+                with open(self._path("net", table), "rb") as file:
+                    lines = file.readlines()[1:]
+            except OSError:
+                continue
+            for line in lines:
+                fields = line.split()
+                rows.append((protocol, fields[1], fields[2], fields[3], fields[4], int(fields[9])))
+        self._refresh_index({row[5] for row in rows if row[5]})
+        # Established sockets first, the rest in table order
+        rows.sort(key=lambda row: row[3] != b"01")
+        self.socket_count = len(rows)
+        if limit is not None:
+            rows = rows[:limit]
+        result = []
+        for protocol, local, remote, state, queues, inode in rows:
+            tx_queue, rx_queue = queues.split(b":")
+            state = state.decode()
+            result.append(Connection(
+                self._inode_pid.get(inode),
+                protocol,
+                _decode_address(local.decode()),
+                _decode_address(remote.decode()),
+                TCP_STATES.get(state, state) if protocol.startswith("TCP") else ("ESTABLISHED" if state == "01" else "UNCONN"),
+                int(tx_queue, 16),
+                int(rx_queue, 16),
+                inode,
+            ))
+        self.last_duration = time.perf_counter() - started
+        return result
@@ -1,18 +1,44 @@
 # core/network.py
-import random
+# Network usage history, fed by a network collector (core.collectors)
+# through observe(); update() records the latest reading on the sample clock.
+from core.instrumentation import timed
+from core.timeseries import TimeSeries
 
 class Network:
-    def __init__(self):
-        self.network_history = []
-        
-    def update(self):
-        # Generate dummy network usage data
-        network = random.randint(0, 100)
-        self.network_history.append(network)
-        
-        # Keep only the last 20 data points
-        if len(self.network_history) > 20:
-            self.network_history.pop(0)
-    
+    def __init__(self, history_size=3600, resolutions=(1, 60)):
+        self.network_history = TimeSeries(history_size, resolutions)
+        self.rate = 0               # latest total usage
+        self.live = False           # True once a real (/proc/net) reading arrived
+        self.interface_rates = {}   # iface -> (rx KB/s, tx KB/s)
+        self.connections = []
+        self.socket_count = None    # sockets on the host; None when unknown
+
+    def observe(self, rate, interface_rates=None, connections=None, socket_count=None, live=False):
+        # A collector's sample; connections and socket_count are kept when not given
+        self.rate = rate
+        self.live = self.live or live
+        if interface_rates is not None:
+            self.interface_rates = interface_rates
+        if connections is not None:
+            self.connections = connections
+        if socket_count is not None:
+            self.socket_count = socket_count
+
+    @timed("network.update")
+    def update(self, now=None):
+        self.network_history.append(self.rate, now)
+
     def get_network_usage(self):
-        return self.network_history
+        return self.network_history.values()
+
+    def get_connections(self):
+        return self.connections
+
+    def get_socket_count(self):
+        return self.socket_count if self.socket_count is not None else len(self.connections)
+
+    def get_interface_rates(self):
+        return self.interface_rates
+
+    def get_network_rollup(self, resolution, points=None):
+        return self.network_history.rollup(resolution, points)
@@ -0,0 +1,620 @@
+# core/policies.py
+# Scheduling policies. Each policy owns its ready structure (who runs next)
+# and its CPU-share rule (how the analyzer splits the CPU among Running
+# processes). Policies register by name; the Scheduler, ResourceAnalyzer,
+# columnar store, CLI and UI all look them up here.
+#
+# Every policy keeps the process holding the CPU out of its ready structure
+# and compares it with the best waiting entry on each pick, so only the
+# running process ever changes its key and every operation is O(log n)
+# (O(1) for the FIFO ones). Removed processes are deleted lazily. Queues
+# hold pids only; `lookup` turns one back into its process when needed.
+import heapq
+import itertools
+import math
+from collections import deque
+
+import numpy as np
+
+POLICIES = {}  # name -> Policy subclass
+
+
+def register_policy(cls):
+    POLICIES[cls.name] = cls
+    return cls
+
+
+def policy_names():
+    return list(POLICIES)
+
+
+def create_policy(name, **kwargs):
+    if name not in POLICIES:
+        raise ValueError(f"Unknown scheduling policy: {name}")
+    return POLICIES[name](**kwargs)
+
+
+def get_policy(policy):
+    # Accept a policy instance or a registered name
+    return create_policy(policy) if isinstance(policy, str) else policy
+
+
+class Policy:
+    name = None
+    # Whether a dispatched Waiting process is marked Running (Round Robin
+    # never did this, so its dashboard keeps the statuses it was given)
+    dispatch_marks_running = True
+    # Whether weights() reads the policy's own state as well as its arguments;
+    # the analyzer then recomputes shares on every sample
+    stateful_weights = False
+
+    def __init__(self, quantum=2, lookup=None):
+        self.quantum = quantum
+        self.lookup = lookup      # pid -> process, e.g. a ProcessManager's get_process
+        self.running = None       # pid holding the CPU, kept out of the ready structure
+        self.slice_used = 0.0     # time `running` has had since it was dispatched
+        self._tokens = {}         # pid -> token of its live ready entry, for every live pid
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, pid):
+        return pid in self._tokens
+
+    # Ready set maintenance
+    def add(self, process, now):
+        self._push(process, now)
+
+    def extend(self, processes, now):
+        for process in processes:
+            self.add(process, now)
+
+    def remove(self, pid):
+        if self._tokens.pop(pid, None) is None:
+            return
+        if pid == self.running:
+            self.running = None
+            self.slice_used = 0.0
+        stale = self._entry_count() - len(self._tokens)
+        if stale > 64 and stale > 2 * len(self._tokens):
+            self._compact()
+
+    def reprioritize(self, process):
+        # The process's priority changed; only priority-keyed policies care
+        pass
+
+    def reprioritize_many(self, processes):
+        for process in processes:
+            self.reprioritize(process)
+
+    def _live(self, token, pid):
+        return self._tokens.get(pid) == token
+
+    # Dispatching
+    def pick(self, now):
+        # The pid that runs the next slice, or None when nothing is ready
+        running = self.running
+        if running is not None and not self._should_preempt(self.lookup(running), now):
+            return running
+        candidate = self._pop(now)
+        if candidate is None:
+            return running
+        if running is not None:
+            self._requeue(self.lookup(running), now)
+        self.running = candidate
+        self.slice_used = 0.0
+        return candidate
+
+    def charge(self, process, elapsed, now):
+        # `process` held the CPU for `elapsed` seconds
+        self.slice_used += elapsed
+
+    def steal(self, now, accept, limit=8):
+        # Hand over a waiting process for which accept(process) holds, looking
+        # at most `limit` entries deep; returns it (now removed) or None
+        rejected = []
+        stolen = None
+        for _ in range(limit):
+            pid = self._pop(now)
+            if pid is None:
+                break
+            process = self.lookup(pid)
+            if accept(process):
+                stolen = process
+                break
+            rejected.append(process)
+        for process in rejected:
+            self._push(process, now)
+        if stolen is not None:
+            self.remove(stolen.pid)
+        return stolen
+
+    def _requeue(self, process, now):
+        # The running process lost the CPU but stays ready
+        self._push(process, now)
+
+    def state(self):
+        # Per-process state beyond the queue order, as plain data for
+        # core.session; handed back to restore()
+        return None
+
+    def restore(self, waiting, running, slice_used, now, state=None):
+        # Refills an empty policy as saved by core.session: `waiting` in
+        # dispatch order, the process holding the CPU (None when idle) and
+        # what state() returned
+        if running is not None:
+            # Dispatched as pick() does it: queued alone, then popped
+            self.add(running, now)
+            self.running = self._pop(now)
+            self.slice_used = slice_used
+        self.extend(waiting, now)
+
+    # Display / stateless ordering
+    def queue(self):
+        # Live pids in dispatch order, the running one first
+        head = [self.running] if self.running is not None else []
+        return head + self._waiting()
+
+    def order(self, processes):
+        # Stateless ordering of a process list: active by policy, then the rest
+        active = [p for p in processes if p.status in ("Running", "Waiting")]
+        inactive = [p for p in processes if p.status not in ("Running", "Waiting")]
+        active.sort(key=self._sort_key)
+        if self.dispatch_marks_running and active and active[0].status == "Waiting":
+            active[0].status = "Running"
+        return active + inactive
+
+    # CPU shares
+    def weights(self, pids, priority, start_time):
+        # Relative CPU weight of each Running process (NumPy arrays in, out)
+        return np.ones(len(pids))
+
+    def share(self, pids, cpu_usage, priority, start_time):
+        # CPU% each Running process gets: its weighted share of 100, capped by demand
+        weights = np.asarray(self.weights(pids, priority, start_time), dtype=np.float64)
+        total = weights.sum()
+        if total <= 0:
+            return np.zeros(len(pids))
+        return np.minimum(cpu_usage, 100 * weights / total)
+
+    def _one_hot(self, count, index):
+        weights = np.zeros(count)
+        if count:
+            weights[index] = 1.0
+        return weights
+
+    # Implemented by the ready structures below
+    def _push(self, process, now):
+        raise NotImplementedError
+
+    def _pop(self, now):
+        raise NotImplementedError
+
+    def _should_preempt(self, process, now):
+        raise NotImplementedError
+
+    def _waiting(self):
+        raise NotImplementedError
+
+    def _entry_count(self):
+        raise NotImplementedError
+
+    def _compact(self):
+        raise NotImplementedError
+
+    def _sort_key(self, process):
+        return 0
+
+
+class _HeapPolicy(Policy):
+    # Ready heap of (key, token, pid); smallest key runs first
+    preemptive = True
+
+    def __init__(self, quantum=2, lookup=None):
+        super().__init__(quantum, lookup)
+        self._heap = []
+
+    def _key(self, process):
+        raise NotImplementedError
+
+    def _sort_key(self, process):
+        return self._key(process)
+
+    def _push(self, process, now):
+        token = next(self._counter)
+        self._tokens[process.pid] = token
+        heapq.heappush(self._heap, (self._key(process), token, process.pid))
+
+    def extend(self, processes, now):
+        processes = list(processes)
+        if len(processes) * 8 < len(self._heap):
+            # A few into a big heap: pushing each is cheaper than re-heapifying
+            for process in processes:
+                self._push(process, now)
+            return
+        for process in processes:
+            token = next(self._counter)
+            self._tokens[process.pid] = token
+            self._heap.append((self._key(process), token, process.pid))
+        heapq.heapify(self._heap)
+
+    def _top(self):
+        heap = self._heap
+        while heap and not self._live(heap[0][1], heap[0][2]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _pop(self, now):
+        if self._top() is None:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    def _should_preempt(self, process, now):
+        top = self._top()
+        return top is not None and self.preemptive and top[0] < self._key(process)
+
+    def _waiting(self):
+        entries = sorted(entry for entry in self._heap if self._live(entry[1], entry[2]))
+        return [entry[2] for entry in entries if entry[2] != self.running]
+
+    def _entry_count(self):
+        return len(self._heap)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._live(entry[1], entry[2])]
+        heapq.heapify(self._heap)
+
+
+@register_policy
+class RoundRobinPolicy(Policy):
+    name = "Round Robin"
+    dispatch_marks_running = False
+
+    def __init__(self, quantum=2, lookup=None):
+        super().__init__(quantum, lookup)
+        self._ready = deque()  # (token, pid)
+
+    def _push(self, process, now):
+        token = next(self._counter)
+        self._tokens[process.pid] = token
+        self._ready.append((token, process.pid))
+
+    def _pop(self, now):
+        ready = self._ready
+        while ready:
+            token, pid = ready.popleft()
+            if self._live(token, pid):
+                return pid
+        return None
+
+    def _should_preempt(self, process, now):
+        # The head keeps the CPU until its quantum is used up
+        return self.slice_used >= self.quantum
+
+    def _waiting(self):
+        return [pid for token, pid in self._ready if self._live(token, pid) and pid != self.running]
+
+    def _entry_count(self):
+        return len(self._ready)
+
+    def _compact(self):
+        self._ready = deque(entry for entry in self._ready if self._live(*entry))
+
+    def order(self, processes):
+        # Stateless rotation: move the first process to the end
+        return processes[1:] + processes[:1] if processes else []
+
+
+@register_policy
+class PriorityPolicy(_HeapPolicy):
+    name = "Priority"
+
+    def _key(self, process):
+        # Higher priority value = higher priority
+        return -process.priority
+
+    def reprioritize(self, process):
+        # Queue it again under the new key; the old entry goes stale
+        if process.pid in self._tokens and process.pid != self.running:
+            self._push(process, None)
+
+    def reprioritize_many(self, processes):
+        queued = [p for p in processes if p.pid in self._tokens and p.pid != self.running]
+        if len(queued) * 8 < len(self._heap):
+            for process in queued:
+                self._push(process, None)
+            return
+        # Many at once: new entries for all of them, then one O(n) rebuild
+        # that also drops the entries they replace
+        for process in queued:
+            token = next(self._counter)
+            self._tokens[process.pid] = token
+            self._heap.append((self._key(process), token, process.pid))
+        self._compact()
+
+    def weights(self, pids, priority, start_time):
+        return priority.astype(np.float64)
+
+
+@register_policy
+class FirstComeFirstServedPolicy(_HeapPolicy):
+    name = "First Come First Served"
+
+    def _key(self, process):
+        return process.start_time if process.start_time is not None else math.inf
+
+    def weights(self, pids, priority, start_time):
+        # Give all CPU to the first process in the queue
+        return self._one_hot(len(pids), np.argmin(start_time) if len(pids) else 0)
+
+
+def _remaining(process):
+    # Processes without a burst_time are treated as endless jobs
+    remaining = getattr(process, "remaining_time", None)
+    return math.inf if remaining is None else remaining
+
+
+@register_policy
+class ShortestJobFirstPolicy(_HeapPolicy):
+    # Non-preemptive: the shortest job runs to completion
+    name = "Shortest Job First"
+    preemptive = False
+    stateful_weights = True   # the running job gets the CPU
+
+    def _key(self, process):
+        return _remaining(process)
+
+    def weights(self, pids, priority, start_time):
+        # All CPU to the job being run, else to the earliest arrival
+        if self.running is not None:
+            index = np.flatnonzero(pids == self.running)
+            if len(index):
+                return self._one_hot(len(pids), index[0])
+        return self._one_hot(len(pids), np.argmin(start_time) if len(pids) else 0)
+
+
+@register_policy
+class ShortestRemainingTimeFirstPolicy(ShortestJobFirstPolicy):
+    # Preemptive SJF: a shorter arrival takes the CPU from the running job.
+    # Only the running job's remaining time shrinks, so the heap stays valid.
+    name = "Shortest Remaining Time First"
+    preemptive = True
+
+
+@register_policy
+class MultilevelFeedbackQueuePolicy(Policy):
+    # FIFO per level, level 0 first. New and returning processes start at 0;
+    # using a whole quantum (quantum * 2**level) drops a level. Aging: the
+    # oldest entry of a lower level moves up one level once it has waited
+    # aging_interval, and each level is FIFO so only its front needs checking.
+    name = "Multilevel Feedback Queue"
+    stateful_weights = True   # weights follow the levels
+
+    def __init__(self, quantum=2, levels=3, aging_interval=None, lookup=None):
+        super().__init__(quantum, lookup)
+        self.levels = levels
+        self._aging_interval = aging_interval  # None: follows the quantum
+        self._queues = [deque() for _ in range(levels)]  # (token, pid, enqueued_at)
+        self._level = {}  # pid -> current level
+
+    @property
+    def aging_interval(self):
+        # Derived from the current quantum unless set, so Scheduler.quantum carries over
+        if self._aging_interval is not None:
+            return self._aging_interval
+        return 10 * self.quantum * self.levels
+
+    @aging_interval.setter
+    def aging_interval(self, aging_interval):
+        self._aging_interval = aging_interval
+
+    def add(self, process, now):
+        self._level[process.pid] = 0
+        super().add(process, now)
+
+    def state(self):
+        # [pid, level, enqueued_at] per live process; the running one is not queued
+        enqueued = {pid: at for queue in self._queues for token, pid, at in queue if self._live(token, pid)}
+        return [[pid, level, enqueued.get(pid)] for pid, level in self._level.items()]
+
+    def restore(self, waiting, running, slice_used, now, state=None):
+        super().restore(waiting, running, slice_used, now)
+        if not state:
+            return
+        # Everyone was queued at level 0 in dispatch order; move them back
+        saved = {pid: (level, at) for pid, level, at in state}
+        queues = [deque() for _ in range(self.levels)]
+        for token, pid, at in self._queues[0]:
+            if self._live(token, pid):
+                level, enqueued_at = saved.get(pid, (0, None))
+                queues[level].append((token, pid, at if enqueued_at is None else enqueued_at))
+        self._queues = queues
+        for pid, (level, _) in saved.items():
+            if pid in self._level:
+                self._level[pid] = level
+
+    def remove(self, pid):
+        self._level.pop(pid, None)
+        super().remove(pid)
+
+    def _push(self, process, now):
+        token = next(self._counter)
+        self._tokens[process.pid] = token
+        self._queues[self._level[process.pid]].append((token, process.pid, now))
+
+    def _front(self, level):
+        queue = self._queues[level]
+        while queue and not self._live(queue[0][0], queue[0][1]):
+            queue.popleft()
+        return queue[0] if queue else None
+
+    def _age(self, now):
+        if now is None:
+            return
+        aging_interval = self.aging_interval
+        for level in range(1, self.levels):
+            while True:
+                front = self._front(level)
+                if front is None or now - front[2] < aging_interval:
+                    break
+                self._queues[level].popleft()
+                self._level[front[1]] = level - 1
+                self._queues[level - 1].append((front[0], front[1], now))
+
+    def _best_level(self):
+        for level in range(self.levels):
+            if self._front(level) is not None:
+                return level
+        return None
+
+    def _pop(self, now):
+        level = self._best_level()
+        if level is None:
+            return None
+        return self._queues[level].popleft()[1]
+
+    def pick(self, now):
+        self._age(now)
+        return super().pick(now)
+
+    def _slice(self, pid):
+        return self.quantum * 2 ** self._level[pid]
+
+    def _should_preempt(self, process, now):
+        best = self._best_level()
+        if best is None:
+            return False
+        level = self._level[process.pid]
+        return best < level or self.slice_used >= self._slice(process.pid)
+
+    def _requeue(self, process, now):
+        # A used-up quantum demotes; a preempted process keeps its level
+        pid = process.pid
+        if self.slice_used >= self._slice(pid):
+            self._level[pid] = min(self._level[pid] + 1, self.levels - 1)
+        self._push(process, now)
+
+    def _waiting(self):
+        return [pid for queue in self._queues for token, pid, _ in queue
+                if self._live(token, pid) and pid != self.running]
+
+    def _entry_count(self):
+        return sum(len(queue) for queue in self._queues)
+
+    def _compact(self):
+        self._queues = [deque(entry for entry in queue if self._live(entry[0], entry[1]))
+                        for queue in self._queues]
+
+    def _sort_key(self, process):
+        return self._level.get(process.pid, 0)
+
+    def weights(self, pids, priority, start_time):
+        # Higher levels (interactive work) get twice the share of the next
+        levels = np.fromiter((self._level.get(pid, 0) for pid in pids.tolist()), dtype=np.float64, count=len(pids))
+        return 2.0 ** (self.levels - 1 - levels)
+
+
+def _cfs_weight(priority):
+    # Priority 5 is nice 0 (weight 1024); each step is ~25% more or less CPU
+    return 1024 * 1.25 ** (priority - 5)
+
+
+@register_policy
+class CompletelyFairPolicy(_HeapPolicy):
+    # Run the process with the least virtual runtime. vruntime grows by
+    # elapsed * 1024 / weight, so heavier processes age slower and get more
+    # CPU. The running process is preempted once it has had its slice of the
+    # target latency and someone else is behind it.
+    name = "Completely Fair"
+
+    def __init__(self, quantum=2, latency=None, min_granularity=None, lookup=None):
+        super().__init__(quantum, lookup)
+        self._latency = latency                  # None: follows the quantum
+        self._min_granularity = min_granularity  # None: follows the quantum
+        self.min_vruntime = 0.0
+        self._vruntime = {}       # pid -> virtual runtime
+        self._weight = {}         # pid -> weight it was queued with
+        self._total_weight = 0.0
+
+    # Derived from the current quantum unless set, so Scheduler.quantum carries over
+    @property
+    def latency(self):
+        return self._latency if self._latency is not None else 3 * self.quantum
+
+    @latency.setter
+    def latency(self, latency):
+        self._latency = latency
+
+    @property
+    def min_granularity(self):
+        return self._min_granularity if self._min_granularity is not None else self.quantum / 4
+
+    @min_granularity.setter
+    def min_granularity(self, min_granularity):
+        self._min_granularity = min_granularity
+
+    def _track(self, process):
+        weight = _cfs_weight(process.priority)
+        self._total_weight += weight - self._weight.get(process.pid, 0.0)
+        self._weight[process.pid] = weight
+        # Newcomers start level with the queue instead of owing or being owed time
+        self._vruntime.setdefault(process.pid, self.min_vruntime)
+
+    def add(self, process, now):
+        self._track(process)
+        super().add(process, now)
+
+    def state(self):
+        return {"min_vruntime": self.min_vruntime, "total_weight": self._total_weight,
+                "vruntime": [[pid, value] for pid, value in self._vruntime.items()]}
+
+    def restore(self, waiting, running, slice_used, now, state=None):
+        if state:
+            # _track() keeps a known vruntime, so set them before queueing
+            self.min_vruntime = state["min_vruntime"]
+            self._vruntime.update((pid, value) for pid, value in state["vruntime"])
+        super().restore(waiting, running, slice_used, now)
+        if state:
+            # The running sum as saved, rounding included, for the same timeslices
+            self._total_weight = state["total_weight"]
+
+    def extend(self, processes, now):
+        processes = list(processes)
+        for process in processes:
+            self._track(process)
+        super().extend(processes, now)
+
+    def remove(self, pid):
+        self._total_weight -= self._weight.pop(pid, 0.0)
+        self._vruntime.pop(pid, None)
+        super().remove(pid)
+
+    def reprioritize(self, process):
+        if process.pid in self._tokens:
+            self._track(process)
+
+    def _key(self, process):
+        return self._vruntime.get(process.pid, self.min_vruntime)
+
+    def _timeslice(self, pid):
+        if self._total_weight <= 0:
+            return self.latency
+        return max(self.min_granularity, self.latency * self._weight[pid] / self._total_weight)
+
+    def _should_preempt(self, process, now):
+        top = self._top()
+        if top is None or self.slice_used < self._timeslice(process.pid):
+            return False
+        return top[0] < self._vruntime[process.pid]
+
+    def charge(self, process, elapsed, now):
+        super().charge(process, elapsed, now)
+        pid = process.pid
+        self._vruntime[pid] += elapsed * 1024 / self._weight[pid]
+        top = self._top()
+        lowest = self._vruntime[pid] if top is None else min(top[0], self._vruntime[pid])
+        self.min_vruntime = max(self.min_vruntime, lowest)
+
+    def weights(self, pids, priority, start_time):
+        return _cfs_weight(priority.astype(np.float64))
@@ -0,0 +1,252 @@
+# core/proc_collector.py
+# Live process data from Linux /proc. CPU% comes from tick deltas between
+# samples. A cheap probe file (/proc/[pid]/schedstat) is kept open per pid and
+# stat/statm are only re-read and re-parsed when the probe shows the process
+# actually ran; a rolling slice of pids is re-parsed anyway each refresh to
+# catch changes that use no CPU (renice, SIGSTOP).
+#
+# Reading and applying are split: sample() only touches /proc, so it can run
+# on a collector thread, and apply_process_records() brings a ProcessManager
+# in line with a sample on the simulation thread.
+import os
+import time
+
+from core.process_manager import Process
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# /proc/[pid]/stat state letters mapped onto the simulator's statuses
+STOPPED_STATES = "TtZXx"
+
+
+def _nice_to_priority(nice):
+    # nice -20 (most favoured) .. 19 maps onto priority 10 .. 1
+    return max(1, min(10, round(10 - (nice + 20) * 9 / 39)))
+
+
+def read_cpu_times(path):
+    # [(busy, total)] jiffies from /proc/stat: the whole host, then each core
+    cpu_times = []
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.startswith(b"cpu"):
+                break
+            fields = [int(value) for value in line.split()[1:]]
+            idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+            total = sum(fields[:8])
+            cpu_times.append((total - idle, total))
+    return cpu_times
+
+
+def cpu_percents(cpu_times, previous):
+    # Busy % of each /proc/stat line between two read_cpu_times() results
+    percents = []
+    for (busy, total), (old_busy, old_total) in zip(cpu_times, previous):
+        delta = total - old_total
+        percents.append(100.0 * (busy - old_busy) / delta if delta > 0 else 0.0)
+    return percents
+
+
+def read_memory(path):
+    # (MemTotal, MemAvailable) in bytes from /proc/meminfo; None when missing
+    total = available = None
+    with open(path, "rb") as file:
+        for line in file:
+            if line.startswith(b"MemTotal:"):
+                total = int(line.split()[1]) * 1024
+            elif line.startswith(b"MemAvailable:"):
+                available = int(line.split()[1]) * 1024
+            if total is not None and available is not None:
+                break
+    return total, available
+
+
+def apply_process_records(process_manager, records, applied):
+    # Brings process_manager in line with a ProcCollector.sample() result.
+    # `applied` is the result applied last time: only records that differ
+    # from it are written, and its pids missing from `records` are removed.
+    # Returns `records`, to pass as `applied` next time.
+    for pid in applied.keys() - records.keys():
+        process_manager.remove_process(pid)
+    get_process = process_manager.get_process
+    for pid, record in records.items():
+        if applied.get(pid) == record:
+            continue
+        name, status, cpu_usage, memory_usage, priority, start_time = record
+        process = get_process(pid)
+        if process is None:
+            process_manager.add_process(Process(pid, name, status, cpu_usage, memory_usage, priority, start_time))
+            continue
+        process.name = name
+        process.cpu_usage = cpu_usage
+        process.memory_usage = memory_usage
+        process.priority = priority
+        process.status = status
+    return records
+
+
+class ProcCollector:
+    def __init__(self, proc_root="/proc", max_open_files=None, full_scan_every=30):
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        if max_open_files is None:
+            # Leave most of the descriptor budget for the rest of the app
+            limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0] if resource else 1024
+            max_open_files = max(0, limit // 2 - 64)
+        self.max_open_files = max_open_files
+        self.full_scan_every = full_scan_every
+        # schedstat is a third of the cost of stat to read; fall back if absent
+        self._probe_name = "schedstat" if os.path.exists(self._path("self", "schedstat")) else "stat"
+        self._collections = 0
+        self.boot_time = self._read_boot_time()
+        self.memory_total = self._read_memory_total()
+        self.cpu_percent = 0.0         # whole-host CPU% over the last interval
+        self.per_cpu_percent = []      # the same per core
+        self.memory_percent = 0.0
+        self._fds = {}                 # pid -> open fd on the probe file
+        self._raw = {}                 # pid -> last probe bytes
+        self._ticks = {}               # pid -> utime + stime at the last sample
+        self._records = {}             # pid -> (name, status, cpu_usage, memory_usage, priority, start_time)
+        self._cpu_times = None         # [(busy, total)] per line of /proc/stat
+        self.parsed = 0                # pids parsed by the last sample()
+        self.last_duration = 0.0
+
+    def _path(self, *parts):
+        return os.path.join(self.proc_root, *parts)
+
+    def _read_boot_time(self):
+        with open(self._path("stat"), "rb") as file:
+            for line in file:
+                if line.startswith(b"btime"):
+                    return int(line.split()[1])
+        return 0
+
+    def _read_memory_total(self):
+        return read_memory(self._path("meminfo"))[0] or 0
+
+    def _read_host(self):
+        # Returns the total jiffies elapsed since the previous sample
+        cpu_times = read_cpu_times(self._path("stat"))
+        previous, self._cpu_times = self._cpu_times, cpu_times
+        if previous is None:
+            return 0
+        percents = cpu_percents(cpu_times, previous)
+        self.cpu_percent = percents[0] if percents else 0.0
+        self.per_cpu_percent = percents[1:]
+        available = read_memory(self._path("meminfo"))[1]
+        if available is not None and self.memory_total:
+            self.memory_percent = 100.0 * (self.memory_total - available) / self.memory_total
+        return cpu_times[0][1] - previous[0][1]
+
+    def _probe(self, pid):
+        fd = self._fds.get(pid)
+        if fd is None:
+            fd = os.open(self._path(str(pid), self._probe_name), os.O_RDONLY)
+            if len(self._fds) < self.max_open_files:
+                self._fds[pid] = fd
+            else:
+                try:
+                    return os.pread(fd, 4096, 0)
+                finally:
+                    os.close(fd)
+        return os.pread(fd, 4096, 0)
+
+    def _read_stat(self, pid):
+        with open(self._path(str(pid), "stat"), "rb") as file:
+            return file.read()
+
+    def _read_rss(self, pid):
+        with open(self._path(str(pid), "statm"), "rb") as file:
+            return int(file.read().split()[1]) * self.page_size
+
+    def _forget(self, pid):
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+        self._raw.pop(pid, None)
+        self._ticks.pop(pid, None)
+        self._records.pop(pid, None)
+
+    def close(self):
+        for pid in list(self._fds):
+            self._forget(pid)
+
+    def sample(self):
+        # {pid: (name, status, cpu_usage, memory_usage, priority, start_time)}
+        # for every process on the host. Records of processes that did not
+        # change are the same as last time. Touches no ProcessManager.
+        started = time.perf_counter()
+        elapsed_jiffies = self._read_host()
+        pids = set()
+        for name in os.listdir(self.proc_root):
+            if name.isdigit():
+                pids.add(int(name))
+
+        for pid in [pid for pid in self._raw if pid not in pids]:
+            self._forget(pid)
+
+        self._collections += 1
+        every = self.full_scan_every
+        phase = self._collections % every if every else 0
+        last_raw = self._raw
+        records = self._records
+        parsed = 0
+        for pid in pids:
+            try:
+                raw = self._probe(pid)
+            except OSError:
+                # The process exited between listdir and read
+                self._forget(pid)
+                continue
+            rescan = every and pid % every == phase
+            if raw == last_raw.get(pid) and not rescan:
+                # Did not run for the whole interval
+                record = records.get(pid)
+                if record is not None and record[2]:
+                    name, status, _, memory_usage, priority, start_time = record
+                    records[pid] = (name, "Waiting" if status == "Running" else status, 0.0,
+                                    memory_usage, priority, start_time)
+                continue
+            last_raw[pid] = raw
+            parsed += 1
+            try:
+                records[pid] = self._parse(pid, self._read_stat(pid), elapsed_jiffies)
+            except (OSError, ValueError, IndexError):
+                self._forget(pid)
+        self.parsed = parsed
+        self.last_duration = time.perf_counter() - started
+        return dict(records)
+
+    def _parse(self, pid, raw, elapsed_jiffies):
+        line = raw.decode("utf-8", "replace")
+        # The command name is in parentheses and may itself contain ") "
+        open_paren = line.index("(")
+        close_paren = line.rindex(")")
+        name = line[open_paren + 1:close_paren]
+        fields = line[close_paren + 2:].split()
+        state = fields[0]
+        ticks = int(fields[11]) + int(fields[12])
+        nice = int(fields[16])
+        start_time = self.boot_time + int(fields[19]) / self.clock_ticks
+
+        previous = self._ticks.get(pid)
+        self._ticks[pid] = ticks
+        if previous is None or elapsed_jiffies <= 0:
+            cpu = 0.0
+        else:
+            # Share of the whole host, so the per-process numbers add up to cpu_percent
+            cpu = min(100.0, 100.0 * (ticks - previous) / elapsed_jiffies)
+        rss = self._read_rss(pid)
+        memory = 100.0 * rss / self.memory_total if self.memory_total else 0.0
+
+        if state in STOPPED_STATES:
+            status = "Stopped"
+        elif state == "R" or cpu > 0:
+            status = "Running"
+        else:
+            status = "Waiting"
+        return (name, status, round(cpu, 2), round(memory, 2), _nice_to_priority(nice), start_time)
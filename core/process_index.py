@@ -0,0 +1,110 @@
+# core/process_index.py
+# Read-only columnar index over a process list for the process table: filter,
+# search, sort and paginate in NumPy and hand back only the rows of one page.
+# Built once per snapshot and shared by every session reading it; sort
+# orders are computed on first use per column and then reused.
+import numpy as np
+
+# Sortable columns: table label -> index column
+SORT_COLUMNS = {
+    "PID": "pid",
+    "Name": "name",
+    "Status": "status",
+    "CPU Usage (%)": "cpu_usage",
+    "Memory Usage (%)": "memory_usage",
+    "Priority": "priority",
+}
+
+
+class ProcessIndex:
+    def __init__(self, processes):
+        if hasattr(processes, "status_names"):
+            # A core.runner.ProcessTable: its columns are taken as they are
+            self.processes = processes
+            self.pid = processes.pid.astype(np.int64)
+            self.cpu_usage = processes.cpu_usage.astype(np.float64)
+            self.memory_usage = processes.memory_usage.astype(np.float64)
+            self.priority = processes.priority.astype(np.int64)
+            self.name = np.array(processes.names, dtype=str)
+            status_names = np.array(processes.status_names, dtype=str)
+            statuses, self.status = np.unique(status_names[processes.status], return_inverse=True)
+        else:
+            processes = tuple(processes)
+            count = len(processes)
+            self.processes = processes
+            self.pid = np.fromiter((p.pid for p in processes), dtype=np.int64, count=count)
+            self.cpu_usage = np.fromiter((p.cpu_usage for p in processes), dtype=np.float64, count=count)
+            self.memory_usage = np.fromiter((p.memory_usage for p in processes), dtype=np.float64, count=count)
+            self.priority = np.fromiter((p.priority for p in processes), dtype=np.int64, count=count)
+            self.name = np.array([p.name for p in processes], dtype=str)
+            statuses, self.status = np.unique(np.array([p.status for p in processes], dtype=str),
+                                              return_inverse=True)
+        self.statuses = statuses.tolist()
+        self._lower_names = None
+        self._pid_text = None
+        self._orders = {}    # column -> stable ascending argsort
+
+    def __len__(self):
+        return len(self.processes)
+
+    def _order(self, column):
+        order = self._orders.get(column)
+        if order is None:
+            order = self._orders[column] = np.argsort(getattr(self, column), kind="stable")
+        return order
+
+    def _names(self):
+        if self._lower_names is None:
+            self._lower_names = np.char.lower(self.name)
+        return self._lower_names
+
+    def _pids(self):
+        if self._pid_text is None:
+            self._pid_text = self.pid.astype(str)
+        return self._pid_text
+
+    def mask(self, search=None, statuses=None, pid_min=None, pid_max=None, min_cpu=None):
+        # Rows matching every given filter; `search` is a case-insensitive
+        # name substring
+        mask = np.ones(len(self.processes), dtype=bool)
+        if search:
+            mask &= np.char.find(self._names(), search.lower()) >= 0
+        if statuses is not None:
+            codes = [self.statuses.index(status) for status in statuses if status in self.statuses]
+            mask &= np.isin(self.status, codes)
+        if pid_min is not None:
+            mask &= self.pid >= pid_min
+        if pid_max is not None:
+            mask &= self.pid <= pid_max
+        if min_cpu:
+            mask &= self.cpu_usage >= min_cpu
+        return mask
+
+    def pids(self, search=None, statuses=None, pid_min=None, pid_max=None, min_cpu=None):
+        # Pids of every matching row, for bulk operations
+        return self.pid[self.mask(search, statuses, pid_min, pid_max, min_cpu)]
+
+    def query(self, search=None, statuses=None, pid_min=None, pid_max=None, min_cpu=None,
+              sort_by="pid", descending=False, offset=0, limit=50):
+        # (matching count, processes of the requested page in sort order)
+        mask = self.mask(search, statuses, pid_min, pid_max, min_cpu)
+        order = self._order(sort_by)
+        if descending:
+            order = order[::-1]
+        positions = order[mask[order]]
+        page = positions[offset:offset + limit]
+        return len(positions), [self.processes[i] for i in page.tolist()]
+
+    def suggest(self, text, limit=20):
+        # Up to `limit` processes whose pid starts with, or whose name
+        # contains, `text`; pid matches first
+        text = text.strip()
+        if not text:
+            return [self.processes[i] for i in self._order("pid")[:limit].tolist()]
+        if text.isdigit():
+            by_pid = np.flatnonzero(np.char.startswith(self._pids(), text))
+        else:
+            by_pid = np.empty(0, dtype=np.int64)
+        by_name = np.flatnonzero(np.char.find(self._names(), text.lower()) >= 0)
+        matches = np.concatenate([by_pid, np.setdiff1d(by_name, by_pid, assume_unique=True)])
+        return [self.processes[i] for i in matches[:limit].tolist()]
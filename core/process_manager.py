@@ -1,60 +1,231 @@
 # core/process_manager.py
 # core/process_manager.py (additional class)
+import fnmatch
+import re
 import time
-import json
-import os
 class ProcessManager:
     def __init__(self):
-        self.processes = []
+        self._processes = {}   # pid -> Process, kept in insertion order
+        self._by_status = {}   # status -> {pid: Process} index
+        self._process_list = None  # cached list view for get_processes()
+        self._listeners = []   # callbacks notified as listener(event, process, old)
+
+    @property
+    def processes(self):
+        return self.get_processes()
+
+    @processes.setter
+    def processes(self, processes):
+        # Replacing the whole list re-indexes everything in the given order
+        processes = list(processes)
+        for pid in list(self._processes):
+            self.remove_process(pid)
+        for process in processes:
+            self.add_process(process)
 
     def add_process(self, process):
-        self.processes.append(process)
-        
+        if process.pid in self._processes:
+            self.remove_process(process.pid)
+        self._processes[process.pid] = process
+        self._by_status.setdefault(process.status, {})[process.pid] = process
+        process._manager = self
+        self._process_list = None
+        self._notify("add", process)
+
     def remove_process(self, pid):
-        self.processes = [p for p in self.processes if p.pid != pid]
-        
+        process = self._processes.pop(pid, None)
+        if process is None:
+            return
+        bucket = self._by_status.get(process.status)
+        if bucket is not None:
+            bucket.pop(pid, None)
+        process._manager = None
+        self._process_list = None
+        self._notify("remove", process)
+
     def get_process(self, pid):
-        for process in self.processes:
-            if process.pid == pid:
-                return process
-        return None
-        
+        return self._processes.get(pid)
+
     def get_processes(self):
-        return self.processes
-        
+        if self._process_list is None:
+            self._process_list = list(self._processes.values())
+        return self._process_list
+
+    def get_processes_by_status(self, *statuses):
+        # O(k) in the number of matching processes, no full scan
+        if len(statuses) == 1:
+            return list(self._by_status.get(statuses[0], {}).values())
+        result = []
+        for status in statuses:
+            result.extend(self._by_status.get(status, {}).values())
+        return result
+
+    def count_by_status(self, status):
+        return len(self._by_status.get(status, ()))
+
+    def get_statuses(self):
+        return [status for status, bucket in self._by_status.items() if bucket]
+
+    def __len__(self):
+        return len(self._processes)
+
+    def __contains__(self, pid):
+        return pid in self._processes
+
+    def subscribe(self, listener):
+        # listener(event, process, old) with event in add/remove/status/priority;
+        # the bulk operations send remove_many/status_many/priority_many with
+        # a list of processes and a list of old values instead
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, process, old=None):
+        for listener in self._listeners:
+            listener(event, process, old)
+
     def update_process_status(self, pid, status):
         process = self.get_process(pid)
         if process:
             process.status = status
-    # Add to core/process_manager.py
-def load_dummy_processes(self):
-    try:
-        if os.path.exists('data/dummy_processes.json'):
-            with open('data/dummy_processes.json', 'r') as file:
-                data = json.load(file)
-                for proc_data in data['processes']:
-                    process = Process(
-                        proc_data['pid'],
-                        proc_data['name'],
-                        proc_data['status'],
-                        proc_data['cpu_usage'],
-                        proc_data['memory_usage'],
-                        proc_data['priority']
-                    )
-                    self.add_process(process)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error loading dummy processes: {e}")
-        return False
+
+    # Bulk operations: one pass over the targets and one notification, so
+    # changing k processes costs O(k) (a `where` without pids scans them all)
+    def select(self, pids=None, where=None):
+        # Processes with a pid in `pids` (default: all) for which where(process) holds
+        if pids is None:
+            if isinstance(where, ProcessFilter) and where.statuses is not None:
+                candidates = self.get_processes_by_status(*where.statuses)
+            else:
+                candidates = self._processes.values()
+        else:
+            processes = self._processes
+            candidates = [processes[pid] for pid in dict.fromkeys(pids) if pid in processes]
+        if where is None:
+            return list(candidates)
+        return [p for p in candidates if where(p)]
+
+    def update_processes_status(self, status, pids=None, where=None):
+        # Returns how many processes changed status
+        changed = []
+        old_statuses = []
+        target = self._by_status.setdefault(status, {})
+        for process in self.select(pids, where):
+            old_status = process._status
+            if old_status == status:
+                continue
+            self._by_status[old_status].pop(process.pid, None)
+            target[process.pid] = process
+            process._status = status
+            changed.append(process)
+            old_statuses.append(old_status)
+        if changed:
+            self._notify("status_many", changed, old_statuses)
+        return len(changed)
+
+    def update_processes_priority(self, priority, pids=None, where=None):
+        changed = []
+        old_priorities = []
+        for process in self.select(pids, where):
+            if process._priority == priority:
+                continue
+            old_priorities.append(process._priority)
+            process._priority = priority
+            changed.append(process)
+        if changed:
+            self._notify("priority_many", changed, old_priorities)
+        return len(changed)
+
+    def remove_processes(self, pids=None, where=None):
+        removed = self.select(pids, where)
+        for process in removed:
+            del self._processes[process.pid]
+            bucket = self._by_status.get(process.status)
+            if bucket is not None:
+                bucket.pop(process.pid, None)
+            process._manager = None
+        if removed:
+            self._process_list = None
+            self._notify("remove_many", removed)
+        return len(removed)
+
+    def _status_changed(self, process, old_status):
+        # Called by Process.status setter so the status index never goes stale
+        bucket = self._by_status.get(old_status)
+        if bucket is not None:
+            bucket.pop(process.pid, None)
+        self._by_status.setdefault(process.status, {})[process.pid] = process
+        self._notify("status", process, old_status)
+
+    def _priority_changed(self, process, old_priority):
+        self._notify("priority", process, old_priority)
+
+class ProcessFilter:
+    # Predicate for the bulk operations; every given condition must hold.
+    # `name` is a shell-style pattern such as "chrome*"; bounds are exclusive.
+    def __init__(self, name=None, statuses=None, priority_below=None, priority_above=None,
+                 cpu_below=None, cpu_above=None):
+        self.name = name
+        self.statuses = tuple(statuses) if statuses is not None else None
+        self.priority_below = priority_below
+        self.priority_above = priority_above
+        self.cpu_below = cpu_below
+        self.cpu_above = cpu_above
+        self.name_match = re.compile(fnmatch.translate(name)).match if name is not None else None
+
+    def __call__(self, process):
+        if self.statuses is not None and process.status not in self.statuses:
+            return False
+        if self.priority_below is not None and not process.priority < self.priority_below:
+            return False
+        if self.priority_above is not None and not process.priority > self.priority_above:
+            return False
+        if self.cpu_below is not None and not process.cpu_usage < self.cpu_below:
+            return False
+        if self.cpu_above is not None and not process.cpu_usage > self.cpu_above:
+            return False
+        return self.name_match is None or self.name_match(process.name) is not None
+
 # core/process_manager.py (update to Process class)
 
 class Process:
-    def __init__(self, pid, name, status, cpu_usage=0, memory_usage=0, priority=5, start_time=None):
+    def __init__(self, pid, name, status, cpu_usage=0, memory_usage=0, priority=5, start_time=None, burst_time=None,
+                 affinity=None):
+        self._manager = None  # owning ProcessManager, set by add_process
         self.pid = pid
         self.name = name
-        self.status = status
+        self._status = status
         self.cpu_usage = cpu_usage
         self.memory_usage = memory_usage
-        self.priority = priority
+        self._priority = priority
         self.start_time = start_time if start_time is not None else time.time()
+        # Total CPU seconds of work; None means the process never finishes
+        self.burst_time = burst_time
+        self.remaining_time = burst_time
+        # Cores the process may run on (None = any); read when it is queued
+        self.affinity = affinity
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, status):
+        old_status = self._status
+        self._status = status
+        # Keep the owning manager's status index in sync
+        if self._manager is not None and old_status != status:
+            self._manager._status_changed(self, old_status)
+
+    @property
+    def priority(self):
+        return self._priority
+
+    @priority.setter
+    def priority(self, priority):
+        old_priority = self._priority
+        self._priority = priority
+        if self._manager is not None and old_priority != priority:
+            self._manager._priority_changed(self, old_priority)
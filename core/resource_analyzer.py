@@ -1,64 +1,283 @@
 # core/resource_analyzer.py
+# Fed a ProcessManager, the analyzer follows its add/remove/status/priority
+# events and keeps the Running processes in NumPy columns, so a sample with
+# no changes costs O(1) and one with k changes O(k) Python work plus one
+# vectorized share pass. Shares are normalized over the whole Running set,
+# so a change that moves the total weight still rescales every share; only
+# the shares that actually moved are written back.
+import numpy as np
+
+from core.instrumentation import timed
+from core.policies import get_policy
+from core.timeseries import TimeSeries
+
+RUNNING = "Running"
+
+
 class ResourceAnalyzer:
-    def __init__(self):
-        self.cpu_history = []
-        self.memory_history = []
-        self.process_cpu_usage = {}  # Track CPU usage per process
-        
-    def update(self, processes, scheduler_algorithm):
-        # Calculate CPU usage based on running processes and scheduling algorithm
+    def __init__(self, history_size=3600, resolutions=(1, 60)):
+        # Ring-buffer histories with 1s/1m min/max/avg rollups
+        self.cpu_history = TimeSeries(history_size, resolutions)
+        self.memory_history = TimeSeries(history_size, resolutions)
+        self.process_cpu_usage = {}  # pid -> CPU share of every live process (0 unless Running)
+        self.history_size = history_size
+        self.core_history = []       # one raw TimeSeries per core, no rollups
+        self._columnar_source = None  # set when fed a ColumnarProcessManager
+        self.process_manager = None   # the ProcessManager whose events are followed
+        self.total_cpu = 0.0          # CPU % allocated by the last share pass
+        # Host readings from a live collector; recorded instead of the
+        # simulated totals once set
+        self.host_cpu = None
+        self.host_memory = None
+        self.host_cores = None
+        self._new_columns()
+
+    def _new_columns(self, capacity=1024):
+        # Running processes, one row each; rows are swap-removed
+        self._count = 0
+        self._rows = []               # row -> Process
+        self._slot = {}               # pid -> row
+        self._pid = np.zeros(capacity, dtype=np.int64)
+        self._cpu = np.zeros(capacity)
+        self._priority = np.zeros(capacity)
+        self._start = np.zeros(capacity)
+        self._memory = np.zeros(capacity)
+        self._share = np.zeros(capacity)
+        self._dirty = True            # Running set changed since the last share pass
+        self._share_key = None        # what the last share pass depended on
+        # Running totals over the Running processes
+        self.total_priority = 0.0
+        self.total_memory = 0.0
+
+    def attach(self, process_manager):
+        # Follow process_manager's events; one O(n) pass to seed the state
+        self.detach()
+        self.process_manager = process_manager
+        process_manager.subscribe(self._on_process_event)
+        self._new_columns()
+        self.process_cpu_usage = dict.fromkeys((p.pid for p in process_manager.get_processes()), 0)
+        for process in process_manager.get_processes_by_status(RUNNING):
+            self._insert(process)
+
+    def detach(self):
+        if self.process_manager is not None:
+            self.process_manager.unsubscribe(self._on_process_event)
+            self.process_manager = None
+
+    def invalidate(self):
+        # Re-read every Running process after cpu_usage/memory_usage were
+        # written in place (e.g. by a collector); those writes send no event
+        rows = self._rows
+        count = self._count
+        self._cpu[:count] = np.fromiter((p.cpu_usage for p in rows), dtype=np.float64, count=count)
+        self._memory[:count] = np.fromiter((p.memory_usage for p in rows), dtype=np.float64, count=count)
+        self.total_memory = float(self._memory[:count].sum())
+        self._dirty = True
+
+    def _on_process_event(self, event, process, old):
+        if event == "add":
+            self.process_cpu_usage[process.pid] = 0
+            if process.status == RUNNING:
+                self._insert(process)
+        elif event == "remove":
+            self.process_cpu_usage.pop(process.pid, None)
+            self._delete(process.pid)
+        elif event == "status":
+            self._status_changed(process)
+        elif event == "priority":
+            self._priority_changed(process)
+        elif event == "status_many":
+            for changed in process:
+                self._status_changed(changed)
+        elif event == "priority_many":
+            for changed in process:
+                self._priority_changed(changed)
+        elif event == "remove_many":
+            usage = self.process_cpu_usage
+            for removed in process:
+                usage.pop(removed.pid, None)
+                self._delete(removed.pid)
+
+    def _status_changed(self, process):
+        if process.status == RUNNING:
+            if process.pid not in self._slot:
+                self._insert(process)
+        elif process.pid in self._slot:
+            self._delete(process.pid)
+            self.process_cpu_usage[process.pid] = 0
+
+    def _priority_changed(self, process):
+        row = self._slot.get(process.pid)
+        if row is not None:
+            self.total_priority += process.priority - self._priority[row]
+            self._priority[row] = process.priority
+            self._dirty = True
+
+    def _insert(self, process):
+        row = self._count
+        if row == len(self._pid):
+            for name in ("_pid", "_cpu", "_priority", "_start", "_memory", "_share"):
+                column = getattr(self, name)
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:row] = column
+                setattr(self, name, grown)
+        self._slot[process.pid] = row
+        self._rows.append(process)
+        self._pid[row] = process.pid
+        self._cpu[row] = process.cpu_usage
+        self._priority[row] = process.priority
+        self._start[row] = process.start_time
+        self._memory[row] = process.memory_usage
+        self._share[row] = np.nan     # always written back by the next pass
+        self._count = row + 1
+        self.total_priority += process.priority
+        self.total_memory += process.memory_usage
+        self._dirty = True
+
+    def _delete(self, pid):
+        row = self._slot.pop(pid, None)
+        if row is None:
+            return
+        self.total_priority -= self._priority[row]
+        self.total_memory -= self._memory[row]
+        last = self._count - 1
+        if row != last:
+            # Move the last row into the hole
+            moved = self._rows[last]
+            self._rows[row] = moved
+            self._slot[moved.pid] = row
+            for column in (self._pid, self._cpu, self._priority, self._start, self._memory, self._share):
+                column[row] = column[last]
+        self._rows.pop()
+        self._count = last
+        if not last:
+            # No float drift once nothing is running
+            self.total_priority = 0.0
+            self.total_memory = 0.0
+        self._dirty = True
+
+    def _key(self, scheduler_algorithm):
+        # Equal keys mean equal shares for an unchanged Running set; None when
+        # the weights read policy state that moves without process events.
+        # A name makes a fresh, stateless policy on every call.
+        policies = getattr(scheduler_algorithm, "policies", (scheduler_algorithm,))
+        if any(getattr(p, "stateful_weights", False) for p in policies):
+            return None
+        # Per-core policies are replaced on rebuild and migrations move processes
+        return (scheduler_algorithm, list(policies), getattr(scheduler_algorithm, "migrations", 0))
+
+    @timed("analyzer.update")
+    def update(self, processes, scheduler_algorithm, now=None):
+        # scheduler_algorithm: a policy from core.policies, its registered name,
+        # or a Scheduler (per-core shares as a % of the whole machine)
+        if hasattr(processes, "allocate_cpu"):
+            # Columnar store: allocation and totals are vectorized in NumPy
+            self.detach()
+            self._columnar_source = processes
+            total_cpu = processes.allocate_cpu(scheduler_algorithm)
+            total_memory = processes.total_memory("Running")
+            self._record(total_cpu, total_memory, now)
+            return
+        self._columnar_source = None
+        if hasattr(processes, "subscribe"):
+            if processes is not self.process_manager:
+                self.attach(processes)
+            self._update_running(scheduler_algorithm)
+            self._record(self.total_cpu, self.total_memory, now)
+            return
+        self.detach()
+        self._update_list(processes, scheduler_algorithm, now)
+
+    def _update_running(self, scheduler_algorithm):
+        policy = get_policy(scheduler_algorithm)
+        key = self._key(scheduler_algorithm)
+        if not self._dirty and key is not None and key == self._share_key:
+            return
+        self._dirty = False
+        self._share_key = key
+        count = self._count
+        if not count:
+            self.total_cpu = 0.0
+            return
+        shares = np.asarray(policy.share(self._pid[:count], self._cpu[:count], self._priority[:count],
+                                         self._start[:count]), dtype=np.float64)
+        old = self._share[:count]
+        # NaN (a new row) never compares equal, so it is always written
+        moved = np.flatnonzero(shares != old)
+        if len(moved):
+            rows = self._rows
+            usage = self.process_cpu_usage
+            for row, cpu in zip(moved.tolist(), shares[moved].tolist()):
+                process = rows[row]
+                process.current_cpu = cpu
+                usage[process.pid] = cpu
+            old[:] = shares
+        self.total_cpu = float(shares.sum())
+
+    def _update_list(self, processes, scheduler_algorithm, now):
+        # A plain process list: recomputed from scratch
+        active_processes = [p for p in processes if p.status == RUNNING]
+        self.process_cpu_usage = dict.fromkeys((p.pid for p in processes), 0)
         total_cpu = 0
-        active_processes = [p for p in processes if p.status == "Running"]
-        
-        # Reset process CPU allocation
-        for p in processes:
-            if p.pid not in self.process_cpu_usage:
-                self.process_cpu_usage[p.pid] = 0
-        
-        # Allocate CPU based on scheduling algorithm
         if active_processes:
-            if scheduler_algorithm == "Round Robin":
-                # Distribute CPU evenly among running processes
-                cpu_per_process = 100 / len(active_processes)
-                for p in active_processes:
-                    p.current_cpu = min(p.cpu_usage, cpu_per_process)
-                    total_cpu += p.current_cpu
-                    self.process_cpu_usage[p.pid] = p.current_cpu
-                    
-            elif scheduler_algorithm == "Priority":
-                # Allocate CPU based on priority
-                total_priority = sum(p.priority for p in active_processes)
-                for p in active_processes:
-                    priority_share = p.priority / total_priority if total_priority > 0 else 0
-                    p.current_cpu = min(p.cpu_usage, 100 * priority_share)
-                    total_cpu += p.current_cpu
-                    self.process_cpu_usage[p.pid] = p.current_cpu
-                    
-            elif scheduler_algorithm == "First Come First Served":
-                # Give all CPU to the first process in the queue
-                if active_processes:
-                    first_process = min(active_processes, key=lambda p: p.start_time)
-                    first_process.current_cpu = first_process.cpu_usage
-                    total_cpu = first_process.current_cpu
-                    self.process_cpu_usage[first_process.pid] = first_process.current_cpu
-        
-        # Calculate memory usage (sum of all process memory)
+            count = len(active_processes)
+            shares = get_policy(scheduler_algorithm).share(
+                np.fromiter((p.pid for p in active_processes), dtype=np.int64, count=count),
+                np.fromiter((p.cpu_usage for p in active_processes), dtype=np.float64, count=count),
+                np.fromiter((p.priority for p in active_processes), dtype=np.float64, count=count),
+                np.array([p.start_time for p in active_processes], dtype=np.float64),
+            )
+            for p, cpu in zip(active_processes, shares.tolist()):
+                p.current_cpu = cpu
+                self.process_cpu_usage[p.pid] = cpu
+            total_cpu = sum(shares.tolist())
+        self.total_cpu = total_cpu
         total_memory = sum(p.memory_usage for p in active_processes)
-        
-        self.cpu_history.append(total_cpu)
-        self.memory_history.append(total_memory)
-        
-        # Keep only the last 20 data points
-        if len(self.cpu_history) > 20:
-            self.cpu_history.pop(0)
-        if len(self.memory_history) > 20:
-            self.memory_history.pop(0)
+        self._record(total_cpu, total_memory, now)
+
+    def observe(self, cpu=None, memory=None, cores=None):
+        # A CPU or memory collector's sample, recorded by the next update()
+        if cpu is not None:
+            self.host_cpu = cpu
+        if memory is not None:
+            self.host_memory = memory
+        if cores is not None:
+            self.host_cores = cores
+
+    def update_cores(self, utilization, now=None):
+        # Per-core busy %; the histories are reset if the core count changes
+        if len(utilization) != len(self.core_history):
+            self.core_history = [TimeSeries(self.history_size, resolutions=()) for _ in utilization]
+        for series, value in zip(self.core_history, utilization):
+            series.append(value, now)
+
+    def _record(self, total_cpu, total_memory, now):
+        # O(1): the ring buffers overwrite their oldest sample when full
+        if self.host_cpu is not None:
+            total_cpu = self.host_cpu
+        if self.host_memory is not None:
+            total_memory = self.host_memory
+        self.cpu_history.append(total_cpu, now)
+        self.memory_history.append(total_memory, now)
     
     def get_cpu_usage(self):
-        return self.cpu_history
+        return self.cpu_history.values()
         
     def get_memory_usage(self):
-        return self.memory_history
+        return self.memory_history.values()
         
+    def get_core_usage(self):
+        # One array of busy % per core
+        return [series.values() for series in self.core_history]
+
+    def get_cpu_rollup(self, resolution, points=None):
+        return self.cpu_history.rollup(resolution, points)
+
+    def get_memory_rollup(self, resolution, points=None):
+        return self.memory_history.rollup(resolution, points)
+
     def get_process_cpu_usage(self):
+        if self._columnar_source is not None:
+            # Built on demand so a 1M-row tick doesn't pay for a dict
+            return self._columnar_source.get_cpu_allocation()
         return self.process_cpu_usage
@@ -0,0 +1,408 @@
+# core/runner.py
+# Runs a Simulation in a background thread and hands immutable snapshots to
+# the UI. Readers never take a lock: publishing is a single reference swap,
+# and UI changes travel the other way through a command queue that only the
+# worker thread drains.
+import itertools
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from core.instrumentation import count, timed
+from core.process_index import ProcessIndex
+
+ProcessRecord = namedtuple(
+    "ProcessRecord",
+    ["pid", "name", "status", "cpu_usage", "memory_usage", "priority", "start_time", "current_cpu"],
+)
+
+HISTORY_POINTS = 20      # raw samples copied into each snapshot for the live charts
+ROLLUP_POINTS = 1440     # buckets copied per rollup resolution (a day of 1m buckets)
+TRACE_SECONDS = 120      # virtual seconds of the execution trace copied for the Gantt chart
+
+# Parts of a snapshot that rendered sections depend on: name -> attributes.
+# Each gets a version that only moves when the part's content changed.
+VERSIONED_PARTS = {
+    "processes": ("processes",),
+    "trace": ("trace",),
+    "history": ("cpu_history", "memory_history", "core_history", "_rollups"),
+    "network": ("network_history", "connections", "socket_count", "interface_rates"),
+    "scheduling": ("algorithm", "quantum", "cores", "core_queue_lengths", "scheduling_metrics"),
+}
+_versions = itertools.count(1)   # process-wide, so versions are never reused across runners
+
+
+class ProcessTable:
+    # Read-only process list over copies of a columnar store's columns
+    # (core.columnar_store). Rows become ProcessRecords only when read, so a
+    # snapshot of a large store costs a few bytes per process.
+    def __init__(self, store):
+        self.pid = store.pid.copy()
+        self.status = store.status.copy()
+        self.status_names = tuple(store.status_names())
+        self.cpu_usage = store.cpu_usage.copy()
+        self.memory_usage = store.memory_usage.copy()
+        self.priority = store.priority.copy()
+        self.start_time = store.start_time.copy()
+        self.current_cpu = store.current_cpu.copy()
+        self.names = list(store.names())
+        self._order = None   # argsort of pid, built on the first lookup
+
+    def __len__(self):
+        return len(self.pid)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self.pid)
+        return ProcessRecord(int(self.pid[row]), self.names[row], self.status_names[self.status[row]],
+                             float(self.cpu_usage[row]), float(self.memory_usage[row]), int(self.priority[row]),
+                             float(self.start_time[row]), float(self.current_cpu[row]))
+
+    def __iter__(self):
+        return self.records(range(len(self.pid)))
+
+    def __eq__(self, other):
+        if not isinstance(other, ProcessTable):
+            return NotImplemented
+        return (self.status_names == other.status_names and self.names == other.names
+                and all(np.array_equal(getattr(self, name), getattr(other, name))
+                        for name in ("pid", "status", "cpu_usage", "memory_usage", "priority", "start_time",
+                                     "current_cpu")))
+
+    __hash__ = None
+
+    def records(self, rows):
+        return (self[row] for row in rows)
+
+    def row_of(self, pid):
+        if self._order is None:
+            self._order = np.argsort(self.pid, kind="stable")
+        position = int(np.searchsorted(self.pid, pid, sorter=self._order))
+        if position < len(self._order) and self.pid[self._order[position]] == pid:
+            return int(self._order[position])
+        return None
+
+    def rows_with_status(self, *statuses):
+        codes = [code for code, name in enumerate(self.status_names) if name in statuses]
+        return np.flatnonzero(np.isin(self.status, codes))
+
+    def statuses(self):
+        return [self.status_names[code] for code in np.unique(self.status).tolist()]
+
+    def cpu_allocation(self):
+        return dict(zip(self.pid.tolist(), self.current_cpu.tolist()))
+
+
+def _same(a, b):
+    # Content equality that also walks NumPy arrays inside dicts and lists
+    if isinstance(a, np.ndarray):
+        return (isinstance(b, np.ndarray) and a.shape == b.shape
+                and np.array_equal(a, b, equal_nan=a.dtype.kind == "f"))
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class Snapshot:
+    # Frozen copy of the simulation state. Offers the read side of the
+    # ProcessManager, ResourceAnalyzer, Network and Scheduler APIs.
+    # `previous` is the snapshot this one replaces; parts that did not change
+    # keep its versions.
+    def __init__(self, simulation, previous=None):
+        process_manager = simulation.process_manager
+        if hasattr(process_manager, "allocate_cpu"):
+            # Columnar store: copies of its columns instead of a record per process
+            self.processes = self._table = ProcessTable(process_manager)
+            self._by_pid = self._by_status = None
+        else:
+            processes = tuple(
+                ProcessRecord(p.pid, p.name, p.status, p.cpu_usage, p.memory_usage, p.priority,
+                              p.start_time, getattr(p, "current_cpu", p.cpu_usage))
+                for p in process_manager.get_processes()
+            )
+            by_status = {}
+            for record in processes:
+                by_status.setdefault(record.status, []).append(record)
+            self.processes = processes
+            self._table = None
+            self._by_pid = {record.pid: record for record in processes}
+            self._by_status = {status: tuple(records) for status, records in by_status.items()}
+        self.clock = simulation.clock
+        self.ticks = simulation.ticks
+        self.completed = simulation.completed
+        self.algorithm = simulation.scheduler.algorithm
+        self.quantum = simulation.scheduler.quantum
+        self.current = simulation.scheduler.current
+        self.trace = simulation.scheduler.trace_window(self.clock - TRACE_SECONDS, self.clock)
+        self.cores = simulation.scheduler.cores
+        self.core_queue_lengths = tuple(simulation.scheduler.queue_lengths())
+        self.scheduling_metrics = simulation.scheduler.metrics.summary(simulation.scheduler.clock)
+        # Only bounded windows are copied, however long the retained history is
+        analyzer = simulation.resource_analyzer
+        network = simulation.network
+        self.cpu_history = analyzer.get_cpu_usage()[-HISTORY_POINTS:].copy()
+        self.memory_history = analyzer.get_memory_usage()[-HISTORY_POINTS:].copy()
+        self.core_history = [series[-HISTORY_POINTS:].copy() for series in analyzer.get_core_usage()]
+        # A columnar table already holds the allocation; its dict is built on demand
+        self.process_cpu_usage = dict(analyzer.get_process_cpu_usage()) if self._table is None else None
+        self.network_history = network.get_network_usage()[-HISTORY_POINTS:].copy()
+        self.live_network = network.live
+        self.connections = tuple(network.get_connections())
+        self.socket_count = network.get_socket_count()
+        self.interface_rates = dict(network.get_interface_rates())
+        sampler = simulation.sampler
+        self.collectors = tuple(sampler.stats()) if sampler is not None else ()
+        self._rollups = {}
+        for resolution in analyzer.cpu_history.resolutions():
+            self._rollups[("cpu", resolution)] = analyzer.get_cpu_rollup(resolution, ROLLUP_POINTS)
+            self._rollups[("memory", resolution)] = analyzer.get_memory_rollup(resolution, ROLLUP_POINTS)
+        for resolution in network.network_history.resolutions():
+            self._rollups[("network", resolution)] = network.get_network_rollup(resolution, ROLLUP_POINTS)
+        self._index = None
+        self.published_at = time.time()
+        self.versions = {}
+        for name, attributes in VERSIONED_PARTS.items():
+            if previous is not None and all(_same(getattr(self, attribute), getattr(previous, attribute))
+                                            for attribute in attributes):
+                self.versions[name] = previous.versions[name]
+            else:
+                self.versions[name] = next(_versions)
+        if previous is not None and self.versions["processes"] == previous.versions["processes"]:
+            # Same processes, so the same index
+            self._index = previous._index
+
+    def get_processes(self):
+        return self.processes
+
+    def get_process(self, pid):
+        if self._table is not None:
+            row = self._table.row_of(pid)
+            return None if row is None else self._table[row]
+        return self._by_pid.get(pid)
+
+    def get_processes_by_status(self, *statuses):
+        if self._table is not None:
+            return list(self._table.records(self._table.rows_with_status(*statuses).tolist()))
+        result = []
+        for status in statuses:
+            result.extend(self._by_status.get(status, ()))
+        return result
+
+    def count_by_status(self, status):
+        if self._table is not None:
+            return len(self._table.rows_with_status(status))
+        return len(self._by_status.get(status, ()))
+
+    def get_statuses(self):
+        if self._table is not None:
+            return self._table.statuses()
+        return list(self._by_status)
+
+    def __len__(self):
+        return len(self.processes)
+
+    def get_index(self):
+        # Built on first use; a rerun racing another may build it twice, which is harmless
+        if self._index is None:
+            self._index = ProcessIndex(self.processes)
+        return self._index
+
+    def get_trace(self):
+        return self.trace
+
+    def get_versions(self, *parts):
+        # Versions of the named parts, as a cache key
+        return tuple(self.versions[part] for part in parts)
+
+    def get_scheduling_metrics(self):
+        return self.scheduling_metrics
+
+    def get_cpu_usage(self):
+        return self.cpu_history
+
+    def get_memory_usage(self):
+        return self.memory_history
+
+    def get_core_usage(self):
+        return self.core_history
+
+    def get_process_cpu_usage(self):
+        if self.process_cpu_usage is None:
+            return self._table.cpu_allocation()
+        return self.process_cpu_usage
+
+    def get_network_usage(self):
+        return self.network_history
+
+    def get_connections(self):
+        return self.connections
+
+    def get_interface_rates(self):
+        return self.interface_rates
+
+    def get_cpu_rollup(self, resolution, points=None):
+        return self._rollup("cpu", resolution, points)
+
+    def get_memory_rollup(self, resolution, points=None):
+        return self._rollup("memory", resolution, points)
+
+    def get_network_rollup(self, resolution, points=None):
+        return self._rollup("network", resolution, points)
+
+    def _rollup(self, name, resolution, points):
+        rollup = self._rollups[(name, resolution)]
+        if points is None:
+            return rollup
+        return {column: values[-points:] for column, values in rollup.items()}
+
+
+class SimulationRunner:
+    def __init__(self, simulation, ticks_per_second=1.0, publish_interval=0.5, max_batch=10000):
+        self.simulation = simulation
+        # Simulated ticks per real second; 0 or None runs as fast as possible
+        self.ticks_per_second = ticks_per_second
+        self.publish_interval = publish_interval
+        self.max_batch = max_batch
+        self.last_error = None
+        self._commands = deque()
+        self._snapshot = Snapshot(simulation)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="simulation-runner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        # Plain attribute read: the worker replaces the reference atomically
+        return self._snapshot
+
+    def submit(self, fn, *args, **kwargs):
+        # Run fn(*args, **kwargs) on the worker thread before its next tick;
+        # dropped once the worker has stopped, as nothing would run it
+        if self._thread is not None and not self._thread.is_alive():
+            return
+        self._commands.append((fn, args, kwargs))
+
+    def _drain_commands(self):
+        drained = False
+        while self._commands:
+            fn, args, kwargs = self._commands.popleft()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                self.last_error = e
+                print(f"Error applying simulation command: {e}")
+            drained = True
+            count("runner.commands")
+        return drained
+
+    @timed("runner.publish")
+    def _publish(self):
+        self._snapshot = Snapshot(self.simulation, self._snapshot)
+
+    def _run(self):
+        simulation = self.simulation
+        started = time.monotonic()
+        ticks_done = 0
+        last_publish = started
+        while not self._stop.is_set():
+            applied = self._drain_commands()
+            now = time.monotonic()
+            if self.ticks_per_second:
+                due = int((now - started) * self.ticks_per_second) - ticks_done
+            else:
+                due = self.max_batch
+            due = min(due, self.max_batch)
+            if due > 0:
+                try:
+                    simulation.run(ticks=due)
+                except Exception as e:
+                    # The event that raised left the simulation half-applied, so
+                    # stop here; the UI reads last_error once is_running() is False
+                    self.last_error = e
+                    print(f"Simulation stopped: {e!r}")
+                    self._commands.clear()
+                    self._publish()
+                    return
+                ticks_done += due
+            # Publish right away after a UI command so the next rerun sees it
+            if applied or (due > 0 and now - last_publish >= self.publish_interval):
+                self._publish()
+                last_publish = now
+            if self.ticks_per_second and due <= 0:
+                # Sleep until the next tick is due, waking often enough for commands
+                wait = (ticks_done + 1) / self.ticks_per_second - (now - started)
+                self._stop.wait(min(max(wait, 0.001), 0.05))
+
+
+class ProcessManagerHandle:
+    # What a Streamlit session gets instead of the shared ProcessManager:
+    # reads come from one snapshot, writes are queued for the worker.
+    def __init__(self, runner, snapshot=None):
+        self._runner = runner
+        self._snapshot = snapshot if snapshot is not None else runner.snapshot()
+
+    def __getattr__(self, name):
+        return getattr(self._snapshot, name)
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def add_process(self, process):
+        self._runner.submit(self._runner.simulation.process_manager.add_process, process)
+
+    def remove_process(self, pid):
+        self._runner.submit(self._runner.simulation.process_manager.remove_process, pid)
+
+    def update_process_status(self, pid, status):
+        self._runner.submit(self._runner.simulation.process_manager.update_process_status, pid, status)
+
+    # Bulk operations run as one command; `where` is evaluated on the worker
+    def update_processes_status(self, status, pids=None, where=None):
+        self._runner.submit(self._runner.simulation.process_manager.update_processes_status, status, pids, where)
+
+    def update_processes_priority(self, priority, pids=None, where=None):
+        self._runner.submit(self._runner.simulation.process_manager.update_processes_priority, priority, pids, where)
+
+    def remove_processes(self, pids=None, where=None):
+        self._runner.submit(self._runner.simulation.process_manager.remove_processes, pids, where)
+
+
+class SchedulerHandle:
+    # Scheduler settings as seen from a session; changes are queued for the worker
+    def __init__(self, runner, snapshot=None):
+        self._runner = runner
+        snapshot = snapshot if snapshot is not None else runner.snapshot()
+        self.algorithm = snapshot.algorithm
+        self._quantum = snapshot.quantum
+
+    @property
+    def quantum(self):
+        return self._quantum
+
+    @quantum.setter
+    def quantum(self, quantum):
+        if quantum != self._quantum:
+            self._quantum = quantum
+            self._runner.submit(setattr, self._runner.simulation.scheduler, "quantum", quantum)
+
+    def set_algorithm(self, algorithm):
+        self.algorithm = algorithm
+        self._runner.submit(self._runner.simulation.scheduler.set_algorithm, algorithm)
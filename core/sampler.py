@@ -0,0 +1,285 @@
+# core/sampler.py
+# Runs collectors (core.collectors) concurrently, each at its own interval,
+# on an asyncio loop in a background thread. collect() calls block, so each
+# collector gets a worker thread of its own and a slow or hung one never
+# delays the others. Backpressure: a collector has at most one collection in
+# flight, and ticks it overran are skipped (and counted), not queued. Samples
+# the simulation has not picked up yet are coalesced, so poll() hands back
+# one latest sample per collector.
+#
+#   sampler = Sampler([ProcessCollector(), CpuCollector()]).start()
+#   for collector, sample in sampler.poll(now):    # on the simulation thread
+#       collector.apply(simulation, sample)
+#
+# Record a live session for TASK_MANAGER_SOURCE=replay:
+#
+#   python -m core.sampler --record data/session.ndjson --seconds 60
+import argparse
+import asyncio
+import json
+import queue
+import threading
+import time
+
+from core.collectors import CpuCollector, MemoryCollector, NetworkCollector, ProcessCollector
+
+
+class _CollectorStats:
+    def __init__(self, collector):
+        self.name = collector.name
+        self.interval = collector.interval
+        self.collections = 0
+        self.skipped = 0       # ticks missed while a collection overran
+        self.coalesced = 0     # samples folded into a newer one before a poll
+        self.errors = 0
+        self.last_error = None
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.sampled_at = None  # time.monotonic() of the latest sample
+
+    def row(self, now):
+        return {
+            "collector": self.name,
+            "interval_s": self.interval,
+            "collections": self.collections,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "last_ms": round(self.last_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "age_s": round(now - self.sampled_at, 1) if self.sampled_at is not None else None,
+        }
+
+
+class _Worker:
+    # One daemon thread running a collector's collect() calls in turn; unlike
+    # an executor's threads it does not hold up interpreter exit when hung
+    def __init__(self, collector, loop):
+        self.collector = collector
+        self.loop = loop
+        self._calls = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"collector-{collector.name}", daemon=True)
+        self._thread.start()
+
+    def collect(self):
+        future = self.loop.create_future()
+        self._calls.put(future)
+        return future
+
+    def _run(self):
+        while True:
+            future = self._calls.get()
+            if future is None:
+                return
+            try:
+                result = self.collector.collect()
+            except Exception as e:
+                self._resolve(future, None, e)
+            else:
+                self._resolve(future, result, None)
+
+    def _resolve(self, future, result, error):
+        def resolve():
+            if future.cancelled():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        try:
+            self.loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            pass  # the loop was closed by stop()
+
+    def stop(self):
+        self._calls.put(None)
+
+
+class Sampler:
+    def __init__(self, collectors, recorder=None):
+        self.collectors = list(collectors)
+        self.recorder = recorder      # optional SampleRecorder
+        self._lock = threading.Lock()  # pending is filled by the loop, drained by poll()
+        self._pending = {}             # collector -> latest sample not polled yet
+        self._stats = {collector: _CollectorStats(collector) for collector in self.collectors}
+        self._loop = None
+        self._thread = None
+        self._workers = []
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        loop, thread = self._loop, self._thread
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        self._loop = self._thread = None
+        for collector in self.collectors:
+            collector.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def _run(self):
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        self._workers = [_Worker(collector, loop) for collector in self.collectors]
+        tasks = [loop.create_task(self._drive(worker)) for worker in self._workers]
+        try:
+            loop.run_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            for worker in self._workers:
+                worker.stop()
+            loop.close()
+
+    async def _drive(self, worker):
+        collector = worker.collector
+        stats = self._stats[collector]
+        loop = asyncio.get_running_loop()
+        interval = collector.interval
+        next_at = loop.time()
+        while True:
+            started = loop.time()
+            try:
+                # The only await on the worker: one collection in flight
+                sample = await worker.collect()
+            except Exception as e:
+                stats.errors += 1
+                stats.last_error = repr(e)
+                sample = None
+            now = loop.time()
+            stats.collections += 1
+            stats.last_ms = (now - started) * 1000
+            stats.max_ms = max(stats.max_ms, stats.last_ms)
+            if sample is not None:
+                self._offer(collector, sample, stats)
+            next_at += interval
+            if now > next_at:
+                # Overran: drop the ticks that passed instead of running them back to back
+                missed = int((now - next_at) // interval) + 1
+                stats.skipped += missed
+                next_at += missed * interval
+            await asyncio.sleep(next_at - now)
+
+    def _offer(self, collector, sample, stats):
+        stats.sampled_at = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.write(collector, sample)
+        with self._lock:
+            if collector in self._pending:
+                sample = collector.coalesce(self._pending[collector], sample)
+                stats.coalesced += 1
+            self._pending[collector] = sample
+
+    def poll(self, now=None):
+        # [(collector, sample)] of every collector with a new sample since the
+        # last poll, in collector order; never blocks on a collection
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [(collector, pending[collector]) for collector in self.collectors if collector in pending]
+
+    def stats(self):
+        now = time.monotonic()
+        return [self._stats[collector].row(now) for collector in self.collectors]
+
+
+class InlineSampler:
+    # Collects on the caller's thread when poll() finds a collector due on the
+    # simulation's virtual clock; for simulated collectors, whose samples
+    # must follow the clock (and the random seed) to keep runs repeatable
+    def __init__(self, collectors):
+        self.collectors = list(collectors)
+        self._due = {}    # collector -> virtual time of its next collection
+        self._stats = {collector: _CollectorStats(collector) for collector in self.collectors}
+
+    def start(self):
+        return self
+
+    def stop(self, timeout=None):
+        for collector in self.collectors:
+            collector.close()
+
+    def poll(self, now):
+        samples = []
+        for collector in self.collectors:
+            due = self._due.get(collector)
+            if due is not None and now < due:
+                continue
+            self._due[collector] = now + collector.interval
+            stats = self._stats[collector]
+            started = time.perf_counter()
+            sample = collector.collect()
+            stats.collections += 1
+            stats.last_ms = (time.perf_counter() - started) * 1000
+            stats.max_ms = max(stats.max_ms, stats.last_ms)
+            if sample is not None:
+                stats.sampled_at = time.monotonic()
+                samples.append((collector, sample))
+        return samples
+
+    def stats(self):
+        now = time.monotonic()
+        return [self._stats[collector].row(now) for collector in self.collectors]
+
+
+class SampleRecorder:
+    # Writes every collected sample as one NDJSON line,
+    # {"collector": name, "time": seconds since the start, "sample": ...},
+    # for core.collectors.replay_collectors()
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def write(self, collector, sample):
+        line = json.dumps({"collector": collector.name, "time": round(time.monotonic() - self._started, 3),
+                           "sample": collector.encode(sample)})
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def live_collectors(interval=1.0):
+    # The /proc collectors behind TASK_MANAGER_SOURCE=proc
+    return [ProcessCollector(interval), CpuCollector(interval), MemoryCollector(interval), NetworkCollector(interval)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record live /proc samples for replay")
+    parser.add_argument("--record", required=True, help="NDJSON file to write")
+    parser.add_argument("--seconds", type=float, default=60.0, help="how long to record")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples per collector")
+    args = parser.parse_args(argv)
+
+    sampler = Sampler(live_collectors(args.interval), SampleRecorder(args.record)).start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    stats = sampler.stats()
+    sampler.stop()
+    for row in stats:
+        print(f"{row['collector']:<10} {row['collections']:>6} samples  {row['skipped']:>4} skipped  "
+              f"{row['errors']:>3} errors  max {row['max_ms']:.1f} ms")
+    print(f"Recorded to {args.record}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
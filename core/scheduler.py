@@ -1,67 +1,331 @@
 # core/scheduler.py
-import time
+import heapq
+
+import numpy as np
+
+from core.instrumentation import timed
+from core.policies import create_policy
+from core.trace import ExecutionTrace
+from core.scheduling_metrics import SchedulingMetrics
+
+ACTIVE_STATUSES = ("Running", "Waiting")
 
 class Scheduler:
-    def __init__(self):
+    # N cores, each with its own run queue (a policy instance). New processes
+    # go to the least loaded core they may run on; an idle core steals from
+    # the busiest one, and queues are rebalanced every balance_interval ticks.
+    def __init__(self, cores=1, balance_interval=10, migration_limit=32):
         self.algorithm = "Round Robin"
-        self.quantum = 2  # Time quantum for Round Robin (in seconds)
-        
+        self.cores = max(1, int(cores))
+        self.balance_interval = balance_interval  # ticks between rebalancing passes
+        self.migration_limit = migration_limit    # max processes moved per pass
+        self.policies = [create_policy(self.algorithm, quantum=2)]  # Time quantum for Round Robin (in seconds)
+        self.process_manager = None
+        self.clock = 0.0         # engine time; the simulation passes its own clock
+        self.ticks = 0
+        self.metrics = SchedulingMetrics()  # turnaround / waiting / response / throughput
+        self.migrations = 0      # processes moved between cores by stealing or balancing
+        self._core_of = {}       # pid -> core whose run queue holds it
+        self._busy = []          # per core: seconds spent running since the last utilization read
+        self._ticked = 0.0       # seconds ticked since the last utilization read
+        self._new_cores()
+
+    def _new_cores(self):
+        quantum = self.quantum
+        self.policies = [create_policy(self.algorithm, quantum=quantum, lookup=self._lookup)
+                         for _ in range(self.cores)]
+        # Slices on one core never overlap, so each core keeps its own sorted trace
+        capacity = max((1 << 20) // self.cores, 1 << 12)
+        self.traces = [ExecutionTrace(capacity) for _ in range(self.cores)]
+        self._core_of = {}
+        self._busy = [0.0] * self.cores
+
+    @property
+    def policy(self):
+        # The first core's policy; with one core, the policy
+        return self.policies[0]
+
+    @property
+    def trace(self):
+        # The first core's trace; trace_window() merges every core
+        return self.traces[0]
+
+    @property
+    def current(self):
+        # pid holding the first core
+        return self.policies[0].running
+
+    @property
+    def quantum(self):
+        return self.policies[0].quantum
+
+    @quantum.setter
+    def quantum(self, quantum):
+        for policy in self.policies:
+            policy.quantum = quantum
+
     def set_algorithm(self, algorithm):
-        self.algorithm = algorithm
-        
+        if algorithm != self.algorithm:
+            create_policy(algorithm)  # validate before touching any state
+            self.algorithm = algorithm
+            self._rebuild()
+
+    def set_cores(self, cores):
+        cores = max(1, int(cores))
+        if cores != self.cores:
+            self.cores = cores
+            self._rebuild()
+
+    def attach(self, process_manager):
+        # Follow add/remove/status/priority changes instead of re-sorting every tick
+        if self.process_manager is not None:
+            self.process_manager.unsubscribe(self._on_process_event)
+        self.process_manager = process_manager
+        process_manager.subscribe(self._on_process_event)
+        self._rebuild()
+
+    def _rebuild(self):
+        # Fresh run queues, filled with the currently active processes
+        self._new_cores()
+        if self.process_manager is None:
+            return
+        self._enqueue_many(self.process_manager.get_processes_by_status(*ACTIVE_STATUSES))
+
+    def _lookup(self, pid):
+        # The run queues hold pids; this is how the policies get the process
+        return self.process_manager.get_process(pid)
+
+    def _allowed(self, process):
+        # Cores the process may run on: its affinity, or all of them
+        affinity = getattr(process, "affinity", None)
+        if affinity:
+            allowed = [core for core in affinity if 0 <= core < self.cores]
+            if allowed:
+                return allowed
+        return range(self.cores)
+
+    def _enqueue(self, process):
+        self.metrics.arrive(process.pid, self.clock)
+        if self.cores == 1:
+            core = 0
+        else:
+            policies = self.policies
+            core = min(self._allowed(process), key=lambda core: len(policies[core]))
+        self._core_of[process.pid] = core
+        self.policies[core].add(process, self.clock)
+
+    def _enqueue_many(self, processes):
+        # A batch of newly active processes, each to the least loaded core it
+        # may use, then one extend per core
+        batches = [[] for _ in range(self.cores)]
+        loads = [(len(policy), core) for core, policy in enumerate(self.policies)]
+        heapq.heapify(loads)
+        counts = [len(policy) for policy in self.policies]
+        for process in processes:
+            self.metrics.arrive(process.pid, self.clock)
+            if self.cores == 1:
+                core = 0
+            elif getattr(process, "affinity", None) is None:
+                # Least loaded overall, from a heap with lazily refreshed loads
+                while True:
+                    load, core = loads[0]
+                    if load == counts[core]:
+                        break
+                    heapq.heapreplace(loads, (counts[core], core))
+                heapq.heapreplace(loads, (load + 1, core))
+            else:
+                core = min(self._allowed(process), key=counts.__getitem__)
+            counts[core] += 1
+            batches[core].append(process)
+            self._core_of[process.pid] = core
+        for policy, batch in zip(self.policies, batches):
+            if batch:
+                policy.extend(batch, self.clock)
+
+    def _dequeue(self, pid):
+        core = self._core_of.pop(pid, None)
+        if core is not None:
+            self.policies[core].remove(pid)
+
+    def _on_process_event(self, event, process, old):
+        if event == "add":
+            if process.status in ACTIVE_STATUSES:
+                self._enqueue(process)
+        elif event == "remove":
+            self._dequeue(process.pid)
+            self.metrics.forget(process.pid)
+        elif event == "status":
+            was_active = old in ACTIVE_STATUSES
+            is_active = process.status in ACTIVE_STATUSES
+            if is_active and not was_active:
+                self._enqueue(process)
+            elif was_active and not is_active:
+                self._dequeue(process.pid)
+                # Done when its burst ran out; otherwise it was stopped from outside
+                completed = getattr(process, "remaining_time", None) == 0
+                self.metrics.leave(process.pid, self.clock, completed)
+        elif event == "priority":
+            core = self._core_of.get(process.pid)
+            if core is not None:
+                self.policies[core].reprioritize(process)
+        # Bulk operations: `process` is a list and `old` a list of old values
+        elif event == "status_many":
+            arrived = []
+            for changed, old_status in zip(process, old):
+                was_active = old_status in ACTIVE_STATUSES
+                is_active = changed.status in ACTIVE_STATUSES
+                if is_active and not was_active:
+                    arrived.append(changed)
+                elif was_active and not is_active:
+                    self._dequeue(changed.pid)
+                    completed = getattr(changed, "remaining_time", None) == 0
+                    self.metrics.leave(changed.pid, self.clock, completed)
+            self._enqueue_many(arrived)
+        elif event == "remove_many":
+            for removed in process:
+                self._dequeue(removed.pid)
+                self.metrics.forget(removed.pid)
+        elif event == "priority_many":
+            batches = {}
+            for changed in process:
+                core = self._core_of.get(changed.pid)
+                if core is not None:
+                    batches.setdefault(core, []).append(changed)
+            for core, batch in batches.items():
+                self.policies[core].reprioritize_many(batch)
+
+    # Load balancing
+    def _migrate(self, source, target, now):
+        # Move one waiting process that may run on `target`; returns it or None
+        stolen = self.policies[source].steal(now, lambda process: target in self._allowed(process))
+        if stolen is not None:
+            self._core_of[stolen.pid] = target
+            self.policies[target].add(stolen, now)
+            self.migrations += 1
+        return stolen
+
+    def _steal(self, core, now, waiting):
+        # Work stealing for an idle core: take from the core with most waiting.
+        # `waiting` holds each core's waiting count and is kept up to date.
+        victim = max(range(self.cores), key=waiting.__getitem__)
+        if victim == core or waiting[victim] == 0:
+            return None
+        if self._migrate(victim, core, now) is None:
+            return None
+        waiting[victim] -= 1
+        return self.policies[core].pick(now)
+
+    def _balance(self, now):
+        loads = [len(policy) for policy in self.policies]
+        for _ in range(self.migration_limit):
+            busiest = max(range(self.cores), key=loads.__getitem__)
+            idlest = min(range(self.cores), key=loads.__getitem__)
+            if loads[busiest] - loads[idlest] <= 1 or self._migrate(busiest, idlest, now) is None:
+                break
+            loads[busiest] -= 1
+            loads[idlest] += 1
+
+    @timed("scheduler.tick")
+    def tick(self, elapsed, now=None):
+        # Advance every core by `elapsed` seconds from `now`; returns the pids that ran
+        now = self.clock if now is None else now
+        self.clock = now + elapsed
+        if self.process_manager is None:
+            return []
+        self.ticks += 1
+        multicore = self.cores > 1
+        if multicore and self.balance_interval and self.ticks % self.balance_interval == 0:
+            self._balance(now)
+        ran = []
+        waiting = None
+        for core, policy in enumerate(self.policies):
+            pid = policy.pick(now)
+            if pid is None:
+                if not multicore:
+                    continue
+                if waiting is None:
+                    waiting = [len(other) - (other.running is not None) for other in self.policies]
+                pid = self._steal(core, now, waiting)
+                if pid is None:
+                    continue
+            process = self.process_manager.get_process(pid)
+            if policy.dispatch_marks_running and process.status == "Waiting":
+                process.status = "Running"
+            policy.charge(process, elapsed, now)
+            self.traces[core].record(pid, now, now + elapsed)
+            self.metrics.ran(pid, now, elapsed)
+            self._busy[core] += elapsed
+            ran.append(pid)
+        self._ticked += elapsed
+        return ran
+
+    def restore_queues(self, queues, running, slice_used, states=None):
+        # Run queues as saved by core.session: per core the waiting pids in
+        # dispatch order, the pid holding it (None when idle), the time it
+        # has had since it was dispatched and the policy's state()
+        self._new_cores()
+        get_process = self.process_manager.get_process
+        for core, policy in enumerate(self.policies):
+            waiting = [get_process(pid) for pid in queues[core]]
+            waiting = [process for process in waiting if process is not None]
+            holder = get_process(running[core]) if running[core] is not None else None
+            policy.restore(waiting, holder, slice_used[core], self.clock, states[core] if states else None)
+            for process in waiting:
+                self._core_of[process.pid] = core
+            if holder is not None:
+                self._core_of[holder.pid] = core
+
+    # Reading
+    def core_of(self, pid):
+        return self._core_of.get(pid)
+
+    def running(self):
+        # pid on each core (None when idle)
+        return [policy.running for policy in self.policies]
+
+    def queue_lengths(self):
+        return [len(policy) for policy in self.policies]
+
+    def core_utilization(self):
+        # Busy % of each core since the previous call
+        elapsed, self._ticked = self._ticked, 0.0
+        busy, self._busy = self._busy, [0.0] * self.cores
+        if elapsed <= 0:
+            return [0.0] * self.cores
+        return [min(100.0, 100.0 * value / elapsed) for value in busy]
+
+    def trace_window(self, start=None, end=None):
+        # Slices of every core overlapping [start, end], ordered by start time
+        windows = [trace.window(start, end) for trace in self.traces]
+        if len(windows) == 1:
+            return windows[0]
+        merged = {name: np.concatenate([window[name] for window in windows]) for name in ("pid", "start", "end")}
+        order = np.argsort(merged["start"], kind="stable")
+        return {name: column[order] for name, column in merged.items()}
+
+    def share(self, pids, cpu_usage, priority, start_time):
+        # Policy CPU shares, per core, as a % of the whole machine; the
+        # analyzer takes a Scheduler wherever it takes a policy
+        if self.cores == 1:
+            return self.policies[0].share(pids, cpu_usage, priority, start_time)
+        core_of = self._core_of
+        cores = np.fromiter((core_of.get(pid, -1) for pid in pids.tolist()), dtype=np.int64, count=len(pids))
+        shares = np.zeros(len(pids))
+        for core, policy in enumerate(self.policies):
+            mask = cores == core
+            if mask.any():
+                shares[mask] = policy.share(pids[mask], cpu_usage[mask], priority[mask], start_time[mask])
+        return shares / self.cores
+
+    def get_queue(self):
+        # Active processes in dispatch order, core by core (for display)
+        if self.process_manager is None:
+            return []
+        return [self.process_manager.get_process(pid) for policy in self.policies for pid in policy.queue()]
+
     def schedule(self, processes):
+        # Stateless ordering of a process list by the current policy
         if not processes:
             return []
-            
         # Make a copy to avoid modifying the original list
-        scheduled_processes = processes.copy()
-        
-        if self.algorithm == "Round Robin":
-            return self._round_robin(scheduled_processes)
-        elif self.algorithm == "Priority":
-            return self._priority_scheduling(scheduled_processes)
-        elif self.algorithm == "First Come First Served":
-            return self._fcfs(scheduled_processes)
-        else:
-            return scheduled_processes
-    
-    def _round_robin(self, processes):
-        # Simple round robin implementation - just rotate the list
-        # In a real implementation, we would manage time slices
-        if processes:
-            # Move first process to the end
-            first = processes.pop(0)
-            processes.append(first)
-        return processes
-    
-    def _priority_scheduling(self, processes):
-        # Sort processes by priority (higher priority value = higher priority)
-        # Only running and waiting processes are considered for scheduling
-        active_processes = [p for p in processes if p.status in ["Running", "Waiting"]]
-        inactive_processes = [p for p in processes if p.status not in ["Running", "Waiting"]]
-        
-        # Sort by priority (descending)
-        sorted_active = sorted(active_processes, key=lambda p: p.priority, reverse=True)
-        
-        # Update status - highest priority process gets to run if it's waiting
-        if sorted_active and sorted_active[0].status == "Waiting":
-            sorted_active[0].status = "Running"
-        
-        # Combine sorted active processes with inactive ones
-        return sorted_active + inactive_processes
-    
-    def _fcfs(self, processes):
-        # First Come First Served - sort by start time
-        # Only running and waiting processes are considered for scheduling
-        active_processes = [p for p in processes if p.status in ["Running", "Waiting"]]
-        inactive_processes = [p for p in processes if p.status not in ["Running", "Waiting"]]
-        
-        # Sort by start time (ascending)
-        sorted_active = sorted(active_processes, key=lambda p: p.start_time)
-        
-        # Update status - earliest process gets to run if it's waiting
-        if sorted_active and sorted_active[0].status == "Waiting":
-            sorted_active[0].status = "Running"
-        
-        # Combine sorted active processes with inactive ones
-        return sorted_active + inactive_processes
+        return self.policy.order(processes.copy())
@@ -0,0 +1,244 @@
+# core/scheduling_metrics.py
+# Per-process scheduling metrics kept incrementally by the Scheduler:
+# arrival, first run, completion and time spent waiting in the ready queue.
+# Finished processes are folded into streaming aggregates (mean and
+# quantiles from a bounded log-bucket sketch) and then forgotten, so memory
+# stays proportional to the live processes, not to everything ever run.
+import math
+from collections import deque
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    # Log-spaced buckets with `relative_accuracy` error on every quantile
+    # (the DDSketch idea). When more than `max_buckets` are in use the lowest
+    # ones are merged, so only the small tail loses accuracy.
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048, min_value=1e-9):
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self._gamma = gamma
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self._buckets = {}   # bucket index -> count
+        self._zero = 0       # values at or below min_value
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= self.min_value:
+            self._zero += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self._buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        # Fold the two lowest buckets into one
+        lowest, second = sorted(self._buckets)[:2]
+        self._buckets[second] += self._buckets.pop(lowest)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i]
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def state(self):
+        # Plain data (for core.session); restore with load_state()
+        return {"buckets": [[index, count] for index, count in self._buckets.items()],
+                "zero": self._zero, "count": self.count}
+
+    def load_state(self, state):
+        self._buckets = {index: count for index, count in state["buckets"]}
+        self._zero = state["zero"]
+        self.count = state["count"]
+
+
+class StreamingStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+        self.sketch.add(value)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def state(self):
+        return {"count": self.count, "total": self.total, "min": self.min, "max": self.max,
+                "sketch": self.sketch.state()}
+
+    def load_state(self, state):
+        self.count = state["count"]
+        self.total = state["total"]
+        self.min = state["min"]
+        self.max = state["max"]
+        self.sketch.load_state(state["sketch"])
+
+    def summary(self):
+        result = {"count": self.count, "mean": self.mean(), "min": self.min, "max": self.max}
+        for q in QUANTILES:
+            result[f"p{round(q * 100)}"] = self.sketch.quantile(q)
+        return result
+
+
+class _ProcessTimes:
+    __slots__ = ("arrival", "first_run", "service", "suspended", "left_at")
+
+    def __init__(self, arrival):
+        self.arrival = arrival
+        self.first_run = None
+        self.service = 0.0     # seconds spent holding the CPU
+        self.suspended = 0.0   # seconds spent out of the ready queue (Stopped)
+        self.left_at = None    # when it was last taken out of the queue
+
+
+class SchedulingMetrics:
+    def __init__(self, throughput_window=60):
+        self.throughput_window = throughput_window   # seconds of completions/sec history
+        self.turnaround = StreamingStats()           # completion - arrival
+        self.waiting = StreamingStats()              # time ready but not running
+        self.response = StreamingStats()             # first run - arrival
+        self.completed = 0
+        self.aborted = 0      # left the queue for good without finishing its burst
+        self.started_at = None
+        self.last_completed_at = None
+        self._live = {}       # pid -> _ProcessTimes
+        self._recent = deque()  # (second, completions) for the throughput window
+
+    def arrive(self, pid, now):
+        if self.started_at is None:
+            self.started_at = now
+        times = self._live.get(pid)
+        if times is None:
+            self._live[pid] = _ProcessTimes(now)
+        elif times.left_at is not None:
+            # Back in the ready queue after being stopped
+            times.suspended += now - times.left_at
+            times.left_at = None
+
+    def ran(self, pid, start, elapsed):
+        times = self._live.get(pid)
+        if times is None:
+            return
+        if times.first_run is None:
+            times.first_run = start
+            self.response.add(start - times.arrival)
+        times.service += elapsed
+
+    def leave(self, pid, now, completed):
+        # Out of the ready queue: finished its work, or stopped by someone
+        times = self._live.get(pid)
+        if times is None:
+            return
+        if not completed:
+            if times.left_at is None:
+                times.left_at = now
+            return
+        del self._live[pid]
+        turnaround = now - times.arrival
+        self.turnaround.add(turnaround)
+        self.waiting.add(max(turnaround - times.service - times.suspended, 0.0))
+        self.completed += 1
+        self.last_completed_at = now
+        second = math.floor(now)
+        if self._recent and self._recent[-1][0] == second:
+            self._recent[-1][1] += 1
+        else:
+            self._recent.append([second, 1])
+
+    def forget(self, pid):
+        # Removed before finishing
+        if self._live.pop(pid, None) is not None:
+            self.aborted += 1
+
+    def current_wait(self, pid, now):
+        # Waiting time so far of a live process
+        times = self._live.get(pid)
+        if times is None:
+            return None
+        end = times.left_at if times.left_at is not None else now
+        return max(end - times.arrival - times.service - times.suspended, 0.0)
+
+    def throughput(self, now):
+        # Completions per second over the last throughput_window seconds
+        recent = self._recent
+        horizon = now - self.throughput_window
+        while recent and recent[0][0] < horizon:
+            recent.popleft()
+        if not recent or self.started_at is None:
+            return 0.0
+        span = min(self.throughput_window, now - self.started_at)
+        return sum(count for _, count in recent) / span if span > 0 else 0.0
+
+    def state(self):
+        # Plain data (for core.session keyframes); `live` has one
+        # [pid, arrival, first_run, service, suspended, left_at] row per live process
+        return {
+            "throughput_window": self.throughput_window,
+            "turnaround": self.turnaround.state(),
+            "waiting": self.waiting.state(),
+            "response": self.response.state(),
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "started_at": self.started_at,
+            "last_completed_at": self.last_completed_at,
+            "recent": [list(entry) for entry in self._recent],
+            "live": [[pid, times.arrival, times.first_run, times.service, times.suspended, times.left_at]
+                     for pid, times in self._live.items()],
+        }
+
+    def load_state(self, state):
+        self.throughput_window = state["throughput_window"]
+        for name in ("turnaround", "waiting", "response"):
+            getattr(self, name).load_state(state[name])
+        self.completed = state["completed"]
+        self.aborted = state["aborted"]
+        self.started_at = state["started_at"]
+        self.last_completed_at = state["last_completed_at"]
+        self._recent = deque([list(entry) for entry in state["recent"]])
+        self._live = {}
+        for pid, arrival, first_run, service, suspended, left_at in state["live"]:
+            times = self._live[pid] = _ProcessTimes(arrival)
+            times.first_run = first_run
+            times.service = service
+            times.suspended = suspended
+            times.left_at = left_at
+
+    def summary(self, now):
+        return {
+            "turnaround": self.turnaround.summary(),
+            "waiting": self.waiting.summary(),
+            "response": self.response.summary(),
+            "completed": self.completed,
+            "aborted": self.aborted,
+            "live": len(self._live),
+            "throughput": self.throughput(now),
+            "overall_throughput": (self.completed / (now - self.started_at)
+                                   if self.started_at is not None and now > self.started_at else 0.0),
+            # First arrival to last completion
+            "makespan": (self.last_completed_at - self.started_at
+                         if self.last_completed_at is not None else None),
+        }
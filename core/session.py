@@ -0,0 +1,802 @@
+# core/session.py
+# Recorded simulation sessions. A session file starts with a keyframe holding
+# the full state, followed by one delta record per frame with only what
+# changed: processes added, removed or with changed fields, new history
+# samples and new execution slices. A keyframe is repeated every
+# `keyframe_every` frames, so seeking to any tick decodes one keyframe and at
+# most that many deltas, and playback never re-simulates anything.
+#
+#   python -m core.simulation --ticks 100000 --record data/run.tmsess
+#   python -m core.session info data/run.tmsess
+#   python -m core.simulation --resume data/run.tmsess --ticks 1000
+#   TASK_MANAGER_SOURCE=session TASK_MANAGER_SESSION=data/run.tmsess streamlit run main.py
+#
+# Layout (little-endian): SESSION_MAGIC, then records of
+#   kind u1 | tick i8 | clock f8 | payload length u4 | zlib payload
+# where a payload is a u4 header length, a JSON header (scalars and the
+# name, dtype and shape of each array) and the raw array bytes. Keyframes
+# also carry the scheduler's run queues, policy state and metrics, so
+# restore() can build a Simulation that carries on from one.
+import argparse
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+from core.instrumentation import count, timed
+from core.network import Network
+from core.process_manager import Process, ProcessManager
+from core.resource_analyzer import ResourceAnalyzer
+from core.runner import TRACE_SECONDS, Snapshot
+from core.scheduler import Scheduler
+from core.simulation import Simulation
+from core.timeseries import TimeSeries
+from core.trace import ExecutionTrace
+
+SESSION_MAGIC = b"TMSESS1\n"
+RECORD_HEADER = struct.Struct("<BqdI")
+KEYFRAME = 1
+DELTA = 2
+KEYFRAME_EVERY = 300       # frames per keyframe: the most deltas a seek decodes
+COMPRESSION_LEVEL = 1      # zlib; higher levels buy little on these records
+FLUSH_INTERVAL = 1.0       # wall seconds between flushes for readers following a recording
+
+# Per-process columns; NaN stands for None in the float ones
+PROCESS_COLUMNS = (
+    ("pid", np.int64),
+    ("status", np.int16),       # index into the session's status table
+    ("cpu_usage", np.float64),
+    ("memory_usage", np.float64),
+    ("priority", np.int64),
+    ("start_time", np.float64),
+    ("burst_time", np.float64),
+    ("remaining_time", np.float64),
+    ("current_cpu", np.float64),
+)
+
+
+def _encode(meta, arrays, level=COMPRESSION_LEVEL):
+    specs = []
+    blobs = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        specs.append([name, array.dtype.str, list(array.shape)])
+        blobs.append(array.tobytes())
+    header = json.dumps({"meta": meta, "arrays": specs}, separators=(",", ":")).encode()
+    return zlib.compress(struct.pack("<I", len(header)) + header + b"".join(blobs), level)
+
+
+def _decode(payload):
+    # (meta, {name: read-only array}); the arrays are views into one buffer
+    data = zlib.decompress(payload)
+    (size,) = struct.unpack_from("<I", data)
+    header = json.loads(data[4:4 + size])
+    offset = 4 + size
+    arrays = {}
+    for name, dtype, shape in header["arrays"]:
+        dtype = np.dtype(dtype)
+        items = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(data, dtype, items, offset).reshape(shape)
+        offset += items * dtype.itemsize
+    return header["meta"], arrays
+
+
+def _optional(value):
+    return np.nan if value is None else value
+
+
+def _changed(new, old):
+    # Elementwise "differs", with NaN equal to NaN
+    moved = new != old
+    if new.dtype.kind == "f":
+        moved &= ~(np.isnan(new) & np.isnan(old))
+    return moved
+
+
+class SessionRecorder:
+    # Records `simulation` into a session file every `interval` virtual
+    # seconds (default: every sample), after that moment's tick and sample
+    def __init__(self, simulation, path, interval=None, keyframe_every=KEYFRAME_EVERY, level=COMPRESSION_LEVEL):
+        self.simulation = simulation
+        self.path = path
+        self.interval = interval or simulation.sample_interval or simulation.tick_interval
+        self.keyframe_every = max(1, keyframe_every)
+        self.level = level
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_written = len(SESSION_MAGIC)
+        self._file = open(path, "wb")
+        self._file.write(SESSION_MAGIC)
+        self._statuses = {}      # status -> code, in the order first seen
+        self._previous = None    # process columns of the last frame, sorted by pid
+        self._series_at = {}     # history series -> time of the last sample written
+        self._trace_at = None    # clock of the last frame; later slices are new
+        self._last_kind = None
+        self._flushed_at = time.monotonic()
+        simulation.schedule_call(simulation.clock, self._on_frame)
+
+    def _on_frame(self):
+        if self._file is None:
+            return
+        self.record()
+        self.simulation.schedule_call(self.simulation.clock + self.interval, self._on_frame)
+
+    @timed("session.record")
+    def record(self, keyframe=None):
+        if keyframe is None:
+            keyframe = self.frames % self.keyframe_every == 0
+        simulation = self.simulation
+        meta, arrays = self._frame()
+        columns, names = self._processes()
+        if keyframe or self._previous is None:
+            kind = KEYFRAME
+            meta["names"] = names.tolist()
+            meta["affinity"] = self._affinity(columns["pid"])
+            arrays.update({f"process.{name}": column for name, column in columns.items()})
+            self._histories(meta, arrays, full=True)
+            self._trace(arrays, since=simulation.clock - TRACE_SECONDS)
+            self._scheduler_state(meta, arrays)
+        else:
+            kind = DELTA
+            self._delta(meta, arrays, columns, names)
+            self._histories(meta, arrays, full=False)
+            self._trace(arrays, since=self._trace_at)
+        meta["statuses"] = list(self._statuses)
+        self._previous = (columns, names)
+        self._trace_at = simulation.clock
+        self._write(kind, simulation.ticks, simulation.clock, _encode(meta, arrays, self.level))
+        self.frames += 1
+        if kind == KEYFRAME:
+            self.keyframes += 1
+        now = time.monotonic()
+        if kind == KEYFRAME or now - self._flushed_at >= FLUSH_INTERVAL:
+            # Readers (the dashboard) may follow a session still being recorded
+            self._file.flush()
+            self._flushed_at = now
+
+    def _write(self, kind, tick, clock, payload):
+        self._file.write(RECORD_HEADER.pack(kind, tick, clock, len(payload)))
+        self._file.write(payload)
+        self.bytes_written += RECORD_HEADER.size + len(payload)
+        self._last_kind = kind
+
+    def close(self):
+        # Ends with a keyframe, so restore() can carry on from the very end
+        if self._file is None:
+            return
+        if self._last_kind != KEYFRAME:
+            self.record(keyframe=True)
+        self._file.close()
+        self._file = None
+
+    def _frame(self):
+        simulation = self.simulation
+        scheduler = simulation.scheduler
+        network = simulation.network
+        meta = {
+            "ticks": simulation.ticks,
+            "completed": simulation.completed,
+            "algorithm": scheduler.algorithm,
+            "quantum": scheduler.quantum,
+            "cores": scheduler.cores,
+            "metrics": scheduler.metrics.summary(scheduler.clock),
+            "network_live": network.live,
+            "interface_rates": network.get_interface_rates(),
+            "socket_count": network.socket_count,
+        }
+        arrays = {
+            "running": np.array([-1 if pid is None else pid for pid in scheduler.running()], dtype=np.int64),
+            "queue_lengths": np.array(scheduler.queue_lengths(), dtype=np.int64),
+        }
+        return meta, arrays
+
+    def _processes(self):
+        # Columns and names of every process, sorted by pid
+        process_manager = self.simulation.process_manager
+        if hasattr(process_manager, "allocate_cpu"):
+            columns, names = self._columnar_processes(process_manager)
+        else:
+            columns, names = self._process_rows(process_manager.get_processes())
+        order = np.argsort(columns["pid"], kind="stable")
+        return {name: column[order] for name, column in columns.items()}, names[order]
+
+    def _process_rows(self, processes):
+        size = len(processes)
+        codes = self._statuses
+        columns = {
+            "pid": np.fromiter((p.pid for p in processes), np.int64, size),
+            "status": np.fromiter((codes.setdefault(p.status, len(codes)) for p in processes), np.int16, size),
+            "cpu_usage": np.fromiter((p.cpu_usage for p in processes), np.float64, size),
+            "memory_usage": np.fromiter((p.memory_usage for p in processes), np.float64, size),
+            "priority": np.fromiter((p.priority for p in processes), np.int64, size),
+            "start_time": np.fromiter((p.start_time for p in processes), np.float64, size),
+            "burst_time": np.fromiter((_optional(getattr(p, "burst_time", None)) for p in processes),
+                                      np.float64, size),
+            "remaining_time": np.fromiter((_optional(getattr(p, "remaining_time", None)) for p in processes),
+                                          np.float64, size),
+            "current_cpu": np.fromiter((getattr(p, "current_cpu", p.cpu_usage) for p in processes),
+                                       np.float64, size),
+        }
+        return columns, np.array([p.name for p in processes], dtype=object)
+
+    def _columnar_processes(self, store):
+        # Columnar store: copies of its columns instead of a walk over the rows
+        codes = self._statuses
+        lookup = np.array([codes.setdefault(status, len(codes)) for status in store.status_names()], dtype=np.int16)
+        columns = {
+            "pid": store.pid.astype(np.int64),
+            "status": lookup[store.status],
+            "cpu_usage": store.cpu_usage.astype(np.float64),
+            "memory_usage": store.memory_usage.astype(np.float64),
+            "priority": store.priority.astype(np.int64),
+            "start_time": store.start_time.astype(np.float64),
+            "burst_time": store.burst_time.copy(),
+            "remaining_time": store.remaining_time.copy(),
+            "current_cpu": store.current_cpu.astype(np.float64),
+        }
+        return columns, np.array(store.names(), dtype=object)
+
+    def _affinity(self, pids):
+        get_process = self.simulation.process_manager.get_process
+        result = []
+        for pid in pids.tolist():
+            affinity = getattr(get_process(pid), "affinity", None)
+            if affinity:
+                result.append([pid, list(affinity)])
+        return result
+
+    def _delta(self, meta, arrays, columns, names):
+        previous, previous_names = self._previous
+        old_pid, pid = previous["pid"], columns["pid"]
+        arrays["removed"] = old_pid[~np.isin(old_pid, pid, assume_unique=True)]
+        new = ~np.isin(pid, old_pid, assume_unique=True)
+        added = np.flatnonzero(new)
+        for name, column in columns.items():
+            arrays[f"added.{name}"] = column[added]
+        meta["names"] = names[added].tolist()
+        meta["affinity"] = self._affinity(pid[added])
+        # Kept rows: each column lists only the pids whose value moved
+        rows = np.flatnonzero(~new)
+        old_rows = np.searchsorted(old_pid, pid[rows])
+        for name, column in columns.items():
+            if name == "pid":
+                continue
+            moved = rows[_changed(column[rows], previous[name][old_rows])]
+            if len(moved):
+                arrays[f"changed.{name}.pid"] = pid[moved]
+                arrays[f"changed.{name}.value"] = column[moved]
+        renamed = rows[names[rows] != previous_names[old_rows]]
+        meta["renamed"] = [[p, n] for p, n in zip(pid[renamed].tolist(), names[renamed].tolist())]
+
+    def _series(self):
+        analyzer = self.simulation.resource_analyzer
+        series = {
+            "cpu": analyzer.cpu_history,
+            "memory": analyzer.memory_history,
+            "network": self.simulation.network.network_history,
+        }
+        for core, history in enumerate(analyzer.core_history):
+            series[f"core.{core}"] = history
+        return series
+
+    def _histories(self, meta, arrays, full):
+        analyzer = self.simulation.resource_analyzer
+        network = self.simulation.network
+        meta["history"] = {
+            "size": analyzer.history_size,
+            "resolutions": analyzer.cpu_history.resolutions(),
+            "network_size": network.network_history.capacity,
+            "network_resolutions": network.network_history.resolutions(),
+            "cores": len(analyzer.core_history),
+        }
+        for name, series in self._series().items():
+            times = series.times()
+            values = series.values()
+            last = self._series_at.get(name)
+            if not full and last is not None:
+                # Times only grow, so the new samples are a suffix
+                start = int(np.searchsorted(times, last, side="right"))
+                times, values = times[start:], values[start:]
+            if len(times):
+                self._series_at[name] = float(times[-1])
+            arrays[f"history.{name}.time"] = times
+            arrays[f"history.{name}.value"] = values
+
+    def _trace(self, arrays, since):
+        for core, trace in enumerate(self.simulation.scheduler.traces):
+            window = trace.window(since, None)
+            for column in ("pid", "start", "end"):
+                arrays[f"trace.{core}.{column}"] = window[column]
+
+    def _scheduler_state(self, meta, arrays):
+        scheduler = self.simulation.scheduler
+        waiting = [policy.queue()[1 if policy.running is not None else 0:] for policy in scheduler.policies]
+        arrays["queue.pid"] = np.array([pid for queue in waiting for pid in queue], dtype=np.int64)
+        arrays["queue.lengths"] = np.array([len(queue) for queue in waiting], dtype=np.int64)
+        arrays["queue.slice_used"] = np.array([policy.slice_used for policy in scheduler.policies],
+                                              dtype=np.float64)
+        state = scheduler.metrics.state()
+        # The per-process rows go in an array; None becomes NaN
+        arrays["metrics.live"] = np.array(state.pop("live"), dtype=np.float64).reshape(-1, 6)
+        meta["metrics_state"] = state
+        meta["policy_states"] = [policy.state() for policy in scheduler.policies]
+        meta["scheduler_ticks"] = scheduler.ticks
+        meta["scheduler_clock"] = scheduler.clock
+        meta["migrations"] = scheduler.migrations
+        meta["tick_interval"] = self.simulation.tick_interval
+        meta["sample_interval"] = self.simulation.sample_interval
+
+
+class SessionReader:
+    # Index of a session file: one (kind, tick, clock, offset, length) per
+    # record, built from the record headers alone. refresh() picks up records
+    # appended since, so a session can be read while it is being recorded.
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a session file")
+        self.kinds = []
+        self.ticks = []
+        self.clocks = []
+        self.offsets = []
+        self.lengths = []
+        self.keyframes = []      # positions of the keyframes
+        self._end = len(SESSION_MAGIC)
+        self.refresh()
+
+    def refresh(self):
+        file = self._file
+        size = os.fstat(file.fileno()).st_size
+        while self._end + RECORD_HEADER.size <= size:
+            file.seek(self._end)
+            kind, tick, clock, length = RECORD_HEADER.unpack(file.read(RECORD_HEADER.size))
+            offset = self._end + RECORD_HEADER.size
+            if offset + length > size:
+                break  # still being written
+            if kind == KEYFRAME:
+                self.keyframes.append(len(self.ticks))
+            elif not self.keyframes:
+                raise ValueError(f"{self.path} does not start with a keyframe")
+            self.kinds.append(kind)
+            self.ticks.append(tick)
+            self.clocks.append(clock)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+            self._end = offset + length
+        return len(self.ticks)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def position_of(self, tick):
+        # The last record at or before `tick` (the first one if it is earlier)
+        return max(bisect.bisect_right(self.ticks, tick) - 1, 0)
+
+    def keyframe_before(self, position):
+        return self.keyframes[bisect.bisect_right(self.keyframes, position) - 1]
+
+    def read(self, position):
+        # (kind, tick, clock, meta, arrays) of one record
+        self._file.seek(self.offsets[position])
+        meta, arrays = _decode(self._file.read(self.lengths[position]))
+        return self.kinds[position], self.ticks[position], self.clocks[position], meta, arrays
+
+    def close(self):
+        self._file.close()
+
+
+class _RecordedMetrics:
+    def __init__(self):
+        self.recorded = None
+
+    def summary(self, now):
+        return self.recorded
+
+
+class RecordedScheduler:
+    # The read side of a Scheduler, as it was recorded
+    def __init__(self, algorithm="Round Robin", quantum=2, cores=1):
+        self.algorithm = algorithm
+        self.quantum = quantum
+        self.cores = cores
+        self.clock = 0.0
+        self.metrics = _RecordedMetrics()
+        self.traces = [ExecutionTrace() for _ in range(cores)]
+        self._running = [None] * cores
+        self._queue_lengths = [0] * cores
+
+    @property
+    def current(self):
+        return self._running[0]
+
+    def running(self):
+        return list(self._running)
+
+    def queue_lengths(self):
+        return list(self._queue_lengths)
+
+    def trace_window(self, start=None, end=None):
+        # Merged as a live Scheduler merges its per-core traces
+        return Scheduler.trace_window(self, start, end)
+
+
+class SessionState:
+    # What the dashboard reads from a Simulation, rebuilt from session
+    # records: apply() a keyframe, then the deltas after it in order
+    def __init__(self):
+        self.process_manager = ProcessManager()
+        self.resource_analyzer = ResourceAnalyzer()
+        self.network = Network()
+        self.scheduler = RecordedScheduler()
+        self.metrics_store = None
+        self.sampler = None
+        self.clock = 0.0
+        self.ticks = 0
+        self.completed = 0
+        self.position = None     # reader position of the record applied last
+        self._statuses = []
+
+    @timed("session.apply")
+    def apply(self, kind, tick, clock, meta, arrays):
+        self._statuses = meta["statuses"]
+        if kind == KEYFRAME:
+            self._load_keyframe(meta, arrays)
+        else:
+            self._apply_delta(meta, arrays)
+        self._apply_frame(clock, meta, arrays)
+
+    def _load_keyframe(self, meta, arrays):
+        history = meta["history"]
+        self.process_manager = ProcessManager()
+        self.resource_analyzer = ResourceAnalyzer(history["size"], history["resolutions"])
+        self.network = Network(history["network_size"], history["network_resolutions"])
+        self.scheduler = RecordedScheduler(meta["algorithm"], meta["quantum"], meta["cores"])
+        self._add(meta, arrays, "process")
+        self._extend_histories(meta, arrays)
+        self._extend_traces(arrays)
+
+    def _add(self, meta, arrays, prefix):
+        usage = self.resource_analyzer.process_cpu_usage
+        for process in _processes(meta, arrays, prefix, self._statuses):
+            self.process_manager.add_process(process)
+            usage[process.pid] = process.current_cpu if process.status == "Running" else 0
+
+    def _apply_delta(self, meta, arrays):
+        if meta["cores"] != self.scheduler.cores:
+            # A live Scheduler starts new per-core traces when its core count changes
+            self.scheduler.cores = meta["cores"]
+            self.scheduler.traces = [ExecutionTrace() for _ in range(meta["cores"])]
+        process_manager = self.process_manager
+        usage = self.resource_analyzer.process_cpu_usage
+        removed = arrays["removed"].tolist()
+        if removed:
+            process_manager.remove_processes(removed)
+            for pid in removed:
+                usage.pop(pid, None)
+        self._add(meta, arrays, "added")
+        get_process = process_manager.get_process
+        touched = set()
+        for name, _ in PROCESS_COLUMNS[1:]:
+            pids = arrays.get(f"changed.{name}.pid")
+            if pids is None:
+                continue
+            values = arrays[f"changed.{name}.value"]
+            touched.update(pids.tolist())
+            if name == "status":
+                # One bulk update per new status
+                for code in np.unique(values).tolist():
+                    process_manager.update_processes_status(self._statuses[code], pids[values == code].tolist())
+                continue
+            optional = name in ("burst_time", "remaining_time")
+            for pid, value in zip(pids.tolist(), values.tolist()):
+                if optional and value != value:
+                    value = None
+                setattr(get_process(pid), name, value)
+        for pid, name in meta["renamed"]:
+            get_process(pid).name = name
+        for pid in touched:
+            process = get_process(pid)
+            usage[pid] = process.current_cpu if process.status == "Running" else 0
+        self._extend_histories(meta, arrays)
+        self._extend_traces(arrays)
+
+    def _extend_histories(self, meta, arrays):
+        analyzer = self.resource_analyzer
+        cores = meta["history"]["cores"]
+        if cores != len(analyzer.core_history):
+            # As update_cores() does when the core count changes
+            analyzer.core_history = [TimeSeries(analyzer.history_size, resolutions=()) for _ in range(cores)]
+        series = {"cpu": analyzer.cpu_history, "memory": analyzer.memory_history,
+                  "network": self.network.network_history}
+        for core, history in enumerate(analyzer.core_history):
+            series[f"core.{core}"] = history
+        for name, history in series.items():
+            times = arrays.get(f"history.{name}.time")
+            if times is None:
+                continue
+            for value, at in zip(arrays[f"history.{name}.value"].tolist(), times.tolist()):
+                history.append(value, at)
+
+    def _extend_traces(self, arrays):
+        for core, trace in enumerate(self.scheduler.traces):
+            pids = arrays.get(f"trace.{core}.pid")
+            if pids is None:
+                continue
+            for pid, start, end in zip(pids.tolist(), arrays[f"trace.{core}.start"].tolist(),
+                                       arrays[f"trace.{core}.end"].tolist()):
+                trace.record(pid, start, end)
+
+    def _apply_frame(self, clock, meta, arrays):
+        self.clock = clock
+        self.ticks = meta["ticks"]
+        self.completed = meta["completed"]
+        scheduler = self.scheduler
+        scheduler.clock = clock
+        scheduler.algorithm = meta["algorithm"]
+        scheduler.quantum = meta["quantum"]
+        scheduler._running = [None if pid < 0 else pid for pid in arrays["running"].tolist()]
+        scheduler._queue_lengths = arrays["queue_lengths"].tolist()
+        scheduler.metrics.recorded = meta["metrics"]
+        network = self.network
+        network.live = meta["network_live"]
+        network.interface_rates = {name: tuple(rates) for name, rates in meta["interface_rates"].items()}
+        network.socket_count = meta["socket_count"]
+        if len(network.network_history):
+            network.rate = float(network.network_history[-1])
+
+
+def _processes(meta, arrays, prefix, statuses):
+    # Process objects for the rows of `prefix`.* (a keyframe's or a delta's added rows)
+    columns = {name: arrays[f"{prefix}.{name}"].tolist() for name, _ in PROCESS_COLUMNS}
+    affinity = {pid: cores for pid, cores in meta["affinity"]}
+    for row, name in enumerate(meta["names"]):
+        pid = columns["pid"][row]
+        burst_time = columns["burst_time"][row]
+        remaining_time = columns["remaining_time"][row]
+        process = Process(pid, name, statuses[columns["status"][row]], columns["cpu_usage"][row],
+                          columns["memory_usage"][row], columns["priority"][row], columns["start_time"][row],
+                          None if burst_time != burst_time else burst_time, affinity.get(pid))
+        process.remaining_time = None if remaining_time != remaining_time else remaining_time
+        process.current_cpu = columns["current_cpu"][row]
+        yield process
+
+
+class SessionPlayer:
+    # Plays a session back through the interface of a SimulationRunner: the
+    # dashboard renders recorded frames at `speed` times the recorded pace and
+    # can seek to any tick. Recorded sessions are read-only, so changes
+    # submitted from the UI are dropped.
+    def __init__(self, path, speed=1.0, publish_interval=0.5, max_batch=1000):
+        self.reader = SessionReader(path)
+        if not len(self.reader):
+            raise ValueError(f"{path} has no records yet")
+        self.simulation = SessionState()
+        self.speed = speed
+        self.paused = False
+        self.publish_interval = publish_interval
+        self.max_batch = max_batch   # records applied between publishes
+        self.last_error = None
+        self._commands = deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seek(self.reader.ticks[0])
+        self._snapshot = Snapshot(self.simulation)
+
+    @property
+    def first_tick(self):
+        return self.reader.ticks[0]
+
+    @property
+    def last_tick(self):
+        return self.reader.ticks[-1]
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-player", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def submit(self, fn, *args, **kwargs):
+        self.last_error = "Recorded sessions are read-only"
+        count("session.dropped_commands")
+
+    # Playback controls, carried out on the player thread
+    def seek(self, tick):
+        self._commands.append((self._seek, tick))
+
+    def set_speed(self, speed):
+        self._commands.append((self._set_speed, speed))
+
+    def set_paused(self, paused):
+        self._commands.append((self._set_paused, paused))
+
+    def _seek(self, tick):
+        # Rolls forward from the current record when that is on the way,
+        # otherwise from the last keyframe before `tick`
+        reader = self.reader
+        state = self.simulation
+        target = reader.position_of(tick)
+        keyframe = reader.keyframe_before(target)
+        if state.position is not None and keyframe <= state.position <= target:
+            start = state.position + 1
+        else:
+            start = keyframe
+        for position in range(start, target + 1):
+            state.apply(*reader.read(position))
+            state.position = position
+        self._anchor()
+
+    def _set_speed(self, speed):
+        self.speed = speed
+        self._anchor()
+
+    def _set_paused(self, paused):
+        self.paused = paused
+        self._anchor()
+
+    def _anchor(self):
+        # Playback time is measured from here
+        self._anchored_at = time.monotonic()
+        self._anchor_clock = self.simulation.clock
+
+    def _advance(self):
+        # Applies the records due by now; returns how many
+        reader = self.reader
+        state = self.simulation
+        due_clock = self._anchor_clock + (time.monotonic() - self._anchored_at) * self.speed
+        applied = 0
+        while applied < self.max_batch:
+            position = state.position + 1
+            if position >= len(reader) and reader.refresh() <= position:
+                break
+            if reader.clocks[position] > due_clock:
+                break
+            state.apply(*reader.read(position))
+            state.position = position
+            applied += 1
+        return applied
+
+    @timed("runner.publish")
+    def _publish(self):
+        self._snapshot = Snapshot(self.simulation, self._snapshot)
+
+    def _run(self):
+        last_publish = time.monotonic()
+        while not self._stop.is_set():
+            commanded = False
+            while self._commands:
+                fn, argument = self._commands.popleft()
+                try:
+                    fn(argument)
+                except Exception as e:
+                    self.last_error = e
+                    print(f"Error applying session command: {e}")
+                commanded = True
+            try:
+                applied = 0 if self.paused else self._advance()
+            except Exception as e:
+                # A damaged record: stop on the last good frame, like SimulationRunner
+                self.last_error = e
+                print(f"Session playback stopped: {e!r}")
+                self._publish()
+                return
+            now = time.monotonic()
+            if commanded or (applied and now - last_publish >= self.publish_interval):
+                self._publish()
+                last_publish = now
+            if not applied:
+                self._stop.wait(0.02)
+
+
+def restore(path, tick=None, metrics_store=None, sampler=None):
+    # A Simulation carrying on from the last keyframe at or before `tick`
+    # (default: the end of the session)
+    reader = SessionReader(path)
+    try:
+        position = reader.keyframe_before(reader.position_of(tick) if tick is not None else len(reader) - 1)
+        _, _, _, meta, arrays = reader.read(position)
+    finally:
+        reader.close()
+    process_manager = ProcessManager()
+    for process in _processes(meta, arrays, "process", meta["statuses"]):
+        process_manager.add_process(process)
+
+    scheduler = Scheduler(meta["cores"])
+    scheduler.set_algorithm(meta["algorithm"])
+    scheduler.quantum = meta["quantum"]
+    scheduler.clock = meta["scheduler_clock"]
+    scheduler.attach(process_manager)
+    lengths = arrays["queue.lengths"].tolist()
+    bounds = np.cumsum([0] + lengths).tolist()
+    pids = arrays["queue.pid"].tolist()
+    queues = [pids[bounds[core]:bounds[core + 1]] for core in range(len(lengths))]
+    running = [None if pid < 0 else pid for pid in arrays["running"].tolist()]
+    scheduler.restore_queues(queues, running, arrays["queue.slice_used"].tolist(), meta["policy_states"])
+    state = dict(meta["metrics_state"])
+    state["live"] = [[int(row[0])] + [None if value != value else value for value in row[1:]]
+                     for row in arrays["metrics.live"].tolist()]
+    scheduler.metrics.load_state(state)
+    scheduler.ticks = meta["scheduler_ticks"]
+    scheduler.migrations = meta["migrations"]
+
+    history = meta["history"]
+    replayed = SessionState()
+    replayed.resource_analyzer = ResourceAnalyzer(history["size"], history["resolutions"])
+    replayed.network = Network(history["network_size"], history["network_resolutions"])
+    replayed.scheduler = scheduler
+    replayed._extend_histories(meta, arrays)
+    replayed._extend_traces(arrays)
+
+    # The scheduler clock is where the next tick is due. A session closed
+    # between a tick and its sample carries on with that sample.
+    sample_interval = meta["sample_interval"]
+    sampled = replayed.resource_analyzer.cpu_history.times()
+    sample_at = sampled[-1] + sample_interval if len(sampled) and sample_interval else None
+    simulation = Simulation(process_manager, scheduler, replayed.resource_analyzer, replayed.network,
+                            tick_interval=meta["tick_interval"], sample_interval=sample_interval,
+                            start=scheduler.clock, metrics_store=metrics_store, sampler=sampler,
+                            sample_at=sample_at)
+    simulation.ticks = meta["ticks"]
+    simulation.completed = meta["completed"]
+    return simulation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a recorded session")
+    parser.add_argument("command", choices=("info",))
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, nargs="*", default=None,
+                        help="ticks to time a cold seek to (default: a few spread over the session)")
+    args = parser.parse_args(argv)
+
+    reader = SessionReader(args.path)
+    if not len(reader):
+        print("No records")
+        return 1
+    size = os.path.getsize(args.path)
+    keyframe_bytes = sum(reader.lengths[position] for position in reader.keyframes)
+    deltas = len(reader) - len(reader.keyframes)
+    print(f"Records:    {len(reader)} ({len(reader.keyframes)} keyframes)")
+    print(f"Ticks:      {reader.ticks[0]} .. {reader.ticks[-1]}")
+    print(f"Clock:      {reader.clocks[0]:.1f}s .. {reader.clocks[-1]:.1f}s")
+    print(f"Size:       {size / 2 ** 20:.2f} MB ({keyframe_bytes / max(len(reader.keyframes), 1) / 1024:.1f} KB "
+          f"per keyframe, {(sum(reader.lengths) - keyframe_bytes) / max(deltas, 1) / 1024:.2f} KB per delta)")
+    ticks = args.seek
+    if ticks is None:
+        first, last = reader.ticks[0], reader.ticks[-1]
+        ticks = sorted({first + (last - first) * step // 4 for step in range(5)})
+    for tick in ticks:
+        started = time.perf_counter()
+        state = SessionState()
+        target = reader.position_of(tick)
+        for position in range(reader.keyframe_before(target), target + 1):
+            state.apply(*reader.read(position))
+        elapsed = time.perf_counter() - started
+        print(f"Seek to {tick:>10}: {elapsed * 1000:8.1f} ms ({len(state.process_manager)} processes)")
+    reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
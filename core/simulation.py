@@ -0,0 +1,278 @@
+# core/simulation.py
+# Headless discrete-event simulation. A virtual clock and an event queue drive
+# the Scheduler, ResourceAnalyzer and Network, so the tick rate is no longer
+# tied to Streamlit reruns.
+#
+#   python -m core.simulation --ticks 1000000 --algorithm "Priority"
+import argparse
+import heapq
+import itertools
+import os
+import time
+
+from core.process_manager import ProcessManager
+from core.scheduler import Scheduler
+from core.resource_analyzer import ResourceAnalyzer
+from core.network import Network
+from core.metrics_store import MetricsStore
+from core.collectors import SimulatedNetworkCollector
+from core.sampler import InlineSampler
+from core.columnar_store import STATUS_CODES
+from core.policies import policy_names
+from core.workload import WorkloadStream, iter_processes, load_processes
+
+ALGORITHMS = policy_names()
+STREAM_CHECK_EVERY = 10000  # ticks between "has the stream drained?" checks
+
+
+class Simulation:
+    def __init__(self, process_manager=None, scheduler=None, resource_analyzer=None, network=None,
+                 tick_interval=1.0, sample_interval=1.0, start=0.0, metrics_store=None,
+                 sampler=None, collect_interval=None, retire_completed=False, sample_at=None):
+        self.process_manager = process_manager if process_manager is not None else ProcessManager()
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        if self.scheduler.process_manager is not self.process_manager:
+            # attach() stamps the starting processes' arrivals with the
+            # scheduler clock, which otherwise only catches up on the first tick
+            self.scheduler.clock = start
+            self.scheduler.attach(self.process_manager)
+        self.resource_analyzer = resource_analyzer if resource_analyzer is not None else ResourceAnalyzer()
+        self.network = network if network is not None else Network()
+        self.metrics_store = metrics_store  # optional on-disk MetricsStore
+        if sampler is None and sample_interval:
+            # The dummy source: simulated network usage on the virtual clock
+            sampler = InlineSampler([SimulatedNetworkCollector(sample_interval)])
+        self.sampler = sampler              # core.sampler Sampler or InlineSampler
+        # How often the sampler is polled for new samples
+        self.collect_interval = collect_interval or sample_interval or tick_interval
+        self.tick_interval = tick_interval
+        self.sample_interval = sample_interval
+        # Drop finished processes from the ProcessManager, so streamed
+        # workloads only keep the live ones in memory
+        self.retire_completed = retire_completed
+        self.clock = start       # virtual time in seconds
+        self.ticks = 0
+        self.completed = 0
+        self._events = []        # heap of (time, seq, kind, payload)
+        self._counter = itertools.count()
+        self._handlers = {
+            "tick": self._on_tick,
+            "sample": self._on_sample,
+            "arrival": self._on_arrival,
+            "collect": self._on_collect,
+            "call": self._on_call,
+        }
+        if sampler is not None:
+            # Collect first so the first tick already sees the host's processes
+            self.schedule_event(start, "collect")
+        self.schedule_event(start, "tick")
+        if sample_interval:
+            # sample_at: when a resumed run's next sample is due (default: start)
+            self.schedule_event(start if sample_at is None else sample_at, "sample")
+
+    def schedule_event(self, at, kind, payload=None):
+        heapq.heappush(self._events, (at, next(self._counter), kind, payload))
+
+    def schedule_call(self, at, callback):
+        # callback() runs when the clock reaches `at`
+        self.schedule_event(at, "call", callback)
+
+    def add_arrival(self, process, at=None):
+        # The process joins the ProcessManager when the clock reaches `at`
+        at = self.clock if at is None else at
+        process.start_time = at
+        self.schedule_event(at, "arrival", process)
+
+    def step(self):
+        at, _, kind, payload = heapq.heappop(self._events)
+        self.clock = at
+        self._handlers[kind](payload)
+
+    def run(self, ticks=None, until=None):
+        # Process events until `ticks` more ticks have run or the clock passes `until`
+        target = self.ticks + ticks if ticks is not None else None
+        events = self._events
+        while events:
+            if until is not None and events[0][0] > until:
+                break
+            if target is not None and self.ticks >= target:
+                break
+            self.step()
+        if until is not None and self.clock < until:
+            self.clock = until
+        return self.ticks
+
+    def advance(self, seconds):
+        return self.run(until=self.clock + seconds)
+
+    def _on_tick(self, payload):
+        dt = self.tick_interval
+        ran = self.scheduler.tick(dt, self.clock)
+        self.ticks += 1
+        for pid in ran:
+            # Charge the slice to each process that ran and retire it when done
+            process = self.process_manager.get_process(pid)
+            remaining = getattr(process, "remaining_time", None)
+            if remaining is not None:
+                remaining -= dt
+                if remaining <= 0:
+                    process.remaining_time = 0
+                    process.status = "Stopped"
+                    self.completed += 1
+                    if self.retire_completed:
+                        self.process_manager.remove_process(pid)
+                else:
+                    process.remaining_time = remaining
+        self.schedule_event(self.clock + dt, "tick")
+
+    def _on_sample(self, payload):
+        # The scheduler splits the CPU per core with its policy
+        self.resource_analyzer.update(self.process_manager, self.scheduler, self.clock)
+        utilization = self.scheduler.core_utilization()
+        if self.resource_analyzer.host_cores:
+            # Live source: the host's real per-core usage
+            utilization = self.resource_analyzer.host_cores
+        self.resource_analyzer.update_cores(utilization, self.clock)
+        self.network.update(self.clock)
+        if self.metrics_store is not None:
+            self._persist_sample()
+        self.schedule_event(self.clock + self.sample_interval, "sample")
+
+    def _persist_sample(self):
+        store = self.metrics_store
+        store.record(self.clock,
+                     self.resource_analyzer.get_cpu_usage()[-1],
+                     self.resource_analyzer.get_memory_usage()[-1],
+                     self.network.get_network_usage()[-1])
+        process_manager = self.process_manager
+        if hasattr(process_manager, "allocate_cpu"):
+            # Columnar store: take the running rows straight from the columns
+            running = process_manager.status == STATUS_CODES["Running"]
+            store.record_process_cpu(self.clock, process_manager.pid[running], process_manager.current_cpu[running])
+        else:
+            running = process_manager.get_processes_by_status("Running")
+            store.record_process_cpu(self.clock, [p.pid for p in running],
+                                     [getattr(p, "current_cpu", 0) for p in running])
+
+    def _on_arrival(self, process):
+        # The scheduler stamps arrivals with its own clock, which otherwise
+        # only moves on ticks
+        self.scheduler.clock = self.clock
+        self.process_manager.add_process(process)
+
+    def _on_collect(self, payload):
+        # Only samples that already arrived; collection itself runs elsewhere
+        for collector, sample in self.sampler.poll(self.clock):
+            collector.apply(self, sample)
+        self.schedule_event(self.clock + self.collect_interval, "collect")
+
+    def _on_call(self, callback):
+        callback()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the task manager simulation without the UI")
+    parser.add_argument("--workload", default="data/dummy_processes.json",
+                        help="process file (.json, .ndjson or .bin from core.workload)")
+    parser.add_argument("--stream", action="store_true",
+                        help="feed processes in at their start_time offsets and drop them once finished")
+    parser.add_argument("--algorithm", default="Round Robin", choices=ALGORITHMS)
+    parser.add_argument("--cores", type=int, default=1, help="simulated CPU cores")
+    parser.add_argument("--quantum", type=float, default=2.0, help="time quantum (s) for Round Robin, MLFQ and the fair scheduler")
+    parser.add_argument("--ticks", type=int, default=1000000)
+    parser.add_argument("--tick-interval", type=float, default=1.0, help="virtual seconds per tick")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="virtual seconds between samples")
+    parser.add_argument("--burst", type=float, default=None,
+                        help="CPU seconds of work for processes without a burst_time")
+    parser.add_argument("--metrics-dir", default=None, help="persist samples to this MetricsStore directory")
+    parser.add_argument("--record", default=None, help="record the run into this session file (core.session)")
+    parser.add_argument("--keyframe-every", type=int, default=None, help="frames between keyframes when recording")
+    parser.add_argument("--resume", default=None,
+                        help="carry on from the end of this session file instead of loading --workload")
+    args = parser.parse_args(argv)
+
+    def with_burst(process):
+        if args.burst is not None and process.burst_time is None:
+            process.burst_time = process.remaining_time = args.burst
+        return process
+
+    # Stored samples need increasing timestamps across runs, so start at
+    # wall-clock time or after the store's last sample, whichever is later
+    metrics_store = MetricsStore(args.metrics_dir) if args.metrics_dir else None
+    stream = None
+    if args.resume:
+        # Scheduler settings, processes and histories all come from the session
+        from core.session import restore
+        if args.stream:
+            parser.error("--stream cannot be combined with --resume")
+        simulation = restore(args.resume, metrics_store=metrics_store)
+        if metrics_store is not None and (metrics_store.last_time() or -1) >= simulation.clock:
+            parser.error(f"{args.metrics_dir} already holds samples past the end of {args.resume}")
+        process_manager = simulation.process_manager
+        scheduler = simulation.scheduler
+        args.algorithm = scheduler.algorithm
+        args.cores = scheduler.cores
+    else:
+        process_manager = ProcessManager()
+        if args.stream:
+            if not os.path.exists(args.workload):
+                parser.error(f"could not load workload {args.workload}")
+        elif not load_processes(process_manager, args.workload):
+            parser.error(f"could not load workload {args.workload}")
+        for process in process_manager.get_processes():
+            with_burst(process)
+
+        scheduler = Scheduler(cores=args.cores)
+        scheduler.set_algorithm(args.algorithm)
+        scheduler.quantum = args.quantum
+        simulation = Simulation(process_manager, scheduler,
+                                tick_interval=args.tick_interval, sample_interval=args.sample_interval,
+                                start=metrics_store.start_time(args.sample_interval) if metrics_store else 0.0,
+                                metrics_store=metrics_store,
+                                retire_completed=args.stream)
+        if args.stream:
+            stream = WorkloadStream(simulation, map(with_burst, iter_processes(args.workload, ordered=True))).start()
+    recorder = None
+    if args.record:
+        from core.session import KEYFRAME_EVERY, SessionRecorder
+        recorder = SessionRecorder(simulation, args.record, keyframe_every=args.keyframe_every or KEYFRAME_EVERY)
+
+    started, started_ticks = time.perf_counter(), simulation.ticks
+    if stream is None:
+        simulation.run(ticks=args.ticks)
+    while stream is not None and simulation.ticks < args.ticks:
+        simulation.run(ticks=min(STREAM_CHECK_EVERY, args.ticks - simulation.ticks))
+        # Every streamed job that can finish has finished
+        if stream.exhausted and stream.finite and simulation.completed >= stream.finite:
+            break
+    elapsed = time.perf_counter() - started
+    if metrics_store is not None:
+        metrics_store.close()
+    if recorder is not None:
+        recorder.close()
+
+    cpu = simulation.resource_analyzer.get_cpu_usage()
+    print(f"Algorithm:       {args.algorithm}")
+    print(f"Ticks:           {simulation.ticks}")
+    print(f"Virtual time:    {simulation.clock:.1f}s")
+    print(f"Wall time:       {elapsed:.2f}s ({(simulation.ticks - started_ticks) / elapsed if elapsed else 0:,.0f} ticks/s)")
+    print(f"Completed:       {simulation.completed}")
+    if stream is not None:
+        print(f"Arrived:         {stream.fed} ({len(process_manager)} still live)")
+    if args.cores > 1:
+        print(f"Cores:           {args.cores} ({scheduler.migrations} migrations)")
+    if recorder is not None:
+        print(f"Recorded:        {recorder.frames} frames ({recorder.keyframes} keyframes), "
+              f"{recorder.bytes_written / 2 ** 20:.2f} MB to {args.record}")
+    print(f"Last CPU sample: {cpu[-1] if len(cpu) else 0}%")
+    metrics = simulation.scheduler.metrics.summary(simulation.clock)
+    print(f"Throughput:      {metrics['overall_throughput']:.4f} completions/s")
+    for name in ("turnaround", "waiting", "response"):
+        stats = metrics[name]
+        if stats["count"]:
+            print(f"{name.capitalize() + ':':<17}mean {stats['mean']:.2f}s  p50 {stats['p50']:.2f}s  "
+                  f"p95 {stats['p95']:.2f}s  p99 {stats['p99']:.2f}s  (n={stats['count']})")
+
+
+if __name__ == "__main__":
+    main()
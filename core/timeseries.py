@@ -0,0 +1,168 @@
+# core/timeseries.py
+# Fixed-size NumPy ring buffers for metric histories. Appends are O(1) and
+# never shift data; rollups keep min/max/avg per 1s and 1m bucket so long
+# histories stay cheap to keep and to chart.
+import math
+import time
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        # Every value is written twice (i and i + capacity), so the ordered
+        # contents are always one contiguous slice: views never need a copy.
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0   # next write position in [0, capacity)
+        self._size = 0
+
+    def append(self, value):
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        count = len(values)
+        capacity = self.capacity
+        if count >= capacity:
+            values = values[-capacity:]
+            self._data[:capacity] = values
+            self._data[capacity:] = values
+            self._head = 0
+            self._size = capacity
+            return
+        head = self._head
+        first = min(count, capacity - head)
+        self._data[head:head + first] = values[:first]
+        self._data[head + capacity:head + capacity + first] = values[:first]
+        rest = count - first
+        if rest:
+            self._data[:rest] = values[first:]
+            self._data[capacity:capacity + rest] = values[first:]
+        self._head = (head + count) % capacity
+        self._size = min(self._size + count, capacity)
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def view(self):
+        # Oldest to newest, read-only, zero-copy
+        start = (self._head - self._size) % self.capacity
+        view = self._data[start:start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def last(self, count):
+        view = self.view()
+        return view[max(len(view) - count, 0):]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+
+class _Rollup:
+    # One downsampled resolution: completed buckets plus the one being filled
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.time = RingBuffer(capacity)
+        self.min = RingBuffer(capacity)
+        self.max = RingBuffer(capacity)
+        self.avg = RingBuffer(capacity)
+        self._bucket = None
+        self._min = self._max = self._sum = 0.0
+        self._count = 0
+
+    def add(self, timestamp, value):
+        bucket = math.floor(timestamp / self.resolution)
+        if bucket != self._bucket:
+            self._flush()
+            self._bucket = bucket
+            self._min = self._max = self._sum = value
+            self._count = 1
+            return
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self._sum += value
+        self._count += 1
+
+    def _flush(self):
+        if self._count:
+            self.time.append(self._bucket * self.resolution)
+            self.min.append(self._min)
+            self.max.append(self._max)
+            self.avg.append(self._sum / self._count)
+
+    def window(self, points=None):
+        # Copies, including the partially filled current bucket
+        columns = {"time": self.time, "min": self.min, "max": self.max, "avg": self.avg}
+        partial = {
+            "time": self._bucket * self.resolution if self._count else None,
+            "min": self._min, "max": self._max,
+            "avg": self._sum / self._count if self._count else None,
+        }
+        limit = points - 1 if (points and self._count) else points
+        result = {}
+        for name, buffer in columns.items():
+            values = buffer.view() if limit is None else buffer.last(limit)
+            if self._count:
+                values = np.append(values, partial[name])
+            else:
+                values = values.copy()
+            result[name] = values
+        return result
+
+
+class TimeSeries:
+    def __init__(self, capacity=3600, resolutions=(1, 60), rollup_capacity=None, dtype=np.float64):
+        self.capacity = capacity
+        self._times = RingBuffer(capacity)
+        self._values = RingBuffer(capacity, dtype)
+        rollup_capacity = rollup_capacity if rollup_capacity is not None else capacity
+        self._rollups = {resolution: _Rollup(resolution, rollup_capacity) for resolution in resolutions}
+
+    def append(self, value, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        self._times.append(timestamp)
+        self._values.append(value)
+        for rollup in self._rollups.values():
+            rollup.add(timestamp, value)
+
+    def values(self):
+        return self._values.view()
+
+    def times(self):
+        return self._times.view()
+
+    def last(self, count):
+        return self._values.last(count)
+
+    def resolutions(self):
+        return list(self._rollups)
+
+    def rollup(self, resolution, points=None):
+        # {"time", "min", "max", "avg"} arrays for one downsampled resolution
+        return self._rollups[resolution].window(points)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values.view()[index]
+
+    def __iter__(self):
+        return iter(self._values.view())
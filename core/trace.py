@@ -0,0 +1,141 @@
+# core/trace.py
+# Compact execution trace: which pid held the CPU from when to when. Slices
+# live in parallel NumPy columns sorted by time, so a viewport is found with
+# two binary searches however long the trace gets.
+import numpy as np
+
+
+class ExecutionTrace:
+    def __init__(self, capacity=1 << 20, initial_capacity=1024):
+        # At most `capacity` slices are kept; the oldest half is dropped when full
+        self.capacity = capacity
+        size = min(initial_capacity, capacity)
+        self._pid = np.zeros(size, dtype=np.int64)
+        self._start = np.zeros(size, dtype=np.float64)
+        self._end = np.zeros(size, dtype=np.float64)
+        self._size = 0
+        self.dropped = 0   # slices discarded to stay within capacity
+
+    def _make_room(self):
+        size = self._size
+        if size < len(self._pid):
+            return
+        if size < self.capacity:
+            new_size = min(2 * len(self._pid), self.capacity)
+            for name in ("_pid", "_start", "_end"):
+                column = np.zeros(new_size, dtype=getattr(self, name).dtype)
+                column[:size] = getattr(self, name)[:size]
+                setattr(self, name, column)
+            return
+        keep = size // 2
+        for column in (self._pid, self._start, self._end):
+            column[:keep] = column[size - keep:size]
+        self.dropped += size - keep
+        self._size = keep
+
+    def record(self, pid, start, end):
+        size = self._size
+        if size:
+            last = size - 1
+            # Slices never overlap; float drift in the caller's clock is clamped
+            if start < self._end[last]:
+                start = self._end[last]
+            # The same pid running on without a gap extends its current slice
+            if self._pid[last] == pid and self._end[last] == start:
+                self._end[last] = end
+                return
+        self._make_room()
+        size = self._size
+        self._pid[size] = pid
+        self._start[size] = start
+        self._end[size] = max(end, start)
+        self._size = size + 1
+
+    def clear(self):
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def pid(self):
+        return self._pid[:self._size]
+
+    @property
+    def start(self):
+        return self._start[:self._size]
+
+    @property
+    def end(self):
+        return self._end[:self._size]
+
+    def time_range(self):
+        if not self._size:
+            return None
+        return float(self._start[0]), float(self._end[self._size - 1])
+
+    def window(self, start=None, end=None):
+        # Copies of the slices overlapping [start, end] as {"pid", "start", "end"};
+        # slices never overlap, so both start and end columns are sorted
+        lo = 0 if start is None else int(np.searchsorted(self.end, start, side="right"))
+        hi = self._size if end is None else int(np.searchsorted(self.start, end, side="left"))
+        hi = max(hi, lo)
+        return {
+            "pid": self._pid[lo:hi].copy(),
+            "start": self._start[lo:hi].copy(),
+            "end": self._end[lo:hi].copy(),
+        }
+
+
+def _factorize(pids):
+    # (distinct pids, row index of every entry); O(n) for real pid ranges
+    if len(pids) and pids.min() >= 0 and pids.max() < 1 << 23:
+        present = np.flatnonzero(np.bincount(pids))
+        index = np.zeros(present[-1] + 1, dtype=np.int64)
+        index[present] = np.arange(len(present))
+        return present, index[pids]
+    return np.unique(pids, return_inverse=True)
+
+
+def level_of_detail(slices, start, end, columns, max_rows=None):
+    # Merge slices for drawing [start, end] `columns` pixels wide: per pid,
+    # slices touching the same or adjacent pixel columns become one bar, so the
+    # result is bounded by rows * columns / 2 whatever the trace length.
+    # With max_rows only the pids with the most CPU time in view are kept.
+    # Returns {"pid", "start", "end"} bars ordered by pid, then time, plus
+    # "rows" (the pids shown, ascending) and "total_rows" (pids in view).
+    pid, slice_start, slice_end = slices["pid"], slices["start"], slices["end"]
+    if len(pid) == 0 or end <= start:
+        return {"pid": pid[:0], "start": slice_start[:0], "end": slice_end[:0], "rows": pid[:0], "total_rows": 0}
+    pids, rows = _factorize(pid)
+    total_rows = len(pids)
+    if max_rows is not None and len(pids) > max_rows:
+        busy = np.bincount(rows, weights=np.minimum(slice_end, end) - np.maximum(slice_start, start))
+        keep = np.sort(np.argsort(busy)[::-1][:max_rows])
+        remap = np.full(len(pids), -1)
+        remap[keep] = np.arange(len(keep))
+        rows = remap[rows]
+        shown = rows >= 0
+        rows, slice_start, slice_end = rows[shown], slice_start[shown], slice_end[shown]
+        pids = pids[keep]
+
+    pixel = (end - start) / columns
+    first = np.clip(np.floor((slice_start - start) / pixel).astype(np.int64), 0, columns - 1)
+    last = np.clip(np.ceil((slice_end - start) / pixel).astype(np.int64), first + 1, columns)
+    # Coverage per (row, column) from +1/-1 edges, without touching every cell of a slice
+    width = columns + 1
+    cells = len(pids) * width
+    edges = np.bincount(rows * width + first, minlength=cells) - np.bincount(rows * width + last, minlength=cells)
+    covered = np.zeros((len(pids), columns + 2), dtype=np.int8)
+    covered[:, 1:-1] = np.cumsum(edges.reshape(len(pids), width), axis=1)[:, :columns] > 0
+    changes = np.diff(covered, axis=1)
+    bar_rows, bar_first = np.nonzero(changes == 1)
+    _, bar_last = np.nonzero(changes == -1)
+    return {
+        "pid": pids[bar_rows],
+        "start": start + bar_first * pixel,
+        "end": start + bar_last * pixel,
+        "rows": pids,
+        "total_rows": total_rows,
+    }
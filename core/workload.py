@@ -0,0 +1,278 @@
+# core/workload.py
+# Seeded synthetic workloads and a streaming loader. The generator yields
+# fixed-size NumPy chunks and the writers append them one at a time, and
+# WorkloadStream hands processes to a Simulation only as its clock reaches
+# their arrival, so a 10M-process workload never sits in memory at once.
+#
+#   python -m core.workload --count 10000000 --rate 50 --arrival bursty \
+#       --burst lognormal --out data/big.bin
+#   python -m core.simulation --workload data/big.bin --stream --burst 5
+import argparse
+import itertools
+import json
+import math
+import os
+
+import numpy as np
+
+from core.process_manager import Process
+
+ARRIVALS = ("poisson", "bursty")
+BURSTS = ("exponential", "lognormal", "uniform")
+PRIORITY_LEVELS = 10          # priorities are 1..10 as in the control panel
+CHUNK_SIZE = 65536            # records generated, written and read per chunk
+STREAM_BATCH = 1024           # arrivals queued ahead in the simulation
+
+# Binary workloads are this header followed by packed records; a NaN
+# burst_time means the process never finishes
+BINARY_MAGIC = b"TMWORK1\n"
+RECORD_DTYPE = np.dtype([
+    ("pid", "<i8"),
+    ("start_time", "<f8"),
+    ("burst_time", "<f8"),
+    ("priority", "<i2"),
+    ("cpu_usage", "<f4"),
+    ("memory_usage", "<f4"),
+])
+
+
+def generate_workload(count, seed=0, arrival="poisson", rate=1.0, burstiness=10.0,
+                      burst="exponential", burst_mean=5.0, burst_sigma=1.0,
+                      priority_weights=None, first_pid=1, chunk_size=CHUNK_SIZE):
+    # Yields RECORD_DTYPE chunks sorted by start_time (seconds from 0).
+    #   arrival   "poisson": exponential gaps with mean 1/rate
+    #             "bursty":  clusters of on average `burstiness` arrivals,
+    #                        `burstiness` times faster than `rate` inside a
+    #                        cluster; the long-run rate is still `rate`
+    #   burst     CPU seconds per process with mean `burst_mean`
+    #   priority_weights  relative weight of priorities 1..10 (default uniform)
+    if arrival not in ARRIVALS:
+        raise ValueError(f"unknown arrival process {arrival!r}, expected one of {ARRIVALS}")
+    if burst not in BURSTS:
+        raise ValueError(f"unknown burst distribution {burst!r}, expected one of {BURSTS}")
+    if rate <= 0 or burst_mean <= 0:
+        raise ValueError("rate and burst_mean must be positive")
+    if priority_weights is not None:
+        if len(priority_weights) != PRIORITY_LEVELS:
+            raise ValueError(f"priority_weights needs {PRIORITY_LEVELS} entries")
+        priority_weights = np.asarray(priority_weights, dtype=np.float64)
+        priority_weights = priority_weights / priority_weights.sum()
+    burstiness = max(float(burstiness), 1.0)
+
+    rng = np.random.default_rng(seed)
+    clock = 0.0
+    pid = first_pid
+    remaining = count
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunk = np.empty(size, dtype=RECORD_DTYPE)
+
+        if arrival == "poisson":
+            gaps = rng.exponential(1 / rate, size)
+        else:
+            # Each arrival opens a new cluster with probability 1/burstiness,
+            # so cluster sizes are geometric with mean `burstiness`
+            gaps = rng.exponential(1 / (rate * burstiness), size)
+            opens = rng.random(size) < 1 / burstiness
+            quiet = (burstiness - (burstiness - 1) / burstiness) / rate
+            gaps[opens] = rng.exponential(quiet, int(opens.sum()))
+        times = clock + np.cumsum(gaps)
+        clock = float(times[-1])
+        chunk["start_time"] = times
+
+        if burst == "exponential":
+            chunk["burst_time"] = rng.exponential(burst_mean, size)
+        elif burst == "lognormal":
+            mu = math.log(burst_mean) - burst_sigma ** 2 / 2
+            chunk["burst_time"] = rng.lognormal(mu, burst_sigma, size)
+        else:
+            chunk["burst_time"] = rng.uniform(0.5 * burst_mean, 1.5 * burst_mean, size)
+
+        if priority_weights is None:
+            chunk["priority"] = rng.integers(1, PRIORITY_LEVELS + 1, size)
+        else:
+            chunk["priority"] = rng.choice(PRIORITY_LEVELS, size, p=priority_weights) + 1
+        chunk["cpu_usage"] = rng.uniform(1, 100, size)
+        chunk["memory_usage"] = rng.uniform(1, 100, size)
+        chunk["pid"] = np.arange(pid, pid + size)
+        pid += size
+        remaining -= size
+        yield chunk
+
+
+def _format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".bin":
+        return "binary"
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension == ".json":
+        return "json"
+    raise ValueError(f"unknown workload format {extension!r}, expected .bin, .ndjson, .jsonl or .json")
+
+
+def write_workload(path, chunks):
+    # Writes RECORD_DTYPE chunks as .bin or .ndjson; returns the record count
+    kind = _format(path)
+    if kind == "json":
+        raise ValueError("write .ndjson or .bin; a single JSON document cannot be streamed")
+    written = 0
+    with open(path, "wb" if kind == "binary" else "w") as file:
+        if kind == "binary":
+            file.write(BINARY_MAGIC)
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=RECORD_DTYPE)
+            if kind == "binary":
+                chunk.tofile(file)
+            else:
+                file.writelines(json.dumps(_record_dict(record)) + "\n" for record in chunk.tolist())
+            written += len(chunk)
+    return written
+
+
+def _record_dict(record):
+    pid, start_time, burst_time, priority, cpu_usage, memory_usage = record
+    return {
+        "pid": pid,
+        "name": f"job-{pid}",
+        "status": "Waiting",
+        "cpu_usage": round(cpu_usage, 2),
+        "memory_usage": round(memory_usage, 2),
+        "priority": priority,
+        "start_time": round(start_time, 6),
+        "burst_time": None if math.isnan(burst_time) else round(burst_time, 6),
+    }
+
+
+def _process(proc_data):
+    # Fields as in data/dummy_processes.json; only pid is required
+    return Process(
+        proc_data['pid'],
+        proc_data.get('name', f"job-{proc_data['pid']}"),
+        proc_data.get('status', "Waiting"),
+        proc_data.get('cpu_usage', 0),
+        proc_data.get('memory_usage', 0),
+        proc_data.get('priority', 5),
+        proc_data.get('start_time'),
+        proc_data.get('burst_time'),
+        proc_data.get('affinity')
+    )
+
+
+def iter_processes(path, ordered=False, chunk_size=CHUNK_SIZE):
+    # Processes of a workload file in file order, read lazily except for the
+    # single-document .json format. That one is read whole anyway, so with
+    # `ordered` it comes sorted by start_time, as WorkloadStream needs;
+    # .ndjson and .bin files are expected to be written sorted.
+    kind = _format(path)
+    if kind == "json":
+        with open(path, 'r') as file:
+            data = json.load(file)
+        processes = [_process(proc_data) for proc_data in data['processes']]
+        if ordered:
+            processes.sort(key=lambda process: process.start_time)
+        yield from processes
+    elif kind == "ndjson":
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    yield _process(json.loads(line))
+    else:
+        with open(path, "rb") as file:
+            if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError(f"{path} is not a binary workload file")
+        if os.path.getsize(path) == len(BINARY_MAGIC):
+            return
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=len(BINARY_MAGIC))
+        for first in range(0, len(records), chunk_size):
+            yield from processes_from_records(records[first:first + chunk_size])
+
+
+def processes_from_records(records):
+    # Waiting Process objects for RECORD_DTYPE records, e.g. a generated chunk
+    for pid, start_time, burst_time, priority, cpu_usage, memory_usage in records.tolist():
+        yield Process(pid, f"job-{pid}", "Waiting", cpu_usage, memory_usage, priority, start_time,
+                      None if math.isnan(burst_time) else burst_time)
+
+
+def load_processes(process_manager, path='data/dummy_processes.json'):
+    # Adds every process of the file at once; True on success
+    try:
+        if os.path.exists(path):
+            for process in iter_processes(path):
+                process_manager.add_process(process)
+            return True
+        return False
+    except Exception as e:
+        print(f"Error loading processes from {path}: {e}")
+        return False
+
+
+class WorkloadStream:
+    # Feeds processes into a Simulation as its clock reaches their start_time,
+    # taken as an offset from the first process's. Only `batch` arrivals are
+    # queued at a time; the next batch is read when the clock reaches the last
+    # queued one. Processes must come sorted by start_time (generated files
+    # are); a late one arrives as soon as it is read.
+    def __init__(self, simulation, processes, batch=STREAM_BATCH):
+        self.simulation = simulation
+        self.batch = batch
+        self.fed = 0          # processes handed to the simulation so far
+        self.finite = 0       # ... of which have a burst_time
+        self.exhausted = False
+        self._processes = iter(processes)
+        self._base = None     # simulation time of start_time 0
+
+    def start(self):
+        self._refill()
+        return self
+
+    def _refill(self):
+        simulation = self.simulation
+        queued = 0
+        at = simulation.clock
+        for process in itertools.islice(self._processes, self.batch):
+            if self._base is None:
+                self._base = simulation.clock - process.start_time
+            at = max(process.start_time + self._base, simulation.clock)
+            simulation.add_arrival(process, at)
+            queued += 1
+            if process.burst_time is not None:
+                self.finite += 1
+        self.fed += queued
+        if queued < self.batch:
+            self.exhausted = True
+        else:
+            # Runs after the arrivals at `at`, which were queued first
+            simulation.schedule_call(at, self._refill)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic workload file")
+    parser.add_argument("--count", type=int, required=True, help="number of processes")
+    parser.add_argument("--out", required=True, help="output file (.bin or .ndjson)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--arrival", default="poisson", choices=ARRIVALS)
+    parser.add_argument("--rate", type=float, default=1.0, help="mean arrivals per second")
+    parser.add_argument("--burstiness", type=float, default=10.0,
+                        help="mean cluster size for bursty arrivals")
+    parser.add_argument("--burst", default="exponential", choices=BURSTS, help="CPU burst distribution")
+    parser.add_argument("--burst-mean", type=float, default=5.0, help="mean CPU seconds per process")
+    parser.add_argument("--burst-sigma", type=float, default=1.0, help="shape of the lognormal bursts")
+    parser.add_argument("--priority-weights", nargs=PRIORITY_LEVELS, type=float, default=None,
+                        help="relative weights of priorities 1..10")
+    parser.add_argument("--first-pid", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    chunks = generate_workload(args.count, args.seed, args.arrival, args.rate, args.burstiness,
+                               args.burst, args.burst_mean, args.burst_sigma,
+                               args.priority_weights, args.first_pid)
+    try:
+        written = write_workload(args.out, chunks)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Wrote {written} processes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
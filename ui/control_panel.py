@@ -3,6 +3,7 @@ import streamlit as st
 import random
 import time
 from utils.helpers import generate_id
+from core.policies import policy_names
 
 def show_control_panel(process_manager, scheduler):
     st.header("Control Panel")
@@ -33,10 +34,9 @@ def show_control_panel(process_manager, scheduler):
     
     # Scheduler settings
     st.subheader("Scheduler Settings")
-    algorithm = st.selectbox("Scheduling Algorithm", 
-                           ["Round Robin", "Priority", "First Come First Served"])
+    algorithm = st.selectbox("Scheduling Algorithm", policy_names())
     
-    if algorithm == "Round Robin":
+    if algorithm in ("Round Robin", "Multilevel Feedback Queue", "Completely Fair"):
         quantum = st.slider("Time Quantum (seconds)", 1, 10, 2)
         scheduler.quantum = quantum
     
@@ -50,16 +50,12 @@ def show_control_panel(process_manager, scheduler):
     
     with col1:
         if st.button("Start All Processes"):
-            processes = process_manager.get_processes()
-            for process in processes:
-                process.status = "Running"
+            process_manager.update_processes_status("Running")
             st.success("All processes started")
     
     with col2:
         if st.button("Stop All Processes"):
-            processes = process_manager.get_processes()
-            for process in processes:
-                process.status = "Stopped"
+            process_manager.update_processes_status("Stopped")
             st.success("All processes stopped")
 
 # Make sure to import Process class
@@ -1,43 +1,106 @@
 # ui/dashboard.py
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import time
 
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import time
+from ui.render_cache import cached
+from utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Chart resolutions offered on the dashboard: label -> rollup seconds (None = raw)
+HISTORY_RESOLUTIONS = {"Live": None, "Per second": 1, "Per minute": 60}
+
+def _history_frame(raw, get_rollup, resolution, label):
+    if resolution is None:
+        return pd.DataFrame({label: raw}) if len(raw) else None
+    rollup = get_rollup(resolution)
+    if not len(rollup["avg"]):
+        return None
+    return pd.DataFrame({
+        label: rollup["avg"],
+        "min": rollup["min"],
+        "max": rollup["max"],
+    }, index=pd.to_datetime(rollup["time"], unit="s"))
+
+# Above this many cores only the latest utilization is charted, not each history
+CORE_HISTORY_LIMIT = 16
+
+def show_core_usage(core_history):
+    if len(core_history) < 2:
+        return
+    st.subheader("Per-Core Usage")
+    latest = [float(series[-1]) if len(series) else 0.0 for series in core_history]
+    st.caption(f"{len(core_history)} cores, {sum(latest) / len(latest):.1f}% average")
+    st.bar_chart(pd.DataFrame({"Core Usage (%)": latest}, index=[f"CPU {core}" for core in range(len(latest))]))
+    if len(core_history) <= CORE_HISTORY_LIMIT:
+        length = min(len(series) for series in core_history)
+        if length:
+            st.line_chart(pd.DataFrame({f"CPU {core}": series[-length:] for core, series in enumerate(core_history)}))
+
+# Time windows for the on-disk history: label -> seconds
+STORED_RANGES = {"Last hour": 3600, "Last day": 86400, "Last week": 7 * 86400}
+
+def show_stored_history(metrics_store, max_points=500):
+    st.subheader("Stored History")
+    col1, col2 = st.columns(2)
+    series = col1.selectbox("Metric", ["cpu", "memory", "network"], key="stored_series")
+    window = STORED_RANGES[col2.selectbox("Range", list(STORED_RANGES), key="stored_range")]
+    time_range = metrics_store.time_range(series)
+    if time_range is None:
+        st.info("No stored samples yet.")
+        return
+    # Only the requested range is paged in, reduced to at most max_points buckets
+    end = time_range[1]
+    result = metrics_store.query(series, end - window, end, max_points=max_points)
+    values = {"avg": result["avg"], "min": result["min"], "max": result["max"]} if "avg" in result else {series: result["value"]}
+    st.line_chart(pd.DataFrame(values, index=pd.to_datetime(result["time"], unit="s")))
 
-def show_dashboard(resource_analyzer, network):
+def show_dashboard(resource_analyzer, network, metrics_store=None):
     st.header("System Dashboard")
     
     # Create three columns for the metrics
     col1, col2, col3 = st.columns(3)
     
     # Get the latest values
-    cpu = resource_analyzer.get_cpu_usage()[-1] if resource_analyzer.get_cpu_usage() else 0
-    memory = resource_analyzer.get_memory_usage()[-1] if resource_analyzer.get_memory_usage() else 0
-    network_usage = network.get_network_usage()[-1] if network.get_network_usage() else 0
+    cpu_data = resource_analyzer.get_cpu_usage()
+    memory_data = resource_analyzer.get_memory_usage()
+    network_data = network.get_network_usage()
+    cpu = cpu_data[-1] if len(cpu_data) else 0
+    memory = memory_data[-1] if len(memory_data) else 0
+    network_usage = network_data[-1] if len(network_data) else 0
     
     # Display metrics
     col1.metric("CPU Usage", f"{cpu}%", f"{cpu-50:.1f}%" if cpu > 50 else f"{cpu-50:.1f}%")
     col2.metric("Memory Usage", f"{memory}%", f"{memory-60:.1f}%" if memory > 60 else f"{memory-60:.1f}%")
     col3.metric("Network", f"{network_usage} KB/s", f"{network_usage-30:.1f}" if network_usage > 30 else f"{network_usage-30:.1f}")
     
+    # Long histories are charted from the min/max/avg rollups, not raw samples
+    resolution = HISTORY_RESOLUTIONS[st.radio("History", list(HISTORY_RESOLUTIONS), horizontal=True)]
+    
     # Add titles for the graphs
     st.subheader("CPU Usage Over Time")
-    cpu_data = resource_analyzer.get_cpu_usage()
-    if cpu_data:
-        st.line_chart(pd.DataFrame({'CPU Usage (%)': cpu_data}))
+    frame = cached("dashboard.cpu", resource_analyzer, ("history",),
+                   lambda: _history_frame(cpu_data, resource_analyzer.get_cpu_rollup, resolution, 'CPU Usage (%)'),
+                   (resolution,))
+    if frame is not None:
+        st.line_chart(frame)
+    
+    show_core_usage(resource_analyzer.get_core_usage())
     
     st.subheader("Memory Usage Over Time")
-    memory_data = resource_analyzer.get_memory_usage()
-    if memory_data:
-        st.line_chart(pd.DataFrame({'Memory Usage (%)': memory_data}))
+    frame = cached("dashboard.memory", resource_analyzer, ("history",),
+                   lambda: _history_frame(memory_data, resource_analyzer.get_memory_rollup, resolution,
+                                          'Memory Usage (%)'),
+                   (resolution,))
+    if frame is not None:
+        st.line_chart(frame)
     
     st.subheader("Network Usage Over Time")
-    network_data = network.get_network_usage()
-    if network_data:
-        st.line_chart(pd.DataFrame({'Network (KB/s)': network_data}))
+    # Raw samples are versioned with the network, rollups with the history
+    frame = cached("dashboard.network", network, ("network", "history"),
+                   lambda: _history_frame(network_data, network.get_network_rollup, resolution, 'Network (KB/s)'),
+                   (resolution,))
+    if frame is not None:
+        st.line_chart(frame)
 
+    if metrics_store is not None:
+        show_stored_history(metrics_store)
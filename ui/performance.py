@@ -0,0 +1,72 @@
+# ui/performance.py
+import streamlit as st
+
+from core.instrumentation import instrumentation, rerun_profiler
+from ui.render_cache import render_cache
+from utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+PROFILE_RERUNS = 5   # default number of reruns captured by the profiler
+
+def show_performance_panel(collectors=()):
+    st.header("Performance")
+
+    # Timing spans: the simulation thread and every session record into the same histograms
+    recording = st.checkbox("Record timing spans", value=instrumentation.enabled, key="record_spans")
+    instrumentation.enabled = recording
+
+    spans = instrumentation.spans()
+    if spans:
+        rows = [
+            {
+                "Span": name,
+                "Calls": stats["count"],
+                "p50 (ms)": stats["p50"] * 1000,
+                "p99 (ms)": stats["p99"] * 1000,
+                "Mean (ms)": stats["mean"] * 1000,
+                "Max (ms)": stats["max"] * 1000,
+                "Total (s)": stats["total"],
+            }
+            for name, stats in spans.items()
+        ]
+        # Where the time goes first
+        rows.sort(key=lambda row: row["Total (s)"], reverse=True)
+        st.dataframe(pd.DataFrame(rows).round(3), width="stretch")
+    else:
+        st.info("No spans recorded yet." if recording else "Span recording is off.")
+
+    counters = instrumentation.counters()
+    if counters:
+        st.table(pd.DataFrame([{"Counter": name, "Count": value} for name, value in sorted(counters.items())]))
+
+    if st.button("Reset Histograms"):
+        instrumentation.reset()
+
+    # Data source collectors; skipped ticks mean a collection overran its interval
+    if collectors:
+        st.subheader("Collectors")
+        st.dataframe(pd.DataFrame(list(collectors)), width="stretch", hide_index=True)
+
+    # Rendered tab content reused across reruns; hits/misses are in the counters above
+    st.caption(f"Render cache: {len(render_cache)} entries, {render_cache.size / 2 ** 20:.1f} of "
+               f"{render_cache.budget / 2 ** 20:.0f} MB")
+    if st.button("Clear Render Cache"):
+        render_cache.clear()
+
+    # cProfile of whole reruns, merged and downloadable as pstats
+    st.subheader("Profile Reruns")
+    col1, col2 = st.columns(2)
+    with col1:
+        reruns = st.number_input("Reruns to capture", min_value=1, max_value=100, value=PROFILE_RERUNS)
+    with col2:
+        if st.button("Profile Next Reruns"):
+            rerun_profiler.request(int(reruns))
+
+    if rerun_profiler.capturing():
+        st.info(f"Capturing... {rerun_profiler.remaining} more rerun(s) to start.")
+    data = rerun_profiler.dump()
+    if data is not None:
+        st.download_button("Download pstats", data, file_name="reruns.pstats", mime="application/octet-stream")
+        st.caption(f"{rerun_profiler.captured} rerun(s). Open with `python -m pstats reruns.pstats`.")
+        st.code(rerun_profiler.report())
@@ -1,86 +1,154 @@
 # ui/process_table.py
 import streamlit as st
-import pandas as pd
+
+from core.process_index import ProcessIndex, SORT_COLUMNS
+from ui.render_cache import cached
+from utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+STATUSES = ["Running", "Waiting", "Stopped"]
+PAGE_SIZES = [25, 50, 100, 250]
+SUGGESTION_LIMIT = 20   # processes offered by the action picker
+# Bulk action -> the status it sets (Kill and Set Priority are handled apart)
+BULK_ACTIONS = {"Stop": "Stopped", "Start": "Running", "Kill": None, "Set Priority": None}
+
+def process_rows(processes):
+    # One table row per process
+    return [
+        {
+            "PID": p.pid,
+            "Name": p.name,
+            "Status": p.status,
+            "CPU Usage (%)": p.cpu_usage,
+            "Memory Usage (%)": p.memory_usage,
+            "Priority": p.priority
+        }
+        for p in processes
+    ]
+
+def _process_index(process_manager):
+    # Snapshots keep one index for every session; anything else is indexed per call
+    if hasattr(process_manager, "get_index"):
+        return process_manager.get_index()
+    return ProcessIndex(process_manager.get_processes())
+
+def _page(process_manager, index, filters, page, page_size):
+    # (matching count, page DataFrame), reused until the processes change
+    def build():
+        total, rows = index.query(*filters, offset=(page - 1) * page_size, limit=page_size)
+        return total, pd.DataFrame(process_rows(rows))
+    return cached("process_table.page", process_manager, ("processes",), build, (filters, page, page_size))
 
 def show_process_table(process_manager, scheduler=None):
     st.header("Process List")
     
-    processes = process_manager.get_processes()
+    index = _process_index(process_manager)
     
-    if not processes or len(processes) == 0:
+    if not len(index):
         st.warning("No processes available. Add processes from the Control Panel.")
         return
     
-    # Debug information
-    st.write(f"Number of processes loaded: {len(processes)}")
+    # Filtering, sorting and paging happen here; only the visible page is sent to the browser
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        search = st.text_input("Search by name", key="table_search")
+    with col2:
+        options = sorted(set(STATUSES) | set(index.statuses))
+        statuses = st.multiselect("Status (all when empty)", options, key="table_statuses")
+    with col3:
+        min_cpu = st.number_input("Min CPU (%)", min_value=0.0, max_value=100.0, value=0.0, step=5.0,
+                                  key="table_min_cpu")
     
-    # Create a dataframe for display
-    data = []
-    for p in processes:
-        data.append({
-            "PID": p.pid,
-            "Name": p.name,
-            "Status": p.status,
-            "CPU Usage (%)": p.cpu_usage,
-            "Memory Usage (%)": p.memory_usage,
-            "Priority": p.priority
-        })
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        pid_min = st.number_input("PID from", value=None, step=1, placeholder="any", key="table_pid_min")
+    with col2:
+        pid_max = st.number_input("PID to", value=None, step=1, placeholder="any", key="table_pid_max")
+    with col3:
+        sort_label = st.selectbox("Sort by", list(SORT_COLUMNS), key="table_sort")
+    with col4:
+        st.write("")
+        descending = st.checkbox("Descending", key="table_descending")
     
-    # Display as a dataframe
-    st.dataframe(data, use_container_width=True)
+    # The pager sits under the table, so read its state before drawing it
+    page_size = st.session_state.get("table_page_size", PAGE_SIZES[1])
+    page = st.session_state.get("table_page", 1)
+    filters = (search, tuple(statuses) or None, pid_min, pid_max, min_cpu, SORT_COLUMNS[sort_label], descending)
+    total, frame = _page(process_manager, index, filters, page, page_size)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # The filters shrank the result; show its last page
+        page = st.session_state["table_page"] = pages
+        total, frame = _page(process_manager, index, filters, page, page_size)
+    
+    if len(frame):
+        st.dataframe(frame, width="stretch", hide_index=True)
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first}-{first + len(frame) - 1} of {total} matching processes ({len(index)} in total)")
+    else:
+        st.info(f"No processes match the filters ({len(index)} in total).")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key="table_page")
+    with col2:
+        st.selectbox("Rows per page", PAGE_SIZES, index=1, key="table_page_size")
+    
+    # One bulk call for everything the filters match, not one call per process
+    if total:
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            action = st.selectbox(f"Apply to all {total} matching processes", BULK_ACTIONS, key="bulk_action")
+        with col2:
+            priority = st.number_input("New priority", min_value=1, max_value=10, value=5, key="bulk_priority",
+                                       disabled=action != "Set Priority")
+        with col3:
+            st.write("")
+            if st.button("Apply", key="bulk_apply"):
+                pids = index.pids(*filters[:5]).tolist()
+                if action == "Kill":
+                    process_manager.remove_processes(pids)
+                elif action == "Set Priority":
+                    process_manager.update_processes_priority(int(priority), pids)
+                else:
+                    process_manager.update_processes_status(BULK_ACTIONS[action], pids)
+                st.success(f"{action}: {len(pids)} processes.")
+                st.rerun()
     
     # Process actions section
     st.subheader("Process Actions")
     
+    # A bounded, searchable picker instead of selectboxes listing every process
+    text = st.text_input("Find a process (PID or name)", key="action_search")
+    matches = index.suggest(text, SUGGESTION_LIMIT)
+    if not matches:
+        st.info("No process matches.")
+        return
+    labels = {p.pid: f"{p.pid} - {p.name} ({p.status})" for p in matches}
+    pid = st.selectbox(f"Select process (first {SUGGESTION_LIMIT} matches)", list(labels),
+                       format_func=labels.get, key="action_pid")
+    process = process_manager.get_process(pid)
+    if process is None:
+        return
+    
     # Create columns for different actions
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if processes:
-            running_processes = [p for p in processes if p.status == "Running"]
-            if running_processes:
-                pid_to_stop = st.selectbox(
-                    "Select process to stop:", 
-                    [f"{p.pid} - {p.name}" for p in running_processes],
-                    key="stop_process"
-                )
-                if st.button("Stop Process"):
-                    if pid_to_stop:
-                        pid = int(pid_to_stop.split(" - ")[0])
-                        process_manager.update_process_status(pid, "Stopped")
-                        st.success(f"Process {pid_to_stop} stopped.")
-                        st.rerun()
-            else:
-                st.info("No running processes to stop")
+        if st.button("Stop Process", disabled=process.status != "Running"):
+            process_manager.update_process_status(pid, "Stopped")
+            st.success(f"Process {labels[pid]} stopped.")
+            st.rerun()
     
     with col2:
-        if processes:
-            stopped_processes = [p for p in processes if p.status != "Running"]
-            if stopped_processes:
-                pid_to_start = st.selectbox(
-                    "Select process to start:", 
-                    [f"{p.pid} - {p.name}" for p in stopped_processes],
-                    key="start_process"
-                )
-                if st.button("Start Process"):
-                    if pid_to_start:
-                        pid = int(pid_to_start.split(" - ")[0])
-                        process_manager.update_process_status(pid, "Running")
-                        st.success(f"Process {pid_to_start} started.")
-                        st.rerun()
-            else:
-                st.info("No stopped processes to start")
+        if st.button("Start Process", disabled=process.status == "Running"):
+            process_manager.update_process_status(pid, "Running")
+            st.success(f"Process {labels[pid]} started.")
+            st.rerun()
                 
     with col3:
-        if processes:
-            pid_to_kill = st.selectbox(
-                "Select process to kill:", 
-                [f"{p.pid} - {p.name}" for p in processes],
-                key="kill_process"
-            )
-            if st.button("Kill Process"):
-                if pid_to_kill:
-                    pid = int(pid_to_kill.split(" - ")[0])
-                    process_manager.remove_process(pid)
-                    st.success(f"Process {pid_to_kill} killed.")
-                    st.rerun()
+        if st.button("Kill Process"):
+            process_manager.remove_process(pid)
+            st.success(f"Process {labels[pid]} killed.")
+            st.rerun()
@@ -0,0 +1,95 @@
+# ui/render_cache.py
+# Rendered section results (DataFrames, PNG bytes) shared by every rerun and
+# session. An entry is keyed by its section, the versions of the snapshot
+# parts it was built from and any widget parameters, so it is rebuilt only
+# when one of those changes. Least recently used entries are dropped once
+# the estimated size passes the budget.
+#
+#   frame = cached("cpu_allocation", snapshot, ("processes",), build)
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+from core.instrumentation import count
+
+RENDER_CACHE_BYTES = 64 * 2 ** 20
+
+
+class RenderCache:
+    def __init__(self, budget=RENDER_CACHE_BYTES):
+        self.budget = budget           # bytes; 0 disables caching
+        self.size = 0
+        self._lock = threading.Lock()  # sessions rerun on their own threads
+        self._entries = OrderedDict()  # (section, key) -> (value, size), oldest first
+
+    def get(self, section, key, build):
+        # build() is called without the lock; two sessions missing together
+        # both build, and the later result is kept
+        entry_key = (section, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+                count("render_cache.hits")
+                return entry[0]
+        count("render_cache.misses")
+        value = build()
+        size = _size_of(value)
+        with self._lock:
+            old = self._entries.pop(entry_key, None)
+            if old is not None:
+                self.size -= old[1]
+            if size <= self.budget:
+                self._entries[entry_key] = (value, size)
+                self.size += size
+            while self.size > self.budget:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                count("render_cache.evictions")
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self.size = 0
+
+
+def cached(section, source, parts, build, params=()):
+    # build() through the cache when `source` is a versioned Snapshot (or a
+    # handle onto one), else built every time
+    get_versions = getattr(source, "get_versions", None)
+    if get_versions is None:
+        return build()
+    return render_cache.get(section, (get_versions(*parts), params), build)
+
+
+def _size_of(value):
+    # Estimated bytes held by a cached value
+    if value is None:
+        return 0
+    if hasattr(value, "memory_usage"):
+        # pandas DataFrame (one count per column) or Series, checked without importing pandas
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size_of(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def figure_png(figure):
+    # The PNG st.pyplot would send for `figure`, for caching and st.image
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    return buffer.getvalue()
+
+
+# Process-wide instance, shared by every session
+render_cache = RenderCache()
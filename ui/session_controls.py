@@ -0,0 +1,29 @@
+# ui/session_controls.py
+import streamlit as st
+
+SPEEDS = [0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0]
+
+def show_session_controls(player, snapshot):
+    # Sidebar playback controls for a recorded session (core.session.SessionPlayer)
+    st.sidebar.header("Session Playback")
+    first, last = player.first_tick, player.last_tick
+
+    def seek():
+        tick = st.session_state.session_tick
+        player.seek(tick)
+        # The player seeks on its own thread; keep the slider where it was dropped until then
+        st.session_state.session_seek = tick
+
+    if last > first:
+        if st.session_state.pop("session_seek", None) is None:
+            # Follow playback
+            st.session_state.session_tick = min(max(snapshot.ticks, first), last)
+        st.sidebar.slider("Tick", first, last, key="session_tick", on_change=seek)
+    st.sidebar.caption(f"Tick {snapshot.ticks:,} of {last:,} · {snapshot.clock - player.reader.clocks[0]:,.0f}s in")
+
+    st.sidebar.select_slider("Speed", SPEEDS, value=player.speed if player.speed in SPEEDS else 1.0,
+                             format_func=lambda speed: f"{speed:g}×", key="session_speed",
+                             on_change=lambda: player.set_speed(st.session_state.session_speed))
+    st.sidebar.toggle("Paused", value=player.paused, key="session_paused",
+                      on_change=lambda: player.set_paused(st.session_state.session_paused))
+    st.sidebar.caption("Recorded sessions are read-only: changes made in the other tabs are not applied.")
@@ -0,0 +1,29 @@
+# utils/lazy.py
+# Module stand-ins imported on first attribute access, so heavy libraries
+# are only loaded by the code paths that use them; a cold start of the app
+# draws its first elements before pandas is imported.
+#
+#   pd = lazy_import("pandas")
+#   pd.DataFrame(...)       # imports pandas here, once
+import importlib
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # Only reached for module attributes; import_module holds the import lock
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
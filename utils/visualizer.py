@@ -1,87 +1,143 @@
 # utils/visualizer.py
-import matplotlib.pyplot as plt
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
-import io
-import base64
-from matplotlib.colors import LinearSegmentedColormap
 
-def create_gantt_chart(processes):
-    # Sort processes by priority
-    sorted_processes = sorted(processes, key=lambda x: x.priority, reverse=True)
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Custom colors for different statuses
-    colors = {
-        'Running': '#4CAF50',  # Green
-        'Waiting': '#FFC107',  # Yellow
-        'Stopped': '#F44336'   # Red
-    }
-    
-    y_ticks = []
-    y_labels = []
-    
-    for i, process in enumerate(sorted_processes):
-        y_pos = len(sorted_processes) - i
-        y_ticks.append(y_pos)
-        y_labels.append(f"{process.name} (PID: {process.pid})")
-        
-        # Create a bar for each process
-        ax.barh(y_pos, process.cpu_usage, left=0, height=0.5, 
-                color=colors.get(process.status, '#9E9E9E'),
-                alpha=0.8)
-        
-        # Add text inside the bar
-        ax.text(process.cpu_usage/2, y_pos, f"{process.status}", 
-                ha='center', va='center', color='white', fontweight='bold')
-    
-    # Customize the chart
-    ax.set_yticks(y_ticks)
-    ax.set_yticklabels(y_labels)
-    ax.set_xlabel('CPU Usage (%)')
-    ax.set_title('Process Gantt Chart')
-    ax.grid(axis='x', linestyle='--', alpha=0.7)
-    
-    # Add a legend
-    from matplotlib.patches import Patch
-    legend_elements = [Patch(facecolor=color, label=status) 
-                       for status, color in colors.items()]
-    ax.legend(handles=legend_elements, loc='upper right')
-    
-    # Convert plot to PNG image
-    buf = io.BytesIO()
-    plt.tight_layout()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
-    plt.close(fig)
-    
-    return buf
+from core.instrumentation import timed
+from core.trace import level_of_detail
 
-def get_gantt_chart_as_base64(processes):
-    buf = create_gantt_chart(processes)
-    data = base64.b64encode(buf.read()).decode('utf-8')
-    return data
-def get_gantt_chart_figure(processes):
-    import matplotlib.pyplot as plt
-    from matplotlib.patches import Patch
-    # Sort processes by priority
-    sorted_processes = sorted(processes, key=lambda x: x.priority, reverse=True)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    colors = {'Running': '#4CAF50', 'Waiting': '#FFC107', 'Stopped': '#F44336'}
-    y_ticks = []
-    y_labels = []
-    for i, process in enumerate(sorted_processes):
-        y_pos = len(sorted_processes) - i
-        y_ticks.append(y_pos)
-        y_labels.append(f"{process.name} (PID: {process.pid})")
-        ax.barh(y_pos, process.cpu_usage, left=0, height=0.5, color=colors.get(process.status, '#9E9E9E'), alpha=0.8)
-        ax.text(process.cpu_usage/2, y_pos, f"{process.status}", ha='center', va='center', color='white', fontweight='bold')
-    ax.set_yticks(y_ticks)
-    ax.set_yticklabels(y_labels)
-    ax.set_xlabel('CPU Usage (%)')
-    ax.set_title('Process Gantt Chart')
-    ax.grid(axis='x', linestyle='--', alpha=0.7)
-    legend_elements = [Patch(facecolor=color, label=status) for status, color in colors.items()]
-    ax.legend(handles=legend_elements, loc='upper right')
-    plt.tight_layout()
-    return fig
+BAR_HEIGHT = 0.5
+TIMELINE_WIDTH_PX = 1000      # slices closer than one pixel of this are merged
+TIMELINE_MAX_ROWS = 40        # busiest pids shown when more ran in the viewport
+TIMELINE_CACHE_SIZE = 8       # figures kept, least recently used evicted first
+
+# Streamlit sessions render concurrently and figures are shared and updated in
+# place, so hold this lock from get_timeline_figure until the figure is drawn
+timeline_lock = threading.RLock()
+_timeline_cache = OrderedDict()  # timeline_view() key -> _TimelineChart
+
+
+def _cull(slices, start, end):
+    # Keep only slices overlapping [start, end]. Starts are sorted; ends are
+    # too for one core, but not once several cores' windows are merged.
+    hi = len(slices["start"]) if end is None else int(np.searchsorted(slices["start"], end, side="left"))
+    slices = {name: column[:hi] for name, column in slices.items()}
+    if start is None:
+        return slices
+    visible = slices["end"] > start
+    return {name: column[visible] for name, column in slices.items()}
+
+
+def timeline_view(trace, processes=None, start=None, end=None, width_px=TIMELINE_WIDTH_PX):
+    # What the Gantt chart draws: the level-of-detail bars in the viewport,
+    # their row labels and a "key" digest of all of it. Equal keys draw equal
+    # charts, so the key stays put while nothing in view moves.
+    # `trace` is an ExecutionTrace or a {"pid", "start", "end"} window, e.g.
+    # Scheduler.trace_window() over all cores.
+    slices = trace.window(start, end) if hasattr(trace, "window") else _cull(trace, start, end)
+    view = {"title": "Process Gantt Chart", "labels": (), "bars": None, "range": None}
+    if len(slices["pid"]):
+        view_start = float(slices["start"].min() if start is None else start)
+        view_end = float(slices["end"].max() if end is None else end)
+        # Level of detail: anything closer than a pixel draws as one bar
+        bars = level_of_detail(slices, view_start, view_end, width_px, TIMELINE_MAX_ROWS)
+        pids = bars["rows"]
+        if len(pids) < bars["total_rows"]:
+            view["title"] = f'Process Gantt Chart (busiest {len(pids)} of {bars["total_rows"]} processes)'
+        # Names of the shown rows only: `processes` is a list, or anything with get_process()
+        get_process = getattr(processes, "get_process", None)
+        if get_process is None:
+            get_process = {p.pid: p for p in processes or ()}.get
+        shown = [(pid, get_process(pid)) for pid in pids.tolist()]
+        view["labels"] = tuple(f"{process.name} (PID: {pid})" if process is not None else f"PID {pid}"
+                               for pid, process in shown)
+        view["bars"] = bars
+        view["range"] = (view_start, view_end)
+    digest = hashlib.blake2b(repr((view["title"], view["labels"], view["range"])).encode(), digest_size=16)
+    if view["bars"] is not None:
+        for column in ("pid", "start", "end"):
+            digest.update(np.ascontiguousarray(view["bars"][column]).tobytes())
+    view["key"] = digest.hexdigest()
+    return view
+
+
+class _TimelineChart:
+    def __init__(self, view):
+        # matplotlib is imported by the first chart, not at app startup
+        from matplotlib import colormaps
+        from matplotlib.collections import PolyCollection
+        from matplotlib.figure import Figure
+
+        # A bare Figure is not registered with pyplot, so dropping it frees it
+        self.figure = Figure(figsize=(10, 6))
+        self.ax = self.figure.subplots()
+        self.palette = colormaps["tab20"]
+        self.collection = PolyCollection(np.empty((0, 4, 2)), linewidths=0)
+        self.ax.add_collection(self.collection)
+        self.empty = self.ax.text(0.5, 0.5, 'No CPU slices recorded yet', ha='center', va='center',
+                                  transform=self.ax.transAxes)
+        self.ax.set_xlabel('Time (s)')
+        self.ax.grid(axis='x', linestyle='--', alpha=0.7)
+        self.labels = None
+        self.update(view)
+
+    def update(self, view):
+        # Moves the existing artists; the layout is only redone when the rows change
+        ax = self.ax
+        ax.set_title(view["title"])
+        bars = view["bars"]
+        self.empty.set_visible(bars is None)
+        if bars is None:
+            self.collection.set_verts([])
+        else:
+            pids = bars["rows"]
+            y = len(pids) - np.searchsorted(pids, bars["pid"])
+            verts = np.empty((len(y), 4, 2))
+            verts[:, 0, 0] = verts[:, 1, 0] = bars["start"]
+            verts[:, 2, 0] = verts[:, 3, 0] = bars["end"]
+            verts[:, 0, 1] = verts[:, 3, 1] = y - BAR_HEIGHT / 2
+            verts[:, 1, 1] = verts[:, 2, 1] = y + BAR_HEIGHT / 2
+            self.collection.set_verts(verts)
+            self.collection.set_facecolors(self.palette(bars["pid"] % self.palette.N))
+            view_start, view_end = view["range"]
+            ax.set_xlim(view_start, max(view_end, view_start + 1e-9))
+            ax.set_ylim(0, len(pids) + 1)
+        if view["labels"] != self.labels:
+            self.labels = view["labels"]
+            ax.set_yticks(np.arange(len(self.labels), 0, -1))
+            ax.set_yticklabels(self.labels)
+            self.figure.tight_layout()
+
+    def dispose(self):
+        self.figure.clear()
+
+
+@timed("chart.timeline")
+def get_timeline_figure(trace, processes=None, start=None, end=None, width_px=TIMELINE_WIDTH_PX, view=None):
+    # Real Gantt chart: one row per pid, one bar per stretch it held the CPU.
+    # Figures are kept by view key; a miss with the same rows as the most
+    # recent figure redraws that one in place. `view` is a timeline_view()
+    # result when the caller already has one.
+    if view is None:
+        view = timeline_view(trace, processes, start, end, width_px)
+    key = view["key"]
+    with timeline_lock:
+        chart = _timeline_cache.get(key)
+        if chart is not None:
+            _timeline_cache.move_to_end(key)
+            return chart.figure
+        # Same rows as the most recent figure: move its bars, keep its layout
+        if _timeline_cache:
+            last_key, last_chart = next(reversed(_timeline_cache.items()))
+            if last_chart.labels == view["labels"]:
+                del _timeline_cache[last_key]
+                last_chart.update(view)
+                _timeline_cache[key] = last_chart
+                return last_chart.figure
+        chart = _TimelineChart(view)
+        _timeline_cache[key] = chart
+        while len(_timeline_cache) > TIMELINE_CACHE_SIZE:
+            _, evicted = _timeline_cache.popitem(last=False)
+            evicted.dispose()
+        return chart.figure